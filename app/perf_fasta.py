@@ -0,0 +1,96 @@
+from src.utility import *
+from src.performance import *
+from src.packed import *
+import glob
+import os
+import tempfile
+
+#################################################################
+#------------------ TEST DE PERFORMANCE FASTA ------------------#
+#################################################################
+
+FASTA_FILES = sorted(glob.glob("./genome/*.fasta"), key=os.path.getsize)
+BANK_FILES = [ f for f in ["./genome/200_sequences.fasta", BANK_FASTA] if os.path.exists(f) ] or FASTA_FILES[-1:]
+
+
+def seqio_loader(filename):
+    '''Loads every genome of the file with Bio.SeqIO'''
+    return list(iter_genomes_seqio(filename))
+
+
+def native_loader(filename):
+    '''Loads every genome of the file with the native parser'''
+    return list(iter_genomes(filename))
+
+
+def packed_loader(packed_filename):
+    '''Loads every genome of a packed file (see src/packed.py)'''
+    return packed_to_genome(packed_filename)
+
+
+def packed_performance(files, repeat=3):
+    '''Compares the native fasta loader with the packed store on each file'''
+    performance = [ [], [] ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for f in files:
+            packed_filename = os.path.join(tmp, os.path.basename(f) + ".sc2p")
+            fasta_to_packed(f, packed_filename)
+            performance[0].append((os.path.getsize(f), min(measure_single_call(native_loader, [f], [0])[1] for _ in range(repeat))))
+            performance[1].append((os.path.getsize(f), min(measure_single_call(packed_loader, [packed_filename], [0])[1] for _ in range(repeat))))
+            print(f"{f}: {os.path.getsize(f)} -> {os.path.getsize(packed_filename)} octets")
+
+    return performance
+
+
+def transcription_performance(funcs, files, repeat=3):
+    '''Measures funcs on the (already parsed) ADNc sequences of each file, funcs
+    take the list of the sequences and return the list of the ARNm sequences'''
+    performance = [ [] for _ in range(len(funcs)) ]
+
+    for f in files:
+        sequences = [ sequence for _, sequence in iter_fasta(f) ]
+
+        for i in range(len(funcs)):
+            best = min(measure_single_call(funcs[i], [sequences], [0])[1] for _ in range(repeat))
+            performance[i].append((os.path.getsize(f), best))
+
+    return performance
+
+
+def transcription_boucle(sequences):
+    '''Transcribes the sequences one base at a time (first version)'''
+    return [ transcription_complementaire_boucle(sequence) for sequence in sequences ]
+
+
+def transcription_translate(sequences):
+    '''Transcribes the sequences one genome at a time with str.translate'''
+    return [ transcription_complementaire(sequence) for sequence in sequences ]
+
+
+def print_performance(performance, funcs):
+    '''Prints the measures of files_performance as a table (one column per function)'''
+    widths = [ max(len(func.__name__) + 2, 12) for func in funcs ]
+    print("Taille (octets)".ljust(16) + "".join(funcs[j].__name__.rjust(widths[j]) for j in range(len(funcs))))
+
+    for i in range(len(performance[0])):
+        print(str(performance[0][i][0]).ljust(16) + "".join(f"{performance[j][i][1]:.4f}s".rjust(widths[j]) for j in range(len(funcs))))
+
+
+if __name__ == '__main__':
+    print(f"Benchmark on {len(FASTA_FILES)} fasta file(s)...")
+    ###################### PARSING ######################
+    loaders = [ seqio_loader, native_loader ]
+    performance = files_performance(loaders, FASTA_FILES, title="Fasta Parsing Performance Comparison")
+    print_performance(performance, loaders)
+
+
+    ###################### TRANSCRIPTION ######################
+    transcriptions = [ transcription_boucle, transcription_translate, transcription_echantillon ]
+    performance = transcription_performance(transcriptions, BANK_FILES)
+    print_performance(performance, transcriptions)
+
+
+    ###################### PACKED STORE ######################
+    performance = packed_performance(BANK_FILES)
+    print_performance(performance, [ native_loader, packed_loader ])
@@ -20,7 +20,7 @@ if __name__ == '__main__':
 
     ###################### MEDIANE ######################
     median_args = arg_generator(N=100000, stride=100, type=NUMBERS, lower=1000, upper=100000, variant_arg_pos=[0], start=1)
-    func_performance(mediane, args_arr=median_args, sizes=[0], tick_spacing=25)
+    funcs_performance([ mediane_tri, mediane ], args_arr=median_args, sizes=[0], tick_spacing=25)
 
 
     ###################### QUARTILE ######################
@@ -1,296 +1,335 @@
 from matplotlib import pyplot as plt
 import numpy as np
+import os
+import sys
+from multiprocessing import Pool
 from src.stats import *
 from src.utility import*
+from src.cache import *
+from src.codon_batch import *
+from src.dedup import *
+
+"""
+* Tracé des figures d'un fichier fasta
+    Chaque fonction plot_* affiche sa figure (plt.show) et pose des questions sur la précision,
+    ou bien, si un fichier est donné, enregistre la figure sans fenêtre ni question.
+    Les données d'un fichier fasta (séquences, traductions, comptages) sont gardées dans un
+    DonneesFasta qui peut être passé à plusieurs fonctions pour ne les calculer qu'une fois.
+    plot_fasta trace toutes les figures d'un fichier dans un dossier (backend Agg), en parallèle
+    dans un pool de processus qui partagent le même DonneesFasta.
+"""
+
+DPI = 200   # résolution des images enregistrées
+
+
+class DonneesFasta:
+    '''Données d'un fichier fasta partagées par les fonctions plot_*, chacune est calculée
+    à la première demande puis gardée'''
+    __slots__ = ("fasta", "processes", "_genome", "_trad", "_nombres", "_proportions")
+
+    def __init__(self, fasta, processes=None):
+        self.fasta = fasta
+        self.processes = processes  # processus de la traduction (voir codons_echantillon_parallele)
+        self._genome = None
+        self._trad = None
+        self._nombres = {}
+        self._proportions = {}
+
+    @property
+    def genome(self):
+        '''Les séquences ARN du fichier (voir cached_genome)'''
+        if self._genome is None:
+            self._genome = cached_genome(self.fasta)
+        return self._genome
+
+    @property
+    def trad(self):
+        '''Les séquences d'acides aminés (chaque génome distinct est traduit une seule fois, en parallèle)'''
+        if self._trad is None:
+            self._trad = codons_echantillon_dedup(self.genome, processes=self.processes)
+        return self._trad
+
+    def sequences(self, acides=False):
+        '''Les séquences ARN, ou les séquences d'acides aminés si acides'''
+        return self.trad if acides else self.genome
+
+    def nombres(self, acides=False, element=None):
+        '''Nombre de chaque nucléotide (ou acide aminé si acides) dans chaque séquence,
+        tout l'alphabet est compté en un seul passage au premier appel
+
+        Args:
+            acides: si True, ce sont les acides aminés des séquences traduites qui sont comptés
+            element: si donné, seulement la liste des nombres de cet élément
+
+        Returns:
+            Dictionnaire élément -> liste (comme nombre_element_echantillon), ou la liste de element
+        '''
+        if acides not in self._nombres:
+            self._nombres[acides] = nombre_element_echantillon(self.sequences(acides), AMINO_ACIDS if acides else NUCLEOTIDES)
+        if element is None:
+            return self._nombres[acides]
+        if element not in self._nombres[acides]:
+            return nombre_element_echantillon(self.sequences(acides), [element])[element]
+        return self._nombres[acides][element]
+
+    def proportions(self, acides=False, sampler=None):
+        '''Proportion moyenne de chaque nucléotide (ou acide aminé si acides) dans les séquences,
+        tout l'alphabet est calculé au premier appel (la proportion d'un élément ne dépend pas du sampler)
+
+        Args:
+            acides: si True, ce sont les proportions des acides aminés des séquences traduites
+            sampler: les éléments voulus (par défaut tout l'alphabet)
+
+        Returns:
+            Dictionnaire élément -> proportion moyenne (comme call_stat_prop avec moyenne)
+        '''
+        alphabet = AMINO_ACIDS if acides else NUCLEOTIDES
+        if acides not in self._proportions:
+            self._proportions[acides] = call_stat_prop(moyenne, self.sequences(acides), alphabet)
+        sampler = alphabet if sampler is None else sampler
+        if any(element not in self._proportions[acides] for element in sampler):
+            return call_stat_prop(moyenne, self.sequences(acides), sampler)
+        return {element: self._proportions[acides][element] for element in elements(sampler)}
+
+    def charge(self):
+        '''Calcule toutes les données, avant de les partager entre des processus (elles sont copiées
+        avec l'objet : rien n'est recalculé dans les processus)'''
+        for acides in (False, True):
+            self.nombres(acides)
+            self.proportions(acides)
+        return self
+
+
+def choix_tranches(valeurs, précision, interactif=True):
+    '''Fonction qui calcule les tranches et les barres d'un histogramme des valeurs, en proposant
+    d'ajuster la précision à son maximum (une tranche par valeur possible)
 
-def plot_moyenne_acide(fasta):
+    Args:
+        valeurs : liste des valeurs
+        précision : nombre de barres demandé, None pour la précision maximum
+        interactif : si False, aucune question n'est posée : la précision n'est ajustée que si elle
+        excède le maximum
+
+    Returns:
+        Tuple (tranches, barres), voir histogramme
+    '''
+    minimum = min(valeurs)
+    maximum = max(valeurs)+1
+    nb_tranches = maximum - minimum if précision is None else précision
+    boolean = 'n'
+
+    if nb_tranches > maximum - minimum :
+        boolean = 'y'
+        if interactif:
+            print('La précision excède la précision maximum ( max = ',maximum - minimum,") pour cet échantillon!\n")
+            boolean = input("Ajuster la précision au maximum? (Vivement recommandé y/n \n")
+
+    if nb_tranches < maximum - minimum and interactif:
+        print("La précision n'est pas maximale pour cet échantillon! ( max = ",maximum - minimum,") \n")
+        boolean = input("Ajuster la précision au maximum? y/n \n")
+
+    if boolean == 'y':
+        nb_tranches = maximum-minimum
+        if interactif:
+            print("précision ajustée, reprise du calcul...")
+
+    return histogramme(valeurs, minimum, maximum, nb_tranches)
+
+
+def affiche(fichier=None):
+    '''Fonction qui affiche la figure courante, ou l'enregistre dans fichier (sans fenêtre) puis la ferme'''
+    if fichier is None:
+        plt.show()
+    else:
+        plt.savefig(fichier, bbox_inches='tight', dpi=DPI)
+        plt.close()
+
+
+def plot_moyenne_acide(fasta, donnees=None, fichier=None):
     '''Fonction qui trace un histogramme de la moyenne des acides aminés présents dans les séquences du fichier fasta.
 
     Args:
         fasta : le fichier fasta à étudier
+        donnees : les données déjà calculées du fichier (DonneesFasta), optionnel
+        fichier : si donné, la figure est enregistrée dans ce fichier au lieu d'être affichée
 
     Returns:
         Un histogramme de la moyenne des acides aminés présents dans les séquences du fichier fasta.
     '''
-    
-    genome = fasta_to_genome(fasta)
-    trad = codons_echantillon(genome)
-    dico = call_stat(moyenne, trad, AMINO_ACIDS)
+
+    donnees = DonneesFasta(fasta) if donnees is None else donnees
+    dico = call_stat_on_echantillon(moyenne, donnees.nombres(acides=True))
 
     barwidth = 0.45
 
-    br = np.arange(len(dico)) 
+    br = np.arange(len(dico))
+
 
-    
     plt.bar([i for i in dico],[dico[i] for i in dico], width = barwidth, label = str(fasta))
 
 
-    plt.xlabel('Branch', fontweight ='bold') 
+    plt.xlabel('Branch', fontweight ='bold')
     plt.ylabel('Students passed', fontweight ='bold')
 
-    plt.xticks([r + 0.0025 for r in range(len(dico))], 
+    plt.xticks([r + 0.0025 for r in range(len(dico))],
                [i for i in dico])
 
-    plt.show()
+    affiche(fichier)
+
 
-    
 
 
 
-def plot_histo_nb_nucleotide(fasta, nucleotide, précision):
+def plot_histo_nb_nucleotide(fasta, nucleotide, précision, donnees=None, fichier=None):
     '''Fonction qui trace un histogramme du nombre de séquences d'un fichier fasta en fonction du nombre de nucléotide
     entré en paramètre qu'elle possède.
 
     Args:
         fasta : le fichier fasta à étudier
-        précision : nombre de barres à calculer pour l'histogramme. Plus il y en a, plus l'histogramme est précis
-        mais le calcul peut être plus long. Si nécessaire, il sera proposé lors de l'exécution de la fonction d'ajuster
+        précision : nombre de barres à calculer pour l'histogramme (None pour le maximum). Plus il y en a, plus
+        l'histogramme est précis. Si nécessaire, il sera proposé lors de l'exécution de la fonction d'ajuster
         automatiquement la précision à son maximum.
+        donnees : les données déjà calculées du fichier (DonneesFasta), optionnel
+        fichier : si donné, la figure est enregistrée dans ce fichier au lieu d'être affichée, sans question
 
     Returns:
         Un histogramme présentant les nombre de séquences d'un fichier fasta en fonction du nombre de nucléotide
     entré en paramètre qu'elle possède.
     '''
     #plot_histo_nb_nucleotide('1000_sequences.fasta', 'G', 10000)
-    
-    
-    genome = fasta_to_genome(fasta)
-    dico = nombre_element_echantillon(genome, [nucleotide])
-    
-    print("Comptage des nucléotides terminé, calcul des barres pour l'histogramme en cours...")
 
-    minimum = min(dico[nucleotide])
-    maximum = max(dico[nucleotide])+1
 
-    nb_tranches = précision
-    boolean = 'y'
+    donnees = DonneesFasta(fasta) if donnees is None else donnees
+    valeurs = donnees.nombres(element=nucleotide)
 
-    if nb_tranches > maximum - minimum :
-        print('La précision excède la précision maximum ( max = ',maximum - minimum,") pour cet échantillon!\n")
-        boolean = input("Ajuster la précision au maximum? (Vivement recommandé y/n \n")
+    if fichier is None:
+        print("Comptage des nucléotides terminé, calcul des barres pour l'histogramme en cours...")
 
-    if nb_tranches < maximum - minimum :
-        print("La précision n'est pas maximale pour cet échantillon! ( max = ",maximum - minimum,") \n")
-        boolean = input("Ajuster la précision au maximum? (Peut impacter fortement les performances au delà de 10000) y/n \n")
-        
-    if boolean == 'y':
-        nb_tranches = maximum-minimum
-        print("précision ajustée, reprise du calcul...")
-
-    taille_tranches = (maximum - minimum)/ nb_tranches
-
-    tranches = [int(minimum + i*taille_tranches) for i in range(nb_tranches)]
-    tranches[-1] += 1
+    tranches, barres = choix_tranches(valeurs, précision, interactif=fichier is None)
 
-    barres = [0 for i in range(nb_tranches)]
 
-    for i in dico[nucleotide]:
-        for j in range(nb_tranches):
-            if int(minimum + j*taille_tranches) <= i < int(minimum + (j+1)*taille_tranches):
-                barres[j] += 1
-                break
 
-
-    
     plt.bar(tranches,barres)
     plt.xlabel("Nombre de nucléotide '" + nucleotide + "' dans la séquence")
     plt.ylabel('Nombre de séquences')
     plt.title("Nombre de séquences possédant un nombe de nucléotide '" + nucleotide + "' donné pour le fichier '" + fasta +"'")
-    plt.show()
+    affiche(fichier)
 
 
 
 
 
-def plot_histo_nb_acide(fasta, acide_aminé, précision):
+def plot_histo_nb_acide(fasta, acide_aminé, précision, donnees=None, fichier=None):
     '''Fonction qui trace un histogramme du nombre de séquences d'un fichier fasta en fonction du nombre d'acide aminé
     entré en paramètre qu'elle possède.
 
     Args:
         fasta : le fichier fasta à étudier
-        précision : nombre de barres à calculer pour l'histogramme. Plus il y en a, plus l'histogramme est précis
-        mais le calcul peut être plus long. Si nécessaire, il sera proposé lors de l'exécution de la fonction d'ajuster
+        précision : nombre de barres à calculer pour l'histogramme (None pour le maximum). Plus il y en a, plus
+        l'histogramme est précis. Si nécessaire, il sera proposé lors de l'exécution de la fonction d'ajuster
         automatiquement la précision à son maximum.
+        donnees : les données déjà calculées du fichier (DonneesFasta), optionnel
+        fichier : si donné, la figure est enregistrée dans ce fichier au lieu d'être affichée, sans question
 
     Returns:
         Un histogramme présentant les nombre de séquences d'un fichier fasta en fonction du nombre d'acide aminé
     entré en paramètre qu'elle possède.
     '''
-    
-    #exemple : plot_histo_nb_acide('1000_sequences.fasta', 'M', 100)
-    genome = fasta_to_genome(fasta)
-    trad = codons_echantillon(genome)
-    dico = nombre_element_echantillon(trad, [acide_aminé])
-
-    print("Comptage des acides aminés terminé, calcul des barres pour l'histogramme en cours...")
-    
-    minimum = min(dico[acide_aminé])
-    maximum = max(dico[acide_aminé])+1
-
-    nb_tranches = précision
-    boolean = 'n'
-
-    if nb_tranches > maximum - minimum :
-        print('La précision excède la précision maximum ( max = ',maximum - minimum,") pour cet échantillon!\n")
-        boolean = input("Ajuster la précision au maximum? (Vivement recommandé y/n \n")
-
-    if nb_tranches < maximum - minimum :
-        print("La précision n'est pas maximale pour cet échantillon! ( max = ",maximum - minimum,") \n")
-        boolean = input("Ajuster la précision au maximum? (Peut impacter fortement les performances au delà de 10000) y/n \n")
-        
-    if boolean == 'y':
-        nb_tranches = maximum-minimum
-        print("précision ajustée, reprise du calcul...")
 
-    taille_tranches = (maximum - minimum)/ nb_tranches
-
-    tranches = [int(minimum + i*taille_tranches) for i in range(nb_tranches)]
-    tranches[-1] += 1
+    #exemple : plot_histo_nb_acide('1000_sequences.fasta', 'M', 100)
+    donnees = DonneesFasta(fasta) if donnees is None else donnees
+    valeurs = donnees.nombres(acides=True, element=acide_aminé)
 
-    barres = [0 for i in range(nb_tranches)]
+    if fichier is None:
+        print("Comptage des acides aminés terminé, calcul des barres pour l'histogramme en cours...")
 
-    for i in dico[acide_aminé]:
-        for j in range(nb_tranches):
-            if int(minimum + j*taille_tranches) <= i < int(minimum + (j+1)*taille_tranches):
-                barres[j] += 1
-                break
+    tranches, barres = choix_tranches(valeurs, précision, interactif=fichier is None)
 
     plt.bar(tranches,barres)
     plt.xlabel("Nombre d'acide aminé '" + acide_aminé + "' dans la séquence")
     plt.ylabel('Nombre de séquences')
     plt.title("Nombre de séquences possédant un nombe d'acide aminé '" + acide_aminé + "' donné pour le fichier '" + fasta +"'")
-    plt.show()
+    affiche(fichier)
 
 
 
 
 
-def plot_histo_taille_nucl(fasta, précision):
+def plot_histo_taille_nucl(fasta, précision, donnees=None, fichier=None):
 
     '''Fonction qui trace un histogramme du nombre de séquences d'un fichier fasta en fonction de la taille de celles-ci
     en nucléotides.
 
     Args:
         fasta : le fichier fasta à étudier
-        précision : nombre de barres à calculer pour l'histogramme. Plus il y en a, plus l'histogramme est précis
-        mais le calcul peut être plus long. Si nécessaire, il sera proposé lors de l'exécution de la fonction d'ajuster
+        précision : nombre de barres à calculer pour l'histogramme (None pour le maximum). Plus il y en a, plus
+        l'histogramme est précis. Si nécessaire, il sera proposé lors de l'exécution de la fonction d'ajuster
         automatiquement la précision à son maximum.
+        donnees : les données déjà calculées du fichier (DonneesFasta), optionnel
+        fichier : si donné, la figure est enregistrée dans ce fichier au lieu d'être affichée, sans question
 
     Returns:
         Un histogramme présentant les nombre de séquences d'un fichier fasta en fonction de la taille de celles-ci
         en nucléotides.
     '''
-    
+
     '''Plot un hstogramme de la taille chaque séquence dans un fichier fasta, avec une précision donnée.'''
     #exemple : plot_histo_taille_nucl('1000_sequences.fasta', 10000)
-    genome = fasta_to_genome(fasta)
-    liste = taille_ensemble(genome)
+    donnees = DonneesFasta(fasta) if donnees is None else donnees
+    liste = taille_ensemble(donnees.genome)
 
-    print("Détermination de la taille des séquences terminé, calcul des barres pour l'histogramme en cours...")
+    if fichier is None:
+        print("Détermination de la taille des séquences terminé, calcul des barres pour l'histogramme en cours...")
 
-    minimum = min(liste)
-    maximum = max(liste)+1
-    nb_tranches = précision
-    boolean = 'n'
-
-    if nb_tranches > maximum - minimum :
-        print('La précision excède la précision maximum ( max = ',maximum - minimum,") pour cet échantillon!\n")
-        boolean = input("Ajuster la précision au maximum? (Vivement recommandé y/n \n")
-
-    if nb_tranches < maximum - minimum :
-        print("La précision n'est pas maximale pour cet échantillon! ( max = ",maximum - minimum,") \n")
-        boolean = input("Ajuster la précision au maximum? (Peut impacter fortement les performances au delà de 10000) y/n \n")
-        
-    if boolean == 'y':
-        nb_tranches = maximum-minimum
-        print("précision ajustée, reprise du calcul...")
-
-    taille_tranches = (maximum - minimum)/ nb_tranches
-
-    tranches = [int(minimum + i*taille_tranches) for i in range(nb_tranches)]
-    tranches[-1] += 1
-
-    barres = [0 for i in range(nb_tranches)]
-
-    for i in liste:
-        for j in range(nb_tranches):
-            if int(minimum + j*taille_tranches) <= i < int(minimum + (j+1)*taille_tranches):
-                barres[j] += 1
-                break
+    tranches, barres = choix_tranches(liste, précision, interactif=fichier is None)
 
     plt.bar(tranches,barres)
     plt.xlabel('Taille de la séquence (en nucléotides)')
     plt.ylabel('Nombre de séquences')
     plt.title("Nombre de séquences en fonction de leur taille en nucléotides pour le fichier '" + fasta +"'")
-    plt.show()
+    affiche(fichier)
 
 
 
 
-def plot_histo_taille_acid(fasta, précision):
+def plot_histo_taille_acid(fasta, précision, donnees=None, fichier=None):
     '''Fonction qui trace un histogramme du nombre de séquences d'un fichier fasta en fonction de la taille de celles-ci
     en acides aminés.
 
     Args:
         fasta : le fichier fasta à étudier
-        précision : nombre de barres à calculer pour l'histogramme. Plus il y en a, plus l'histogramme est précis
-        mais le calcul peut être plus long. Si nécessaire, il sera proposé lors de l'exécution de la fonction d'ajuster
+        précision : nombre de barres à calculer pour l'histogramme (None pour le maximum). Plus il y en a, plus
+        l'histogramme est précis. Si nécessaire, il sera proposé lors de l'exécution de la fonction d'ajuster
         automatiquement la précision à son maximum.
+        donnees : les données déjà calculées du fichier (DonneesFasta), optionnel
+        fichier : si donné, la figure est enregistrée dans ce fichier au lieu d'être affichée, sans question
 
     Returns:
         Un histogramme présentant les nombre de séquences d'un fichier fasta en fonction de la taille de celles-ci
         en acides aminés.
     '''
 
-    
-    #exemple : plot_histo_taille_acid('1000_sequences.fasta', 10000)
-    genome = fasta_to_genome(fasta)
-    trad = codons_echantillon(genome)
-    liste = taille_ensemble(trad)
-
-    print("Détermination de la taille des séquences terminé, calcul des barres pour l'histogramme en cours...")
-
-    minimum = min(liste)
-    maximum = max(liste)+1
-    nb_tranches = précision
-    boolean = 'n'
-
-    if nb_tranches > maximum - minimum :
-        print('La précision excède la précision maximum ( max = ',maximum - minimum,") pour cet échantillon!\n")
-        boolean = input("Ajuster la précision au maximum? (Vivement recommandé y/n \n")
-
-    if nb_tranches < maximum - minimum :
-        print("La précision n'est pas maximale pour cet échantillon! ( max = ",maximum - minimum,") \n")
-        boolean = input("Ajuster la précision au maximum? (Peut impacter fortement les performances au delà de 10000) y/n \n")
-        
-    if boolean == 'y':
-        nb_tranches = maximum-minimum
-        print("précision ajustée, reprise du calcul...")
-
-    taille_tranches = (maximum - minimum)/ nb_tranches
 
-    tranches = [int(minimum + i*taille_tranches) for i in range(nb_tranches)]
-    tranches[-1] += 1
+    #exemple : plot_histo_taille_acid('1000_sequences.fasta', 10000)
+    donnees = DonneesFasta(fasta) if donnees is None else donnees
+    liste = taille_ensemble(donnees.trad)
 
-    barres = [0 for i in range(nb_tranches)]
+    if fichier is None:
+        print("Détermination de la taille des séquences terminé, calcul des barres pour l'histogramme en cours...")
 
-    for i in liste:
-        for j in range(nb_tranches):
-            if int(minimum + j*taille_tranches) <= i < int(minimum + (j+1)*taille_tranches):
-                barres[j] += 1
-                break
+    tranches, barres = choix_tranches(liste, précision, interactif=fichier is None)
 
     plt.bar(tranches,barres)
     plt.xlabel('Taille de la séquence (en acides aminés)')
     plt.ylabel('Nombre de séquences')
     plt.title("Nombre de séquences en fonction de leur taille en acides aminés pour le fichier '" + fasta +"'")
-    plt.show()
+    affiche(fichier)
 
 
 
 
 
-def plot_proportions_nucleotide(fasta, sampler):
+def plot_proportions_nucleotide(fasta, sampler, donnees=None, fichier=None):
     '''Fonction qui trace un diagramme circulaire des proportion moyennes des nucléotides présents dans les séquences
     d'un fichier fasta.
 
@@ -298,27 +337,30 @@ def plot_proportions_nucleotide(fasta, sampler):
         fasta : le fichier fasta à étudier
         sampler : string ou liste comportant les nucléotides à prendre en compte dans le calcul. (Entrer
         sampler = NUCLEOTIDES pour avoir tous les acides aminés.)
+        donnees : les données déjà calculées du fichier (DonneesFasta), optionnel
+        fichier : si donné, la figure est enregistrée dans ce fichier au lieu d'être affichée
 
     Returns:
         Un diagramme circulaire des proportions moyennes des nucléotides. Si un acide aminé n'apparait pas dans le
         diagramme c'est qu'il n'existe pas dans les séquences étudiées
     '''
     #exemple : plot_proportions_nucleotide('1000_sequences.fasta', NUCLEOTIDES)
-    genome = fasta_to_genome(fasta)
-    dico = call_stat_prop(moyenne, genome, sampler)
+    donnees = DonneesFasta(fasta) if donnees is None else donnees
+    dico = donnees.proportions(False, sampler)
 
-    print(dico)
+    if fichier is None:
+        print(dico)
 
     plt.pie([dico[i] for i in dico if dico[i] != 0], labels = [i for i in dico if dico[i] != 0], autopct='%1.1f%%', startangle=90)
 
     plt.title("Diagramme circulaire de la proportion des nucléotides pour le fichier '" + fasta +"'")
-    plt.show()
+    affiche(fichier)
 
 
 
 
 
-def plot_proportions_acide(fasta, sampler):
+def plot_proportions_acide(fasta, sampler, donnees=None, fichier=None):
     '''Fonction qui trace un diagramme circulaire des proportion moyennes des acides aminés présents dans les séquences
     d'un fichier fasta.
 
@@ -326,17 +368,113 @@ def plot_proportions_acide(fasta, sampler):
         fasta : le fichier fasta à étudier
         sampler : string ou liste comportant les Acides aminés à prendre en compte dans le calcul. (Entrer
         sampler = AMINO_ACIDS pour avoir tous les acides aminés.)
+        donnees : les données déjà calculées du fichier (DonneesFasta), optionnel
+        fichier : si donné, la figure est enregistrée dans ce fichier au lieu d'être affichée
 
     Returns:
         Un diagramme circulaire des proportions moyennes des acides aminés. Si un acide aminé n'apparait pas dans le
         diagramme c'est qu'il n'existe pas dans les séquences étudiées
     '''
     #exemple : plot_proportions_acide('1000_sequences.fasta', AMINO_ACIDS)
-    genome = fasta_to_genome(fasta)
-    trad = codons_echantillon(genome)
-    dico = call_stat_prop(moyenne, trad, sampler)
+    donnees = DonneesFasta(fasta) if donnees is None else donnees
+    dico = donnees.proportions(True, sampler)
 
     plt.pie([dico[i] for i in dico if dico[i] != 0], labels = [i for i in dico if dico[i] != 0], autopct='%1.1f%%', startangle=90)
     plt.title("Diagramme circulaire de la proportion des acides aminés pour le fichier '" + fasta +"'")
-    plt.show()
+    affiche(fichier)
+
+
+
+
 
+#####################################
+# MODE SANS FENÊTRE (BATCH)         #
+#####################################
+
+DONNEES = None  # le DonneesFasta partagé par les processus de plot_fasta
+
+
+def _init_rendu(donnees):
+    '''Initialisation d'un processus de rendu : backend Agg (sans fenêtre) et données partagées'''
+    global DONNEES
+    plt.switch_backend("Agg")
+    DONNEES = donnees
+
+
+def _rendu(plot_func, args, fichier):
+    '''Trace une figure dans un processus de rendu'''
+    plot_func(DONNEES.fasta, *args, donnees=DONNEES, fichier=fichier)
+    return fichier
+
+
+def figures_fasta(donnees, dossier, précision=None):
+    '''Fonction qui liste toutes les figures d'un fichier fasta
+
+    Args:
+        donnees : les données du fichier (DonneesFasta)
+        dossier : le dossier des images
+        précision : nombre de barres des histogrammes (None pour le maximum)
+
+    Returns:
+        Liste de tuples (fonction plot_*, arguments, fichier image)
+    '''
+    figures = [(plot_moyenne_acide, (), "moyenne_acide"),
+               (plot_histo_taille_nucl, (précision,), "histo_taille_nucl"),
+               (plot_histo_taille_acid, (précision,), "histo_taille_acid"),
+               (plot_proportions_nucleotide, (NUCLEOTIDES,), "proportions_nucleotide"),
+               (plot_proportions_acide, (AMINO_ACIDS,), "proportions_acide")]
+
+    # Un histogramme par élément présent dans au moins une séquence
+    for acides, plot_func in ((False, plot_histo_nb_nucleotide), (True, plot_histo_nb_acide)):
+        for element, valeurs in donnees.nombres(acides).items():
+            if any(valeurs):
+                nom = "stop" if element == "*" else element
+                figures.append((plot_func, (element, précision), plot_func.__name__[5:] + "_" + nom))
+
+    return [(plot_func, args, os.path.join(dossier, nom + ".png")) for plot_func, args, nom in figures]
+
+
+def plot_fasta(fasta, dossier, précision=None, processes=None):
+    '''Fonction qui enregistre toutes les figures d'un fichier fasta (histogrammes et diagrammes
+    circulaires) en images PNG, sans fenêtre ni question (backend Agg). Les séquences sont lues,
+    traduites et comptées une seule fois, puis les figures sont tracées en parallèle par un pool
+    de processus qui partagent ces données. Sans pool, le backend est rétabli à la fin (les figures
+    ouvertes sont fermées par le changement de backend).
+
+    Args:
+        fasta : le fichier fasta à étudier
+        dossier : le dossier des images (créé si besoin)
+        précision : nombre de barres des histogrammes (None pour le maximum)
+        processes : nombre de processus (par défaut tous les coeurs, 1 : pas de pool)
+
+    Returns:
+        La liste des fichiers images écrits
+    '''
+    #exemple : plot_fasta('1000_sequences.fasta', 'figures')
+    if processes is None:
+        processes = os.cpu_count()
+
+    donnees = DonneesFasta(fasta, processes).charge()
+    os.makedirs(dossier, exist_ok=True)
+    taches = figures_fasta(donnees, dossier, précision)
+
+    if processes <= 1 or len(taches) <= 1:
+        global DONNEES
+        backend = plt.get_backend()
+        _init_rendu(donnees)
+        try:
+            return [_rendu(*tache) for tache in taches]
+        finally:
+            # Ce processus retrouve son backend (affiche() et les fenêtres marchent de nouveau)
+            DONNEES = None
+            plt.switch_backend(backend)
+
+    with Pool(min(processes, len(taches)), initializer=_init_rendu, initargs=(donnees,)) as pool:
+        return pool.starmap(_rendu, taches)
+
+
+if __name__ == '__main__':
+    # python -m app.stat_plot fichier.fasta [dossier] [précision]
+    fichiers = plot_fasta(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "figures",
+                          int(sys.argv[3]) if len(sys.argv) > 3 else None)
+    print(f"{len(fichiers)} figure(s) enregistrée(s)")
@@ -1,6 +1,7 @@
 from src.stats import *
+from src.cache import *
 
-arns = fasta_to_genome("genome/200_sequences.fasta")
+arns = cached_fasta_to_genome("genome/200_sequences.fasta")
 
 ####################### TAILLE DE L'ARNm #######################
 stats_taille = perform_all_stats_taille(arns)
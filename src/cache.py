@@ -0,0 +1,155 @@
+import hashlib
+import os
+import numpy as np
+from src.globals import *
+from src.utility import *
+
+"""
+* Persistent cache of the parsed genomes, shared between runs
+    The transcribed sequences (ARNm) of a fasta file are stored in CACHE_DIR as
+    two .npy files named after a key computed from the path, the size and the
+    mtime of the fasta (the cache entry is dropped as soon as the fasta changes):
+    - <key>.npy:         every sequence concatenated (uint8)
+    - <key>.offsets.npy: the n + 1 offsets of the sequences in the first array
+
+    A hit only loads the arrays (mmap) and cuts the sequences. The least recently
+    used entries are evicted when the cache exceeds CACHE_MAX_SIZE bytes.
+"""
+
+
+def cache_key(filename):
+    '''Function that computes the cache key of a file
+
+    Args:
+        filename: the fasta file
+
+    Returns:
+        The key (hexadecimal string)
+    '''
+    st = os.stat(filename)
+    signature = f"{os.path.realpath(filename)}\t{st.st_size}\t{st.st_mtime_ns}"
+    return hashlib.blake2b(signature.encode(), digest_size=16).hexdigest()
+
+
+def cached_genome(filename, cache_dir=None, max_size=None):
+    '''Function that returns the transcribed sequences of a fasta file, parsed only
+    the first time and then loaded from the cache
+
+    Args:
+        filename: the fasta file that contain the genomic data
+        cache_dir: the cache folder (default: CACHE_DIR)
+        max_size: maximum size of the cache in bytes (default: CACHE_MAX_SIZE)
+
+    Returns:
+        List of the transcribed sequences (ARNm), in file order
+    '''
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    key = cache_key(filename)
+    data_file = os.path.join(cache_dir, key + ".npy")
+    offsets_file = os.path.join(cache_dir, key + ".offsets.npy")
+
+    try:
+        data = np.load(data_file, mmap_mode="r")
+        offsets = np.load(offsets_file).tolist()
+        genome = _split(data, offsets)
+        os.utime(data_file)     # most recently used
+        return genome
+    except (OSError, ValueError):
+        pass
+
+    genome = list(iter_genomes(filename))
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        data = np.frombuffer("".join(genome).encode("latin-1"), dtype=np.uint8)
+        offsets = np.cumsum([0] + [len(sequence) for sequence in genome], dtype=np.int64)
+        # The data file is written last (and atomically): it marks a complete entry
+        _save(offsets_file, offsets)
+        _save(data_file, data)
+        evict_cache(cache_dir, CACHE_MAX_SIZE if max_size is None else max_size, keep=key)
+    except OSError:
+        pass    # read-only folder: nothing is cached
+    except UnicodeEncodeError:
+        pass    # non latin-1 characters: the sequences can not be stored one byte per character
+
+    return genome
+
+
+def cached_fasta_to_genome(filename):
+    '''Same as fasta_to_genome but goes through the cache (see cached_genome)
+
+    Args:
+        filename: the fasta file that contain the genomic data
+
+    Returns:
+        The first sequence if the file contains only one, a table of sequences otherwise
+    '''
+    genome = cached_genome(filename)
+
+    if len(genome) == 1:
+        return genome[0]
+    return genome
+
+
+def evict_cache(cache_dir=None, max_size=None, keep=None):
+    '''Function that removes the least recently used entries of the cache until
+    it fits in max_size bytes
+
+    Args:
+        cache_dir: the cache folder (default: CACHE_DIR)
+        max_size: maximum size of the cache in bytes (default: CACHE_MAX_SIZE)
+        keep: key of an entry that must not be removed (e.g. the one just written)
+
+    Returns:
+        The number of entries removed
+    '''
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    max_size = CACHE_MAX_SIZE if max_size is None else max_size
+    entries = []
+
+    for name in os.listdir(cache_dir):
+        if name.endswith(".npy") and not name.endswith(".offsets.npy"):
+            key = name[:-len(".npy")]
+            files = [os.path.join(cache_dir, key + ".npy"), os.path.join(cache_dir, key + ".offsets.npy")]
+            stats = [os.stat(f) for f in files if os.path.exists(f)]
+            if stats:
+                entries.append((stats[0].st_mtime_ns, key, files, sum(st.st_size for st in stats)))
+
+    total = sum(entry[3] for entry in entries)
+    removed = 0
+
+    for _, key, files, size in sorted(entries):
+        if total <= max_size:
+            break
+        if key == keep:
+            continue
+        for f in files:
+            if os.path.exists(f):
+                os.remove(f)
+        total -= size
+        removed += 1
+
+    return removed
+
+
+def clear_cache(cache_dir=None):
+    '''Function that removes every entry of the cache
+
+    Args:
+        cache_dir: the cache folder (default: CACHE_DIR)
+    '''
+    evict_cache(cache_dir, -1)
+
+
+def _save(filename, array):
+    '''Writes a .npy file atomically (temporary file renamed)'''
+    tmp = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, filename)
+
+
+def _split(data, offsets):
+    '''Cuts the concatenated sequences back into a list of strings'''
+    raw = data.tobytes().decode("latin-1")
+    return [raw[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
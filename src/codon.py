@@ -1,6 +1,48 @@
-from Bio import SeqIO
+import numpy as np
+from itertools import product
 from src.utility import *
 from src.globals import *
+from src.kmer import kmers
+from src.orf import *
+from src.packed import ENCODE_TABLE
+
+"""
+* Vectorized translation
+    Every base is mapped to its 2-bit code (see kmer.py), the codons of a frame are seen
+    as rows of 3 codes (reshape of the buffer), their 6-bit index 16*c0 + 4*c1 + c2 gives
+    the amino acid in the 64 entries CODON_TABLE. Only the codons with a non AUGC base go
+    through the dictionary CODONS_TO_AMINO_ACIDS (masked fallback), so the results are the
+    same as the per-codon loops.
+
+* IUPAC translation (iupac=True)
+    The 15 IUPAC codes (see IUPAC) are numbered in the same way and the 15^3 codons are
+    precomputed in IUPAC_CODON_TABLE: an ambiguous codon gives the amino acid of every
+    codon it stands for when they all agree (GCN -> A, UAR -> *), X otherwise. The
+    ambiguous codons are then translated (one lookup each) instead of being left out.
+"""
+
+# ASCII code of the amino acid of each codon index (same order as kmers(3))
+CODON_TABLE = np.frombuffer("".join(CODONS_TO_AMINO_ACIDS[codon] for codon in kmers(3)).encode(), dtype=np.uint8)
+
+
+def acide_iupac(codon):
+    """Function that returns the amino acid of an IUPAC codon: the amino acid of every codon it stands for
+    if they all agree, X otherwise"""
+    acides = {CODONS_TO_AMINO_ACIDS[a + b + c] for a in IUPAC[codon[0]] for b in IUPAC[codon[1]] for c in IUPAC[codon[2]]}
+    return acides.pop() if len(acides) == 1 else "X"
+
+
+# Amino acid of each of the 15^3 IUPAC codons (same as CODONS_TO_AMINO_ACIDS for the AUGC codons)
+IUPAC_CODONS_TO_AMINO_ACIDS = {"".join(codon): acide_iupac(codon) for codon in product(IUPAC, repeat=3)}
+
+# Index of each IUPAC code (order of IUPAC), 255 for any other character
+IUPAC_ENCODE_TABLE = np.full(256, 255, dtype=np.uint8)
+for code, base in enumerate(IUPAC):
+    IUPAC_ENCODE_TABLE[ord(base)] = code
+
+# ASCII code of the amino acid of each IUPAC codon index 225*c0 + 15*c1 + c2
+IUPAC_CODON_TABLE = np.frombuffer("".join(IUPAC_CODONS_TO_AMINO_ACIDS.values()).encode(), dtype=np.uint8)
+
 
 def start_to_stop(ARNm):
     """Function that returns sequences of an ARNm from start to stop codons
@@ -12,37 +54,138 @@ def start_to_stop(ARNm):
         List of valid sequences
     """
     ARNm = ''.join(ARNm)
+    return [ARNm[i:j] for i, j in start_to_stop_positions(ARNm)]
+
+
+def start_to_stop_positions(ARNm):
+    """Function that returns the positions of the sequences given by start_to_stop
+
+    Args:
+        ARNm: ARN sequence string
+
+    Returns:
+        List of (start, end) positions, the sequence is ARNm[start:end] (stop codon excluded)
+    """
+    codes = codes_of(ARNm)
+    if codes is not None:
+        return start_to_stop_glouton(codes)     # same scan on the precomputed start and stop positions (orf.py)
+
     length = len(ARNm)
     l = []
-    i = 0
+    i = ARNm.find('AUG')
+
+    while (-1 < i < (length-4)) :
+        j = i + 3
+
+        while (ARNm[j:j+3] not in STOP_CODONS) and (j < length-3):
+            j += 3
+
+        if ARNm[j:j+3] in STOP_CODONS:
+            l.append((i, j))
+            i = j + 3
+
+        if j >= length-3:
+            break
+        i = ARNm.find('AUG', i)     # next start (the positions in between are not AUG)
+    return l
+
+
+def traduction_frame(codes, iupac=False):
+    """Function that translates the codons of a buffer through CODON_TABLE (an incomplete last codon is ignored)
+
+    Args:
+        codes: uint8 numpy array, the ASCII code of each base (see codes_of)
+        iupac: if True the codons are translated through IUPAC_CODON_TABLE
+
+    Returns:
+        Tuple (amino acids, ambiguous): uint8 array of the ASCII code of the amino acid of each codon,
+        and the boolean mask of the codons the table does not cover, i.e. with a non AUGC base
+        (a non IUPAC base if iupac), their amino acid is not computed
+    """
+    n = len(codes) // 3
+    if iupac:
+        bases = IUPAC_ENCODE_TABLE[codes[:3 * n]].reshape(n, 3)
+        ambiguous = (bases == 255).any(axis=1)
+        bases = np.minimum(bases, len(IUPAC) - 1).astype(np.intp)
+        return IUPAC_CODON_TABLE[(bases[:, 0] * 15 + bases[:, 1]) * 15 + bases[:, 2]], ambiguous
+
+    bases = ENCODE_TABLE[codes[:3 * n]].reshape(n, 3)
+    ambiguous = (bases == 255).any(axis=1)
+    bases = (bases & 3).astype(np.intp)
+    return CODON_TABLE[(bases[:, 0] << 4) | (bases[:, 1] << 2) | bases[:, 2]], ambiguous
+
+
+def traduction(codes, ignore_ambiguites=True, iupac=False):
+    """Function that translates the codons of a buffer (first frame, an incomplete last codon is ignored)
+
+    Args:
+        codes: uint8 numpy array, the ASCII code of each base (see codes_of)
+        ignore_ambiguites: if True the codons with an ambiguity code are left out (like codons_v3),
+            otherwise they are looked up in CODONS_TO_AMINO_ACIDS (KeyError, like codons_v2)
+        iupac: if True the codons with an ambiguity code are translated (see IUPAC_CODON_TABLE),
+            ignore_ambiguites then only applies to the codons with a non IUPAC character (gap, other letter)
+
+    Returns:
+        The amino acid sequence (str)
+    """
+    amino_acids, ambiguous = traduction_frame(codes, iupac)
+
+    if ambiguous.any():
+        keep = np.ones(len(amino_acids), dtype=bool)
+        for k in np.flatnonzero(ambiguous).tolist():
+            codon = codes[3 * k:3 * k + 3].tobytes().decode("latin-1")
+            if ignore_ambiguites and (codon not in IUPAC_CODONS_TO_AMINO_ACIDS if iupac else not try_AUGC(codon)):
+                keep[k] = False
+            else:
+                amino_acids[k] = ord((IUPAC_CODONS_TO_AMINO_ACIDS if iupac else CODONS_TO_AMINO_ACIDS)[codon])
+        amino_acids = amino_acids[keep]
+
+    return amino_acids.tobytes().decode("latin-1")
+
+
+def traduction_orfs(ARNm, iupac=False):
+    """Function that translates every sequence given by start_to_stop: each frame of the ARNm is
+    translated once, the sequences are slices of their frame
 
-    while (i < (length-4)) :
-        if ARNm[i:i+3] == 'AUG':
-            j = i + 3
+    Args:
+        ARNm: ARN sequence string
+        iupac: if True the codons with an ambiguity code are translated (see IUPAC_CODON_TABLE)
 
-            while (ARNm[j:j+3] not in ['UGA', 'UAG', 'UAA', 'UAR']) and (j < length-3):
-                j += 3
+    Returns:
+        List of the amino acid sequences (the codons with an ambiguity code are left out unless iupac),
+        None if the sequence can not be seen as a buffer (see codes_of)
+    """
+    codes = codes_of(ARNm)
+    if codes is None:
+        return None
 
-            if ARNm[j:j+3] in ['UGA', 'UAG', 'UAA', 'UAR']:
-                l.append(ARNm[i:j])
-                i = j + 3
+    frames = [traduction_frame(codes[f:], iupac) for f in range(3)]
+    l = []
 
-            if j >= length-3:
-                break
+    for i, j in start_to_stop_positions(ARNm):
+        amino_acids, ambiguous = frames[i % 3]
+        if ambiguous[i // 3:j // 3].any():
+            l.append(traduction(codes[i:j], iupac=iupac))
         else:
-            i += 1
+            l.append(amino_acids[i // 3:j // 3].tobytes().decode("latin-1"))
+
     return l
 
 
-def codons(ARNm):
+def codons(ARNm, iupac=False):
     '''Function that return the amino acids coded by the ARNm sequence
 
        Args:
            ARNm: ARN sequence list or string
+           iupac: if True the codons with an ambiguity code are translated (see IUPAC_CODON_TABLE)
 
        Returns:
            List of the amino acids
     '''
+    l = traduction_orfs(''.join(ARNm), iupac)
+    if l is not None:
+        return l
+
     seq = start_to_stop(ARNm)
     l = []
 
@@ -52,7 +195,10 @@ def codons(ARNm):
 
         for j in range(0, length - 2, 3):
             codons = "".join([seq[i][j], seq[i][j + 1], seq[i][j + 2]])  # Constructing a codon
-            if try_AUGC(codons):
+            if iupac:
+                if codons in IUPAC_CODONS_TO_AMINO_ACIDS:   # a codon with a non IUPAC character is left out
+                    amino_acids.append(IUPAC_CODONS_TO_AMINO_ACIDS[codons])
+            elif try_AUGC(codons):
                 amino_acid = CODONS_TO_AMINO_ACIDS[codons]
                 amino_acids.append(amino_acid)
             else:
@@ -64,55 +210,76 @@ def codons(ARNm):
     return l
 
 
-def codons_v2(ARNm):
+def codons_v2(ARNm, iupac=False):
     '''Function that return the amino acids coded by the ARNm sequence
     
     Args:
-        ARNm: ARN sequence
+        ARNm: ARN sequence (str or Genome)
+        iupac: if True the codons with an ambiguity code are translated (see IUPAC_CODON_TABLE)
     
     Returns:
         List of the amino acids
     '''
+    codes = codes_of(ARNm)
+    if codes is not None:
+        return traduction(codes, ignore_ambiguites=False, iupac=iupac)
+
+    ARNm = sequence_of(ARNm)
     amino_acids = []
     length = len(ARNm)
     length = length - length % 3
 
     for i in range(0, length - 2, 3):
         codons = "".join([ARNm[i], ARNm[i + 1], ARNm[i + 2]])   # Constructing a codon
-        amino_acid = CODONS_TO_AMINO_ACIDS[codons]
+        amino_acid = (IUPAC_CODONS_TO_AMINO_ACIDS if iupac else CODONS_TO_AMINO_ACIDS)[codons]
         amino_acids.append(amino_acid)
     
     return ''.join(amino_acids)
 
 
-def codons_echantillon(liste):
+def codons_echantillon(liste, iupac=False):
     '''Function that return the amino acids sequences coded by the ARNm sequence list
 
     Args:
         ARNm: ARN sequence list
+        iupac: if True the codons with an ambiguity code are translated (see IUPAC_CODON_TABLE)
 
     Returns:
         List of the amino acid sequences
     '''
-    sortie = []
+    return list(iter_codons_echantillon(liste, iupac))
 
-    for sequence in liste:
-        traduction = codons_v3(sequence)
-        sortie.append(traduction)
 
-    return sortie
+def iter_codons_echantillon(liste, iupac=False):
+    '''Generator that translates the ARNm sequences one at a time (see codons_echantillon)
 
+    Args:
+        liste: ARN sequence list or any iterable (e.g. iter_genomes)
+        iupac: see codons_v3
 
-def codons_v3(ARNm):
+    Yields:
+        The amino acid sequence of each ARNm sequence, in order
+    '''
+    for sequence in liste:
+        yield codons_v3(sequence, iupac)
+
+
+def codons_v3(ARNm, iupac=False):
     '''Function that returns the amino acids coded by the ARNm sequence
 
         Args:
             ARNm: a list of ARN sequence
+            iupac: if True the codons with an ambiguity code are translated (see IUPAC_CODON_TABLE)
+                instead of being left out
 
         Returns:
             List of the amino acids
     '''
     ARNm_ch = ''.join(ARNm)
+    l = traduction_orfs(ARNm_ch, iupac)
+    if l is not None:
+        return "".join(l)
+
     seq = start_to_stop(ARNm_ch)
     l = []
 
@@ -122,7 +289,10 @@ def codons_v3(ARNm):
 
         for j in range(0, length - 2, 3):
             codons = "".join([seq[i][j], seq[i][j + 1], seq[i][j + 2]])  # Constructing a codon
-            if try_AUGC(codons):
+            if iupac:
+                if codons in IUPAC_CODONS_TO_AMINO_ACIDS:   # a codon with a non IUPAC character is left out
+                    amino_acids.append(IUPAC_CODONS_TO_AMINO_ACIDS[codons])
+            elif try_AUGC(codons):
                 amino_acid = CODONS_TO_AMINO_ACIDS[codons]
                 amino_acids.append(amino_acid)
             else:
@@ -0,0 +1,138 @@
+import os
+import traceback
+from itertools import islice
+from multiprocessing import Pool, resource_tracker, shared_memory
+import numpy as np
+from src.codon import *
+
+"""
+* Parallel translation of a sample (codons_v3 in a pool of processes)
+    The genomes are read by batches of TRADUCTION_BATCH genomes (the sample can be a
+    stream, e.g. iter_genomes). Each batch is copied in a shared memory block, like the
+    cache entries: every genome concatenated (uint8) and the n + 1 offsets. The block is
+    cut in TRADUCTION_CHUNKS chunks per process, a worker only receives the name of the
+    block and the offsets of its chunk, and translates its genomes straight from the
+    block (traduction_orfs on a view, no copy). The amino acid sequences come back in
+    order (pool.starmap), the block is freed once its batch is translated.
+
+    The resource tracker of the main process is started before the pool, so the
+    workers share it (whatever the start method): a block attached by a worker is
+    the same entry as the one registered by the main process, which unlinks it.
+"""
+
+
+def traduction_morceau(nom, offsets, iupac=False):
+    '''Function that translates a chunk of genomes of a shared memory block (executed in the processes)
+
+    Args:
+        nom: the name of the shared memory block
+        offsets: the offsets of the genomes of the chunk in the block (one more than the genomes)
+        iupac: see codons_v3
+
+    Returns:
+        List of the amino acid sequences of the chunk, in order
+    '''
+    block = shared_memory.SharedMemory(name=nom)
+    try:
+        return ["".join(traduction_orfs(block.buf[i:j], iupac)) for i, j in zip(offsets, offsets[1:])]
+    except BaseException as erreur:
+        # The frames of the traceback still hold views of the block: they are cleared so it can be closed
+        traceback.clear_frames(erreur.__traceback__)
+        raise
+    finally:
+        block.close()
+
+
+def copie_partagee(batch):
+    '''Function that copies a batch of genomes in a new shared memory block
+
+    Args:
+        batch: list of ARNm sequences (Genome, str, bytes or list of bases)
+
+    Returns:
+        Tuple (block, offsets): the SharedMemory (to unlink by the caller) and the list of the
+        n + 1 offsets of the genomes in the block
+
+    Raises:
+        ValueError: a sequence has non latin-1 characters (no one byte per base buffer, see codes_of)
+    '''
+    codes = [codes_of(sequence) for sequence in batch]
+    codes = [codes_of("".join(sequence)) if c is None else c for sequence, c in zip(batch, codes)]
+    for k, c in enumerate(codes):
+        if c is None:
+            raise ValueError(f"copie_partagee: sequence {k} of the batch has non latin-1 characters")
+    offsets = np.cumsum([0] + [len(c) for c in codes]).tolist()
+
+    block = shared_memory.SharedMemory(create=True, size=max(1, offsets[-1]))
+    data = np.ndarray(offsets[-1], dtype=np.uint8, buffer=block.buf)
+    for c, i in zip(codes, offsets):
+        data[i:i + len(c)] = c
+    del data    # the block can only be closed once no view is left
+    return block, offsets
+
+
+def iter_codons_parallele(sequences, iupac=False, processes=None, batch=None):
+    '''Generator that translates a sample in a pool of processes (same results as iter_codons_echantillon)
+
+    Args:
+        sequences: the ARNm sequences (a list or any iterable, e.g. iter_genomes)
+        iupac: see codons_v3
+        processes: number of processes (default: every core, 1: no pool)
+        batch: number of genomes copied at once in shared memory (default: TRADUCTION_BATCH)
+
+    Yields:
+        The amino acid sequence of each ARNm sequence, in order
+
+    Raises:
+        ValueError: with a pool, a sequence has non latin-1 characters (see copie_partagee)
+    '''
+    processes = os.cpu_count() if processes is None else processes
+    batch = TRADUCTION_BATCH if batch is None else batch
+
+    if processes <= 1:
+        yield from iter_codons_echantillon(sequences, iupac)
+        return
+
+    iterator = iter(sequences)
+    resource_tracker.ensure_running()   # shared by the workers (see the top of the file)
+    with Pool(processes) as pool:
+        genomes = list(islice(iterator, batch))
+
+        while genomes:
+            block, offsets = copie_partagee(genomes)
+            try:
+                morceaux = min(len(genomes), TRADUCTION_CHUNKS * processes)
+                bornes = [len(genomes) * k // morceaux for k in range(morceaux + 1)]
+                taches = [(block.name, offsets[bornes[k]:bornes[k + 1] + 1], iupac) for k in range(morceaux)]
+                for resultat in pool.starmap(traduction_morceau, taches):
+                    yield from resultat
+            finally:
+                block.close()
+                block.unlink()
+            genomes = list(islice(iterator, batch))
+
+
+def codons_echantillon_parallele(sequences, iupac=False, processes=None, batch=None):
+    '''Function that returns the amino acids sequences of a sample, translated in a pool of processes
+    (same result as codons_echantillon)
+
+    Args:
+        sequences, iupac, processes, batch: see iter_codons_parallele
+
+    Returns:
+        List of the amino acid sequences
+    '''
+    return list(iter_codons_parallele(sequences, iupac, processes, batch))
+
+
+def codons_fasta(filename, iupac=False, processes=None, batch=None):
+    '''Generator that translates every genome of a fasta file, read as a stream (see iter_genomes)
+
+    Args:
+        filename: the fasta file that contain the genomic data
+        iupac, processes, batch: see iter_codons_parallele
+
+    Yields:
+        The amino acid sequence of each record, in file order
+    '''
+    yield from iter_codons_parallele(iter_genomes(filename), iupac, processes, batch)
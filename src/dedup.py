@@ -0,0 +1,106 @@
+import hashlib
+from src.genome import *
+from src.codon_batch import *
+
+"""
+* Deduplication of identical genomes
+    A bank contains many byte-identical genomes. Each sequence is hashed (blake2b of
+    its uint8 buffer, 16 bytes like the cache keys) and only the first copy of each
+    distinct sequence is kept, with its multiplicity: the translation, the counting
+    and the pairwise distances then run once per distinct sequence.
+
+    The multiplicities are the weights of the stats (call_stat_pondere,
+    perform_all_stats_pondere... in stats.py), which give the same results as
+    the stats of the whole sample (the mean, variance and standard deviation
+    are computed exactly: on proportions they may differ in the last digit
+    from the float sums of the whole sample, see stat_ponderee). The inverse index (position of the distinct
+    sequence of each genome) maps the results back to the whole sample.
+"""
+
+
+def empreinte(sequence):
+    '''Function that computes the hash of a sequence (the same for a Genome and its str)
+
+    Args:
+        sequence: the sequence (Genome, str, bytes or list of bases)
+
+    Returns:
+        The blake2b digest (16 bytes)
+    '''
+    codes = codes_of(sequence)
+    if codes is None:
+        codes = codes_of("".join(sequence))
+    return hashlib.blake2b(codes, digest_size=16).digest()
+
+
+def dedup(sequences, inverse=False):
+    '''Function that collapses the identical sequences of a sample into (distinct sequence, multiplicity)
+
+    Args:
+        sequences: the sequences (a list or any iterable, e.g. iter_genomes), only the distinct ones are kept in memory
+        inverse: if True the inverse index is returned too
+
+    Returns:
+        Tuple (distinct sequences in order of first appearance, list of their multiplicities), and the
+        list of the index of the distinct sequence of each sequence if inverse is True
+    '''
+    positions = {}
+    uniques, multiplicites, index = [], [], []
+
+    for sequence in sequences:
+        cle = empreinte(sequence)
+        k = positions.get(cle)
+        if k is None:
+            k = positions[cle] = len(uniques)
+            uniques.append(sequence)
+            multiplicites.append(0)
+        multiplicites[k] += 1
+        index.append(k)
+
+    if inverse:
+        return uniques, multiplicites, index
+    return uniques, multiplicites
+
+
+def codons_echantillon_dedup(sequences, iupac=False, processes=None):
+    '''Function that returns the amino acids sequences of a sample (same result as codons_echantillon),
+    each distinct genome is translated only once (in a pool of processes, see codons_echantillon_parallele)
+
+    Args:
+        sequences: the ARNm sequences (a list or any iterable, e.g. iter_genomes)
+        iupac: see codons_v3
+        processes: see iter_codons_parallele
+
+    Returns:
+        List of the amino acid sequences, the copies of a genome share the same string
+    '''
+    uniques, _, index = dedup(sequences, inverse=True)
+    traductions = codons_echantillon_parallele(uniques, iupac, processes)
+    return [traductions[k] for k in index]
+
+
+def distances_paires(sequences, distance, *args, symetrique=True):
+    '''Function that computes a distance (lev, needleman...) between every pair of sequences of a sample,
+    once per pair of distinct sequences
+
+    Args:
+        sequences: the sequences (a list or any iterable)
+        distance: the function called on two sequences (e.g. lev)
+        *args: additional arguments of distance (e.g. the cost_table of needleman)
+        symetrique: if True distance(a, b) is only computed for one of the pairs (a, b) and (b, a)
+            (use False for needleman, whose alignments depend on the order)
+
+    Returns:
+        Matrix (list of lists) n x n, the element [i][j] is distance(sequences[i], sequences[j])
+    '''
+    uniques, _, index = dedup(sequences, inverse=True)
+    resultats = {}
+
+    for a in range(len(uniques)):
+        for b in range(len(uniques)):
+            if symetrique and b < a:
+                resultats[a, b] = resultats[b, a]
+            else:
+                resultats[a, b] = distance(uniques[a], uniques[b], *args)
+
+    return [[resultats[a, b] for b in index] for a in index]
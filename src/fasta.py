@@ -0,0 +1,254 @@
+import gzip
+import os
+import struct
+import zlib
+from collections import deque
+from multiprocessing import Pool
+from src.globals import *
+
+"""
+* Native fasta parser: the file is read as bytes by chunks, records are split
+    on '>' and the line endings of the sequences are removed in bulk
+    (bytes.translate), without going through Bio.SeqIO
+
+* Compressed files (.gz) are read directly:
+    - plain gzip is decompressed as a stream
+    - BGZF (blocked gzip, bgzip) blocks are independent gzip members, they are
+      decompressed by batches in a pool of processes and fed back in order
+"""
+
+WHITESPACES = b" \t\r\n"
+GZIP_MAGIC = b"\x1f\x8b"
+BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+
+def iter_fasta(filename, table=None, processes=None):
+    '''Generator that parses a fasta file one record at a time, in constant memory
+
+    Args:
+        filename: the fasta file
+        table: optional bytes translation table applied to the sequences while their
+            line endings are removed (e.g. TRANSCRIPTION_BYTES_TABLE)
+        processes: number of processes used to decompress BGZF files (default: every core)
+
+    Yields:
+        Tuples (header, sequence), the header without '>' and the sequence as a string
+    '''
+    buffer = bytearray()
+    started = False
+
+    for chunk in iter_chunks(filename, processes):
+        search = max(len(buffer) - 1, 0)    # the start of the buffer was already searched
+        buffer += chunk
+
+        if not started:
+            # Anything before the first record is ignored (like SeqIO does)
+            first = buffer.find(b">")
+            if first == -1:
+                buffer.clear()
+                continue
+            del buffer[:first]
+            started = True
+            search = 0
+
+        start = 0
+        end = buffer.find(b"\n>", search)
+
+        while end != -1:
+            yield parse_record(buffer[start:end], table)
+            start = end + 1
+            end = buffer.find(b"\n>", start)
+
+        del buffer[:start]
+
+    if started and buffer:
+        yield parse_record(buffer, table)
+
+
+def parse_record(record, table=None):
+    '''Function that parses a single fasta record
+
+    Args:
+        record: the bytes of the record, starting with '>'
+        table: optional bytes translation table applied to the sequence
+
+    Returns:
+        Tuple (header, sequence)
+    '''
+    header_end = record.find(b"\n")
+    if header_end == -1:
+        header_end = len(record)
+
+    header = bytes(record[1:header_end]).decode().strip()
+    sequence = record[header_end + 1:].translate(table, WHITESPACES).decode()
+    return header, sequence
+
+
+def compression(filename):
+    '''Function that tells how a file is compressed, from its first bytes
+
+    Args:
+        filename: the file
+
+    Returns:
+        "bgzf", "gzip" or None (not compressed)
+    '''
+    with open(filename, "rb") as f:
+        if f.read(2) != GZIP_MAGIC:
+            return None
+        f.seek(0)
+        if read_bgzf_block(f) is not None:
+            return "bgzf"
+    return "gzip"
+
+
+def iter_chunks(filename, processes=None):
+    '''Generator that reads a file by chunks of about FASTA_CHUNK_SIZE bytes,
+    gzip and BGZF files are decompressed on the fly
+
+    Args:
+        filename: the file to read
+        processes: number of processes used to decompress BGZF files (default: every core)
+
+    Yields:
+        The (decompressed) chunks of the file, in order
+    '''
+    kind = compression(filename)
+
+    if kind == "bgzf":
+        yield from iter_bgzf_chunks(filename, processes)
+        return
+
+    with (gzip.open(filename, "rb") if kind == "gzip" else open(filename, "rb")) as f:
+        chunk = f.read(FASTA_CHUNK_SIZE)
+
+        while chunk:
+            yield chunk
+            chunk = f.read(FASTA_CHUNK_SIZE)
+
+
+def read_bgzf_block(f):
+    '''Function that reads the next BGZF block of a file
+
+    Args:
+        f: the file opened in binary mode
+
+    Returns:
+        The bytes of the whole (compressed) block, b"" at the end of the file,
+        None if the next member is not a BGZF block
+    '''
+    header = f.read(12)
+    if not header:
+        return b""
+
+    # gzip member with the FEXTRA flag, the 'BC' subfield gives the block size
+    if len(header) < 12 or header[:3] != b"\x1f\x8b\x08" or not header[3] & 4:
+        return None
+
+    xlen, = struct.unpack_from("<H", header, 10)
+    extra = f.read(xlen)
+    pos = 0
+
+    while pos + 4 <= len(extra):
+        si, slen = extra[pos:pos + 2], struct.unpack_from("<H", extra, pos + 2)[0]
+        if si == b"BC" and slen == 2:
+            bsize, = struct.unpack_from("<H", extra, pos + 4)
+            return header + extra + f.read(bsize + 1 - 12 - xlen)
+        pos += 4 + slen
+
+    return None
+
+
+def inflate_blocks(blocks):
+    '''Function that decompresses a batch of BGZF blocks (run in the worker processes)
+
+    Args:
+        blocks: list of whole BGZF blocks
+
+    Returns:
+        The decompressed bytes of the blocks, in order
+    '''
+    return b"".join(zlib.decompress(block, 31) for block in blocks)
+
+
+def iter_bgzf_batches(filename):
+    '''Generator that reads the blocks of a BGZF file by batches of about FASTA_CHUNK_SIZE
+    compressed bytes'''
+    with open(filename, "rb") as f:
+        batch, size = [], 0
+        block = read_bgzf_block(f)
+
+        while block:
+            batch.append(block)
+            size += len(block)
+            if size >= FASTA_CHUNK_SIZE:
+                yield batch
+                batch, size = [], 0
+            block = read_bgzf_block(f)
+
+        if block is None:
+            raise ValueError(f"{filename}: invalid BGZF block")
+        if batch:
+            yield batch
+
+
+def iter_bgzf_chunks(filename, processes=None):
+    '''Generator that decompresses a BGZF file, the batches of blocks are decompressed
+    in parallel and yielded in file order
+
+    Args:
+        filename: the BGZF file
+        processes: number of processes (default: every core)
+
+    Yields:
+        The decompressed chunks, in order
+    '''
+    if processes is None:
+        processes = os.cpu_count()
+
+    batches = iter_bgzf_batches(filename)
+    first = next(batches, None)
+    second = next(batches, None)
+
+    if processes <= 1 or second is None:
+        # Too small to be worth a pool of processes
+        for batch in filter(None, [first, second]):
+            yield inflate_blocks(batch)
+        for batch in batches:
+            yield inflate_blocks(batch)
+        return
+
+    with Pool(processes) as pool:
+        # At most 2 batches per process are pending, so memory stays bounded
+        pending = deque([pool.apply_async(inflate_blocks, (first,)), pool.apply_async(inflate_blocks, (second,))])
+
+        for batch in batches:
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(inflate_blocks, (batch,)))
+
+        while pending:
+            yield pending.popleft().get()
+
+
+def write_bgzf(filename, bgzf_filename, block_size=0xff00):
+    '''Function that compresses a file in the BGZF format (like bgzip)
+
+    Args:
+        filename: the file to compress
+        bgzf_filename: the compressed file to write
+        block_size: number of uncompressed bytes per block (at most 65280)
+    '''
+    with open(filename, "rb") as f, open(bgzf_filename, "wb") as out:
+        data = f.read(block_size)
+
+        while data:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            cdata = compressor.compress(data) + compressor.flush()
+            out.write(b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00")
+            out.write(struct.pack("<H", len(cdata) + 25))
+            out.write(cdata)
+            out.write(struct.pack("<II", zlib.crc32(data), len(data)))
+            data = f.read(block_size)
+
+        out.write(BGZF_EOF)
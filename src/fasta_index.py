@@ -0,0 +1,205 @@
+import mmap
+import os
+from src.globals import *
+
+"""
+* Sidecar index of a fasta file: one entry per record, in file order
+    (id, length, offset, line_bases, line_bytes, header_offset)
+    - id:            the first word of the header (without '>')
+    - length:        number of bases of the sequence
+    - offset:        byte offset of the first base of the sequence
+    - line_bases:    number of bases on a full sequence line
+    - line_bytes:    number of bytes of a full sequence line (bases + line ending)
+    - header_offset: byte offset of the '>' of the header (the header is [header_offset + 1, offset[)
+
+    The index is written next to the fasta (filename + INDEX_SUFFIX) and is
+    reused as long as the size and the mtime of the fasta are unchanged.
+"""
+
+
+def build_fasta_index(filename):
+    '''Function that scans a fasta file once and returns its index
+
+    Args:
+        filename: the fasta file to index
+
+    Returns:
+        List of index entries (id, length, offset, line_bases, line_bytes, header_offset)
+    '''
+    index = []
+
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return index
+        if f.read(2) == b"\x1f\x8b":
+            raise ValueError(f"{filename}: compressed fasta files can not be indexed, decompress it first")
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = mm.find(b">")
+
+            while pos != -1:
+                header_end = mm.find(b"\n", pos)
+                if header_end == -1:
+                    header_end = size
+
+                offset = header_end + 1
+                next_pos = mm.find(b"\n>", header_end)
+                if next_pos == -1:
+                    end = size
+                else:
+                    next_pos += 1
+                    end = next_pos
+
+                header = mm[pos + 1:header_end].decode().strip()
+                record_id = header.split()[0] if header else ""
+                region = mm[offset:end] if offset < end else b""
+                lines = region.split(b"\n")
+                # Blank lines at the end of the record (e.g. between two records, LF or CRLF) hold no base
+                while lines and lines[-1].rstrip(b"\r") == b"":
+                    lines.pop()
+
+                length = len(region) - region.count(b"\n") - region.count(b"\r")
+                line_bases = len(lines[0].rstrip(b"\r")) if lines else 0
+                line_bytes = len(lines[0]) + 1 if lines else 0
+
+                # Every line but the last one must have the same width
+                if len(set(map(len, lines[:-1]))) > 1 or (len(lines) > 1 and len(lines[-1]) > len(lines[0])):
+                    raise ValueError(f"{filename}: record '{record_id}' has lines of different lengths, it can not be indexed")
+                # The offsets count every byte of a line as a base (the parsers drop the whitespace)
+                bases = region.translate(None, b"\r\n")
+                if len(b"".join(bases.split())) != len(bases):
+                    raise ValueError(f"{filename}: record '{record_id}' has whitespace inside its lines, it can not be indexed")
+
+                index.append((record_id, length, offset, line_bases, line_bytes, pos))
+                pos = next_pos
+
+    return index
+
+
+def load_fasta_index(filename):
+    '''Function that returns the index of a fasta file, the sidecar index is
+    built (and saved) only if it does not exist or if the fasta changed since
+
+    Args:
+        filename: the fasta file
+
+    Returns:
+        List of index entries (id, length, offset, line_bases, line_bytes, header_offset)
+    '''
+    st = os.stat(filename)
+    signature = f"#{st.st_size}\t{st.st_mtime_ns}"
+    index_file = filename + INDEX_SUFFIX
+
+    try:
+        with open(index_file, "r") as f:
+            if f.readline().rstrip("\n") == signature:
+                index = []
+
+                for line in f:
+                    # An index of an older format (other number of fields) raises ValueError: it is rebuilt
+                    record_id, length, offset, line_bases, line_bytes, header_offset = line.rstrip("\n").split("\t")
+                    index.append((record_id, int(length), int(offset), int(line_bases), int(line_bytes), int(header_offset)))
+                return index
+    except (OSError, ValueError):
+        pass
+
+    index = build_fasta_index(filename)
+
+    try:
+        # Written in a temporary file then renamed: an interrupted write never leaves a partial index
+        tmp = f"{index_file}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(signature + "\n")
+            for entry in index:
+                f.write("\t".join(str(v) for v in entry) + "\n")
+        os.replace(tmp, index_file)
+    except OSError:
+        pass    # read-only folder: the index is only kept in memory
+
+    return index
+
+
+def index_lengths(filename):
+    '''Function that returns the length of every sequence of a fasta file
+    using its index, no sequence data is read
+
+    Args:
+        filename: the fasta file
+
+    Returns:
+        List of the sequences lengths
+    '''
+    return [entry[1] for entry in load_fasta_index(filename)]
+
+
+def iter_records(filename, entries=None):
+    '''Generator that reads sequences of a fasta file through mmap, using its index
+
+    Args:
+        filename: the fasta file
+        entries: the index entries to read (default: every record, in file order)
+
+    Yields:
+        The (not transcribed) sequence of each entry
+    '''
+    if entries is None:
+        entries = load_fasta_index(filename)
+
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for entry in entries:
+                yield _read(mm, entry, 0, entry[1])
+
+
+def read_record(filename, entry):
+    '''Function that reads one sequence of a fasta file without scanning the rest of the file
+
+    Args:
+        filename: the fasta file
+        entry: the index entry of the record (see load_fasta_index)
+
+    Returns:
+        The (not transcribed) sequence of the record
+    '''
+    return read_region(filename, entry, 0, entry[1])
+
+
+def read_region(filename, entry, start, end):
+    '''Function that reads the bases [start, end[ of one sequence of a fasta file
+
+    Args:
+        filename: the fasta file
+        entry: the index entry of the record (see load_fasta_index)
+        start: position of the first base (starting at 0)
+        end: position after the last base (clamped to the length of the sequence)
+
+    Returns:
+        The (not transcribed) subsequence
+    '''
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _read(mm, entry, start, end)
+
+
+def _span(length, line_bases, line_bytes):
+    '''Number of bytes used by the first 'length' bases of a record (last line ending excluded)'''
+    if length == 0:
+        return 0
+    full_lines = (length - 1) // line_bases
+    return full_lines * line_bytes + length - full_lines * line_bases
+
+
+def _read(mm, entry, start, end):
+    '''Reads the bases [start, end[ of the record described by entry from an opened mmap'''
+    _, length, offset, line_bases, line_bytes, _ = entry
+    start, end = max(start, 0), min(end, length)
+    if start >= end:
+        return ""
+
+    first = offset + (start // line_bases) * line_bytes + start % line_bases
+    last = offset + _span(end, line_bases, line_bytes)
+    return mm[first:last].replace(b"\n", b"").replace(b"\r", b"").decode()
@@ -0,0 +1,140 @@
+import numpy as np
+from src.globals import *
+
+"""
+* Genome record: a sequence with its fasta id and description
+    The bases are kept as a uint8 buffer (one ASCII code per base) that can be
+    shared without copy (np.frombuffer on the parser output, views on a mmap...),
+    the string form is built at most once and cached. A Genome behaves like a
+    read-only string (len, indexing, iteration, 'in', ==) so it can be passed
+    to any function of the project, and the functions that know it
+    (nombre_elements, codons_v2, lev, needleman) use its buffer/cached string
+    directly instead of re-encoding the sequence at each call.
+"""
+
+
+class Genome:
+    '''A sequence and its fasta header
+
+    Attributes:
+        id: the first word of the fasta header
+        description: the whole fasta header (without '>')
+        codes: uint8 numpy array, the ASCII code of each base (None for non latin-1 characters)
+    '''
+    __slots__ = ("id", "description", "_codes", "_sequence")
+
+    def __init__(self, sequence, id="", description=""):
+        '''
+        Args:
+            sequence: the sequence, as a str, bytes (or any buffer) or uint8 numpy array (not copied)
+            id: the fasta id of the sequence
+            description: the fasta header of the sequence
+        '''
+        self.id = id
+        self.description = description
+        self._codes = None
+        self._sequence = None
+
+        if isinstance(sequence, Genome):
+            self._codes, self._sequence = sequence._codes, sequence._sequence
+        elif isinstance(sequence, str):
+            self._sequence = sequence
+        elif isinstance(sequence, np.ndarray):
+            self._codes = sequence.view(np.uint8)
+        else:
+            self._codes = np.frombuffer(sequence, dtype=np.uint8)
+
+    @classmethod
+    def from_record(cls, header, sequence):
+        '''Builds a Genome from a parsed fasta record (see iter_fasta)
+
+        Args:
+            header: the fasta header (without '>')
+            sequence: the sequence
+
+        Returns:
+            The Genome
+        '''
+        return cls(sequence, header.split()[0] if header else "", header)
+
+    @property
+    def codes(self):
+        '''uint8 buffer of the sequence (computed once if the Genome was built from a str),
+        None if the sequence has non latin-1 characters (like codes_of)'''
+        if self._codes is None:
+            try:
+                self._codes = np.frombuffer(self._sequence.encode("latin-1"), dtype=np.uint8)
+            except UnicodeEncodeError:
+                return None
+        return self._codes
+
+    @property
+    def sequence(self):
+        '''The sequence as a str (decoded once then cached)'''
+        if self._sequence is None:
+            self._sequence = self._codes.tobytes().decode("latin-1")
+        return self._sequence
+
+    def __str__(self):
+        return self.sequence
+
+    def __repr__(self):
+        return f"Genome({self.id!r}, {len(self)} bases)"
+
+    def __len__(self):
+        if self._sequence is not None:
+            return len(self._sequence)
+        return len(self._codes)
+
+    def __getitem__(self, i):
+        return self.sequence[i]
+
+    def __iter__(self):
+        return iter(self.sequence)
+
+    def __contains__(self, sub):
+        return sub in self.sequence
+
+    def __eq__(self, other):
+        if isinstance(other, Genome):
+            return self.sequence == other.sequence
+        return self.sequence == other
+
+    def __hash__(self):
+        return hash(self.sequence)
+
+
+def sequence_of(sequence):
+    '''Function that returns the str form of a sequence, without copy if it already is one
+
+    Args:
+        sequence: a Genome or any sequence
+
+    Returns:
+        The cached string of a Genome, the sequence itself otherwise
+    '''
+    if isinstance(sequence, Genome):
+        return sequence.sequence
+    return sequence
+
+
+def codes_of(sequence):
+    '''Function that returns the uint8 buffer of a sequence (one code per character)
+
+    Args:
+        sequence: a Genome, str, bytes or any other sequence
+
+    Returns:
+        uint8 numpy array (no copy for a Genome or bytes), None if the sequence can not
+        be seen as one byte per character (list, non latin-1 characters...)
+    '''
+    if isinstance(sequence, Genome):
+        return sequence.codes
+    if isinstance(sequence, str):
+        try:
+            return np.frombuffer(sequence.encode("latin-1"), dtype=np.uint8)
+        except UnicodeEncodeError:
+            return None
+    if isinstance(sequence, (bytes, bytearray, memoryview)):
+        return np.frombuffer(sequence, dtype=np.uint8)
+    return None
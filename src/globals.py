@@ -102,3 +102,87 @@ CODONS_TO_AMINO_ACIDS = {
     "GGA": "G",
     "GGG": "G",
 }
+
+# Ambiguity codes, sequences containing one of them are left out of the samples (see bank_sequences)
+AMBIGUITES = "RYSWKMBDHVN"
+
+# Bases that each IUPAC code stands for (AUGC, then the ambiguity codes)
+IUPAC = {
+    "A": "A", "U": "U", "G": "G", "C": "C",
+    "R": "AG", "Y": "UC", "S": "GC", "W": "AU", "K": "GU", "M": "AC",
+    "B": "UGC", "D": "AUG", "H": "AUC", "V": "AGC", "N": "AUGC",
+}
+
+# Stop codons ending an open reading frame (see start_to_stop)
+STOP_CODONS = ["UGA", "UAG", "UAA", "UAR"]
+
+# Bank of sequences used to draw samples (see bank_sequences)
+BANK_FASTA = "./genome/20000_sequences.fasta"
+
+# Suffix of the sidecar index written next to a fasta file (see fasta_index.py)
+INDEX_SUFFIX = ".idx"
+
+# Size of the chunks read by the native fasta parser (see fasta.py)
+FASTA_CHUNK_SIZE = 1 << 20
+
+# Translation tables used to transcribe ADNc into ARNm (T -> U) in a single pass
+TRANSCRIPTION_TABLE = str.maketrans("T", "U")
+TRANSCRIPTION_BYTES_TABLE = bytes.maketrans(b"T", b"U")
+
+# Persistent cache of the parsed genomes (see cache.py), bounded to CACHE_MAX_SIZE bytes
+CACHE_DIR = "./.cache/genomes"
+CACHE_MAX_SIZE = 1 << 30
+
+# ISO 3166 alpha-3 codes of the countries found in the fasta headers (see metadata.py)
+COUNTRIES = {
+    "USA": "USA",
+    "CHN": "China",
+    "TWN": "Taiwan",
+    "JPN": "Japan",
+    "KOR": "South Korea",
+    "IND": "India",
+    "BEL": "Belgium",
+    "DEU": "Germany",
+    "FRA": "France",
+    "ITA": "Italy",
+    "ESP": "Spain",
+    "GBR": "United Kingdom",
+    "NLD": "Netherlands",
+    "CHE": "Switzerland",
+    "AUT": "Austria",
+    "SWE": "Sweden",
+    "RUS": "Russia",
+    "TUN": "Tunisia",
+    "EGY": "Egypt",
+    "ZAF": "South Africa",
+    "BRA": "Brazil",
+    "ARG": "Argentina",
+    "CHL": "Chile",
+    "PER": "Peru",
+    "MEX": "Mexico",
+    "CAN": "Canada",
+    "AUS": "Australia",
+}
+
+# Keys of the dictionaries returned by the perform_all_stats functions (see stats.py)
+STATS = ["moy", "med", "ecartt", "var", "quart1", "quart3", "int_quart"]
+
+# Order statistics (see selection in stats.py): below SELECTION_MIN values the list is simply sorted,
+# integers spanning at most COUNTING_SORT_RANGE * n values use a counting sort
+SELECTION_MIN = 64
+COUNTING_SORT_RANGE = 4
+
+# Bootstrap (see bootstrap in stats.py): default number of resamples and confidence level,
+# resamples are drawn by index matrices of at most BOOTSTRAP_CHUNK indices
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_LEVEL = 0.95
+BOOTSTRAP_CHUNK = 1 << 22
+
+# Largest k of the k-mer counts (see kmer.py): a full count array has 4^k int64 bins per sequence,
+# 512 KB for k = 8 (codon pairs, k = 6: 32 KB)
+KMER_MAX_K = 8
+
+# Parallel translation (see codon_batch.py): genomes copied at once in a shared memory block,
+# and number of chunks of each block per process
+TRADUCTION_BATCH = 1000
+TRADUCTION_CHUNKS = 4
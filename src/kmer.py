@@ -0,0 +1,199 @@
+import numpy as np
+from itertools import product
+from src.globals import *
+from src.genome import *
+from src.packed import ENCODE_TABLE
+
+"""
+* k-mer counting (dinucleotides, codons, codon pairs...)
+    Every base is encoded on 2 bits (its position in NUCLEOTIDES: A=0, U=1, G=2, C=3,
+    like the packed store) and the k bases of a window are rolled into one integer
+    index = c0 * 4^(k-1) + ... + c(k-1), i.e. the index of the k-mer in kmers(k).
+    The k-mers of a sequence are then counted with a single np.bincount over the
+    4^k possible indexes. A window that contains any other character (ambiguity
+    codes like N, Y, K...) is not counted. When only some k-mers are kept (sampler
+    of kmer_matrix), the indexes are counted sparsely (np.unique) instead, so the
+    memory does not depend on 4^k.
+
+    nombre_kmer_echantillon returns a k-mer -> list of counts dictionary, the same
+    shape as nombre_element_echantillon, so call_stat_on_echantillon (and the seven
+    statistics of stats.py) work per k-mer.
+"""
+
+
+def verifie_k(k):
+    '''Function that raises ValueError if k is not a valid k-mer length (1 to KMER_MAX_K)'''
+    if not 1 <= k <= KMER_MAX_K:
+        raise ValueError(f"k must be between 1 and {KMER_MAX_K}, got {k}")
+
+
+def kmers(k):
+    '''Function that lists every k-mer of AUGC bases, in index order
+
+    Args:
+        k: the length of the k-mers
+
+    Returns:
+        List of the 4^k k-mers (the k-mer of index i is kmers(k)[i])
+    '''
+    verifie_k(k)
+    return ["".join(kmer) for kmer in product(NUCLEOTIDES, repeat=k)]
+
+
+def kmer_index(kmer):
+    '''Function that returns the index of a k-mer (see kmers), None if it is not made of AUGC bases'''
+    index = 0
+    for base in kmer:
+        if len(base) != 1 or base not in NUCLEOTIDES:
+            return None
+        index = index * 4 + NUCLEOTIDES.index(base)
+    return index
+
+
+def kmer_codes(sequence, k, step=1):
+    '''Function that computes the index of every k-mer of a sequence
+
+    Args:
+        sequence: the ARNm sequence (a Genome, str, bytes or list of bases)
+        k: the length of the k-mers (1 to KMER_MAX_K)
+        step: distance between two windows (e.g. 3 for the codons of the first frame)
+
+    Returns:
+        int64 numpy array, the index of each window [i, i+k[ (i multiple of step)
+        without ambiguous base, in order
+    '''
+    verifie_k(k)
+
+    codes = codes_of(sequence)
+    if codes is None:
+        codes = codes_of("".join(sequence))
+
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    bases = ENCODE_TABLE[codes]
+    ambiguous = np.concatenate(([0], np.cumsum(bases == 255)))
+    valid = (ambiguous[k:] - ambiguous[:n] == 0)[::step]
+
+    # Rolling 2-bit index: each base of the window shifts the previous ones
+    index = np.zeros(n, dtype=np.int64)
+    bases = (bases & 3).astype(np.int64)
+    for j in range(k):
+        index = (index << 2) | bases[j:j + n]
+    return index[::step][valid]
+
+
+def compte_kmers(codes, columns):
+    '''Function that counts some k-mer indexes among the indexes of a sequence, without 4^k array
+
+    Args:
+        codes: the k-mer indexes of the sequence (see kmer_codes)
+        columns: int64 numpy array, the indexes to count (any other value counts 0)
+
+    Returns:
+        int64 numpy array, the count of each index of columns
+    '''
+    valeurs, nombres = np.unique(codes, return_counts=True)
+    if len(valeurs) == 0:
+        return np.zeros(len(columns), dtype=np.int64)
+    positions = np.minimum(np.searchsorted(valeurs, columns), len(valeurs) - 1)
+    return np.where(valeurs[positions] == columns, nombres[positions], 0)
+
+
+def nombre_kmers(sequence, k, step=1):
+    '''Function that counts every k-mer of a sequence
+
+    Args:
+        sequence, k, step: see kmer_codes
+
+    Returns:
+        int64 numpy array of 4^k counts (in the order of kmers(k))
+    '''
+    verifie_k(k)
+    return np.bincount(kmer_codes(sequence, k, step), minlength=4 ** k)
+
+
+def kmer_matrix(tab, k, sampler=None, step=1):
+    '''Function that counts the k-mers of every sequence of a sample in a matrix
+
+    Args:
+        tab: the ARNm sequences (a list or any iterable, e.g. iter_genomes)
+        k, step: see kmer_codes
+        sampler: the k-mers to keep, one column each (default: every k-mer, see kmers)
+
+    Returns:
+        int64 matrix (n_sequences x n_kmers), a column of zeros for a k-mer that is not made of AUGC bases
+        (without sampler: 4^k columns, 8 * 4^k bytes per sequence)
+    '''
+    verifie_k(k)
+    columns = None
+    if sampler is not None:
+        indexes = [kmer_index(kmer) if len(kmer) == k else None for kmer in sampler]
+        columns = np.array([-1 if index is None else index for index in indexes], dtype=np.int64)
+
+    rows = []
+    for sequence in tab:
+        codes = kmer_codes(sequence, k, step)
+        rows.append(np.bincount(codes, minlength=4 ** k) if columns is None else compte_kmers(codes, columns))
+
+    width = 4 ** k if columns is None else len(columns)
+    return np.array(rows, dtype=np.int64).reshape(len(rows), width)
+
+
+def nombre_kmer_echantillon(tab, k, sampler=None, step=1):
+    '''Function that counts the k-mers of every sequence of a sample (same as nombre_element_echantillon,
+    the result can be given to call_stat_on_echantillon)
+
+    Args:
+        tab, k, sampler, step: see kmer_matrix
+
+    Returns:
+        Dictionary k-mer -> list of its number in each sequence, {} if the sample is empty
+    '''
+    matrix = kmer_matrix(tab, k, sampler, step)
+    keys = kmers(k) if sampler is None else list(sampler)
+
+    if len(matrix) == 0:
+        return {}
+    return {kmer: matrix[:, j].tolist() for j, kmer in enumerate(keys)}
+
+
+def nombre_kmers_total(tab, k, step=1):
+    '''Function that counts the k-mers of a whole sample (e.g. the bank), in constant memory
+
+    Args:
+        tab: the ARNm sequences (a list or any iterable, e.g. iter_genomes)
+        k, step: see kmer_codes
+
+    Returns:
+        Dictionary k-mer -> number of occurrences in every sequence
+    '''
+    verifie_k(k)
+    total = np.zeros(4 ** k, dtype=np.int64)
+    for sequence in tab:
+        total += nombre_kmers(sequence, k, step)
+    return dict(zip(kmers(k), total.tolist()))
+
+
+def rapport_observe_attendu(sequence, kmer):
+    '''Function that computes the observed / expected ratio of a k-mer (e.g. CpG depletion with "CG"):
+    its frequency among the k-mers divided by the product of the frequencies of its bases
+
+    Args:
+        sequence: the ARNm sequence
+        kmer: the k-mer (AUGC bases only)
+
+    Returns:
+        The ratio, None if the sequence has no k-mer or lacks one of the bases
+    '''
+    k = len(kmer)
+    counts = nombre_kmers(sequence, k)
+    bases = nombre_kmers(sequence, 1)
+    if counts.sum() == 0 or any(bases[NUCLEOTIDES.index(base)] == 0 for base in kmer):
+        return None
+
+    attendu = 1.0
+    for base in kmer:
+        attendu *= bases[NUCLEOTIDES.index(base)] / bases.sum()
+    return counts[kmer_index(kmer)] / counts.sum() / attendu
@@ -1,3 +1,5 @@
+from src.genome import *
+
 
 def lev_rec(seq1, seq2):
     '''Function that return the Levenshtein distance between two given strings seq1 and seq2
@@ -80,12 +82,13 @@ def lev(seq1, seq2):
     '''Function that return the Levenshtein distance between two given strings seq1 and seq2, uses DP
 
         Args:
-            seq1: first string also known as source string
-            seq2: second string also known as target string
+            seq1: first string (or Genome) also known as source string
+            seq2: second string (or Genome) also known as target string
 
         Returns:
             Levenshtein distance
     '''
+    seq1, seq2 = sequence_of(seq1), sequence_of(seq2)
     dp = [[-1 for _ in range(len(seq2) + 1) ] for _ in range(len(seq1) + 1)]
     len_seq1, len_seq2 = len(seq1), len(seq2)
 
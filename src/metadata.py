@@ -0,0 +1,140 @@
+import mmap
+import os
+import re
+from src.globals import *
+from src.fasta_index import *
+
+"""
+* Metadata of the records of a fasta file, parsed from the headers only
+    One row per record, aligned with the index (see fasta_index.py):
+    (accession, country, date)
+    - accession: the first word of the header (e.g. MW368439.1)
+    - country:   ISO 3166 alpha-3 code (e.g. USA), from the isolate name
+                 (SARS-CoV-2/human/USA/...) or from a '|' separated field
+                 (e.g. ">MW368439.1 |...|Belgium|2020-12-15"), "" if unknown
+    - date:      collection date as "YYYY-MM-DD", "YYYY-MM" or "YYYY" (ISO
+                 field of the header, or the year of the isolate name), "" if unknown
+
+    The headers are read through the index offsets, the sequences are never read.
+    The selected index entries feed the streaming loaders (iter_genomes_index...).
+"""
+
+ISOLATE_REGEX = re.compile(r"SARS-CoV-2/[^/|]+/([A-Z]{3})/[^/|]*/(\d{4})")
+DATE_REGEX = re.compile(r"^\d{4}(-\d{2}(-\d{2})?)?$")
+COUNTRY_CODES = {name.lower(): code for code, name in COUNTRIES.items()}
+
+
+def parse_header(header):
+    '''Function that extracts the metadata of a fasta header
+
+    Args:
+        header: the fasta header (with or without '>')
+
+    Returns:
+        Tuple (accession, country, date), "" for what is not found
+    '''
+    header = header.lstrip(">").strip()
+    fields = [field.strip() for field in header.split("|")]
+    accession = header.split()[0] if header else ""
+    country, date = "", ""
+
+    isolate = ISOLATE_REGEX.search(header)
+    if isolate:
+        country, date = isolate.group(1), isolate.group(2)
+
+    for field in fields[1:]:
+        if DATE_REGEX.match(field):
+            date = field
+        elif field.lower() in COUNTRY_CODES:
+            country = COUNTRY_CODES[field.lower()]
+        elif field.upper() in COUNTRIES:
+            country = field.upper()
+
+    return accession, country, date
+
+
+def load_metadata(filename, index=None):
+    '''Function that returns the metadata table of a fasta file, only the header lines
+    are read (through the index offsets)
+
+    Args:
+        filename: the fasta file
+        index: the index of the file (default: load_fasta_index(filename))
+
+    Returns:
+        List of rows (accession, country, date), aligned with the index
+    '''
+    if index is None:
+        index = load_fasta_index(filename)
+
+    metadata = []
+
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return metadata
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for entry in index:
+                # The header is between its '>' and the first base (it may itself contain '>')
+                header_offset, offset = entry[5], entry[2]
+                metadata.append(parse_header(mm[header_offset + 1:offset].decode()))
+
+    return metadata
+
+
+def select_records(filename, country=None, date=None, after=None, before=None, accession=None):
+    '''Function that selects the records of a fasta file from their metadata, without reading the sequences
+    E.g: select_records(BANK_FASTA, country="USA", date="2020") -> every USA genome of 2020
+    A record matches a date filter only if its date is at least as precise as the filter: with
+    date="2020-12" or after="2020-12-01", a record only dated "2020" is left out.
+
+    Args:
+        filename: the fasta file
+        country: ISO 3166 alpha-3 code or a name of COUNTRIES (or a list of them), ValueError otherwise
+        date: date prefix ("2020", "2020-12", "2020-12-15")
+        after: first date kept (included, same precisions as date)
+        before: last date kept (included, same precisions as date)
+        accession: accession (or list of accessions), with or without the version
+
+    Returns:
+        The index entries of the selected records, in file order (see iter_genomes_index)
+    '''
+    index = load_fasta_index(filename)
+    metadata = load_metadata(filename, index)
+    countries = _codes(country)
+    accessions = None if accession is None else set([accession] if isinstance(accession, str) else accession)
+    entries = []
+
+    for entry, (acc, c, d) in zip(index, metadata):
+        if countries is not None and c not in countries:
+            continue
+        if date is not None and not d.startswith(date):
+            continue
+        if after is not None and (len(d) < len(after) or d[:len(after)] < after):
+            continue
+        if before is not None and (len(d) < len(before) or d[:len(before)] > before):
+            continue
+        if accessions is not None and acc not in accessions and acc.split(".")[0] not in accessions:
+            continue
+        entries.append(entry)
+
+    return entries
+
+
+def _codes(country):
+    '''Normalizes the country filter into a set of codes (None: no filter), ValueError for a name that
+    is not in COUNTRIES (only the codes of the other countries can be used)'''
+    if country is None:
+        return None
+    if isinstance(country, str):
+        country = [country]
+
+    codes = set()
+    for c in country:
+        if c.lower() in COUNTRY_CODES:
+            codes.add(COUNTRY_CODES[c.lower()])
+        elif len(c) == 3 and c.isalpha():
+            codes.add(c.upper())
+        else:
+            raise ValueError(f"unknown country {c!r}, use its ISO 3166 alpha-3 code")
+    return codes
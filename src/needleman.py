@@ -1,9 +1,12 @@
+from src.genome import *
+
+
 def needleman(seq1, seq2, cost_table = None, cost_mat = None, key = None, verbose = False):
     '''Function that calculates the global alignement of two sequences
     
     Args:
-        seq1: first sequence
-        seq2: second sequence
+        seq1: first sequence (str or Genome)
+        seq2: second sequence (str or Genome)
         cost_table: contains the match, mismatch and the gap cost in this order (mutual exlusive with cost_mat)
         cost_mat: contains the cost matrix and the gap at the end (mutual exlusive with cost_table and used with key)
         key: the order of the letters in the cost matrix (mutual exlusive with cost_table)
@@ -16,6 +19,8 @@ def needleman(seq1, seq2, cost_table = None, cost_mat = None, key = None, verbos
         An array contains one possible alignements with its score 
         E.g: [seq1 alignement, seq2 alignement, score]
     '''
+    seq1, seq2 = sequence_of(seq1), sequence_of(seq2)
+
     # Some sanity checks:
     if cost_table and cost_mat and key:
         print("Error: cost_mat and key are mutually exlusive with cost_table, please use the one or the other")
@@ -127,6 +132,8 @@ def needleman_all(seq1, seq2, cost_table = None, cost_mat = None, key = None):
         An array contains all possible alignements with their respective scores
         E.g: [ [seq1 alignement 1, seq2 alignement 1, score 1], [seq1 alignement 2, seq2 alignement 2, score 2] ]
     '''
+    seq1, seq2 = sequence_of(seq1), sequence_of(seq2)
+
     # Some sanity checks:
     if cost_table and cost_mat and key:
         print("Error: cost_mat and key are mutually exlusive with cost_table, please use the one or the other")
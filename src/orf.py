@@ -0,0 +1,177 @@
+import numpy as np
+from src.globals import *
+from src.genome import *
+
+"""
+* Open reading frames (ORF) scanner
+    The positions of every start codon (AUG) and every stop codon (STOP_CODONS) are
+    found in one vectorized pass over the uint8 buffer of the sequence (the three
+    frames at once: a codon at position p is in the frame p % 3). The stops of each
+    frame are sorted, so each start is paired with the next in-frame stop by
+    np.searchsorted. An ORF is only a tuple of coordinates, the sequence is not copied:
+
+    (start, end, frame, strand)
+    - start, end: the ORF is ARNm[start:end] on the forward strand (stop codon excluded,
+                  like start_to_stop)
+    - frame:      0, 1 or 2, position of the start codon modulo 3 on its strand
+    - strand:     1 (forward) or -1 (reverse complement: the ORF is the reverse complement
+                  of ARNm[start:end])
+"""
+
+# Complement of each base (and of the IUPAC ambiguity codes) of an ARNm
+COMPLEMENT_TABLE = np.arange(256, dtype=np.uint8)
+for base, complement in zip("AUGCRYKMBVDH", "UACGYRMKVBHD"):
+    COMPLEMENT_TABLE[ord(base)] = ord(complement)
+
+
+def positions_codons(codes, codons):
+    '''Function that finds every position of some codons in a buffer, in the three frames
+
+    Args:
+        codes: uint8 numpy array, the ASCII code of each base (see codes_of)
+        codons: list of codons (3 characters each)
+
+    Returns:
+        Sorted int64 numpy array of the positions
+    '''
+    n = len(codes) - 2
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    found = np.zeros(n, dtype=bool)
+    for codon in codons:
+        c0, c1, c2 = codon.encode("latin-1")
+        found |= (codes[:n] == c0) & (codes[1:n + 1] == c1) & (codes[2:] == c2)
+    return np.flatnonzero(found)
+
+
+def stops_par_frame(stops):
+    '''Function that splits sorted stop positions by frame (position modulo 3)'''
+    return [stops[stops % 3 == f] for f in range(3)]
+
+
+def prochains_stops(starts, stops):
+    '''Function that pairs each start with the next in-frame stop (np.searchsorted)
+
+    Args:
+        starts: int64 numpy array of the start positions
+        stops: sorted int64 numpy array of the stop positions
+
+    Returns:
+        int64 numpy array: for each start, the position of the first stop codon of the same
+        frame after it, -1 if there is none
+    '''
+    suivants = np.full(len(starts), -1, dtype=np.int64)
+
+    for f, frame_stops in enumerate(stops_par_frame(stops)):
+        selection = np.flatnonzero(starts % 3 == f)
+        k = np.searchsorted(frame_stops, starts[selection] + 3)
+        trouve = k < len(frame_stops)
+        suivants[selection[trouve]] = frame_stops[k[trouve]]
+
+    return suivants
+
+
+def orfs_brin(codes, min_codons=0, nested=True):
+    '''Function that finds the ORFs of one strand
+
+    Args:
+        codes: uint8 numpy array, the ASCII code of each base
+        min_codons: minimum number of codons of an ORF (stop codon excluded)
+        nested: if False, only the first start of each stop is kept (the longest ORF)
+
+    Returns:
+        Tuple of int64 numpy arrays (starts, ends), sorted by start
+    '''
+    starts = positions_codons(codes, ["AUG"])
+    ends = prochains_stops(starts, positions_codons(codes, STOP_CODONS))
+
+    keep = (ends >= 0) & (ends - starts >= 3 * min_codons)
+    starts, ends = starts[keep], ends[keep]
+
+    if not nested:
+        # The starts are sorted: the first start of each stop is the longest ORF
+        _, first = np.unique(ends, return_index=True)
+        first.sort()
+        starts, ends = starts[first], ends[first]
+    return starts, ends
+
+
+def orfs(ARNm, reverse=False, min_codons=0, nested=True):
+    '''Function that finds every ORF of an ARNm sequence: every start codon paired with the next
+    stop codon of its frame, in the three frames (and the three of the reverse complement)
+
+    Args:
+        ARNm: the ARNm sequence (Genome, str or bytes)
+        reverse: if True the reverse complement strand is scanned too
+        min_codons: minimum number of codons of an ORF (stop codon excluded)
+        nested: if False, the ORFs that start inside a longer ORF of the same stop are left out
+
+    Returns:
+        List of ORFs (start, end, frame, strand), see the top of the file, forward strand first
+    '''
+    codes = codes_of(ARNm)
+    if codes is None:
+        codes = codes_of("".join(ARNm))
+
+    starts, ends = orfs_brin(codes, min_codons, nested)
+    l = [(start, end, start % 3, 1) for start, end in zip(starts.tolist(), ends.tolist())]
+
+    if reverse:
+        length = len(codes)
+        starts, ends = orfs_brin(COMPLEMENT_TABLE[codes[::-1]], min_codons, nested)
+        # Coordinates on the reverse strand [a, b[ are [length - b, length - a[ on the forward strand
+        l += [(length - end, length - start, start % 3, -1) for start, end in zip(starts.tolist(), ends.tolist())]
+
+    return l
+
+
+def sequence_orf(ARNm, orf):
+    '''Function that returns the sequence of an ORF (a copy)
+
+    Args:
+        ARNm: the ARNm sequence the ORF was found in
+        orf: the ORF (start, end, frame, strand)
+
+    Returns:
+        The sequence (str), from the start codon to the stop codon excluded
+    '''
+    start, end, _, strand = orf
+    codes = codes_of(ARNm)
+    if codes is None:
+        codes = codes_of("".join(ARNm))
+
+    region = codes[start:end]
+    if strand < 0:
+        region = COMPLEMENT_TABLE[region[::-1]]
+    return region.tobytes().decode("latin-1")
+
+
+def start_to_stop_glouton(codes):
+    '''Function that returns the positions of the sequences given by start_to_stop (greedy scan:
+    after a stop, the scan resumes after it, and it stops at the first start without stop),
+    each jump uses the precomputed positions of the starts and stops
+
+    Args:
+        codes: uint8 numpy array, the ASCII code of each base
+
+    Returns:
+        List of (start, end) positions, the sequence is ARNm[start:end] (stop codon excluded)
+    '''
+    length = len(codes)
+    starts = positions_codons(codes, ["AUG"])
+    frame_stops = stops_par_frame(positions_codons(codes, STOP_CODONS))
+    l = []
+    k = 0
+
+    while k < len(starts) and starts[k] < length - 4:
+        i = int(starts[k])
+        stops = frame_stops[i % 3]
+        s = np.searchsorted(stops, i + 3)
+        if s == len(stops):
+            break
+        j = int(stops[s])
+        l.append((i, j))
+        k = np.searchsorted(starts, j + 3)
+
+    return l
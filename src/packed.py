@@ -0,0 +1,210 @@
+import struct
+import numpy as np
+from src.globals import *
+from src.utility import *
+
+"""
+* 2-bit packed genome store
+    Every base of an ARNm sequence is stored on 2 bits (its position in NUCLEOTIDES:
+    A=0, U=1, G=2, C=3), 4 bases per byte. Any other character (ambiguity codes
+    like N, Y, K..., or anything else) is stored in a sparse run-length side table
+    (start, length, character) and encoded as 0 in the packed buffer.
+
+    In memory a packed genome is a tuple (header, length, packed, runs):
+    - header: the fasta header of the record
+    - length: number of bases
+    - packed: uint8 numpy array of ceil(length / 4) bytes
+    - runs:   numpy array of RUN_DTYPE, the runs of non AUGC characters
+
+    On disk: PACKED_MAGIC, number of records (uint32), then for each record
+    the header length (uint32), the header (utf-8), length (uint32), number of
+    runs (uint32), the runs and the packed bases.
+"""
+
+PACKED_MAGIC = b"SC2P\x01"
+RUN_DTYPE = np.dtype([("start", "<u4"), ("length", "<u4"), ("base", "u1")])
+
+# Lookup tables between the characters and their 2-bit code (255 = not AUGC)
+ENCODE_TABLE = np.full(256, 255, dtype=np.uint8)
+for code, base in enumerate(NUCLEOTIDES):
+    ENCODE_TABLE[ord(base)] = code
+SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
+# Each packed byte gives its 4 bases at once (4 characters seen as one uint32)
+DECODE_TABLE = np.frombuffer(NUCLEOTIDES.encode(), dtype=np.uint8)[(np.arange(256, dtype=np.uint8)[:, None] >> SHIFTS) & 3].view("<u4").ravel()
+
+
+def pack_genome(sequence, header=""):
+    '''Function that packs an ARNm sequence on 2 bits per base
+
+    Args:
+        sequence: the ARNm sequence (str)
+        header: the fasta header of the sequence
+
+    Returns:
+        The packed genome (header, length, packed, runs)
+    '''
+    raw = np.frombuffer(sequence.encode("latin-1"), dtype=np.uint8)
+    length = len(raw)
+    codes = ENCODE_TABLE[raw]
+    ambiguous = codes == 255
+
+    # Runs of the same non AUGC character
+    if ambiguous.any():
+        previous = np.concatenate(([False], ambiguous[:-1]))
+        changed = np.concatenate(([True], raw[1:] != raw[:-1]))
+        starts = np.flatnonzero(ambiguous & (~previous | changed))
+        following = np.concatenate((ambiguous[1:], [False]))
+        next_changed = np.concatenate((raw[1:] != raw[:-1], [True]))
+        ends = np.flatnonzero(ambiguous & (~following | next_changed)) + 1
+        runs = np.empty(len(starts), dtype=RUN_DTYPE)
+        runs["start"], runs["length"], runs["base"] = starts, ends - starts, raw[starts]
+        codes[ambiguous] = 0
+    else:
+        runs = np.empty(0, dtype=RUN_DTYPE)
+
+    padded = np.zeros(-(-length // 4) * 4, dtype=np.uint8)
+    padded[:length] = codes
+    packed = np.bitwise_or.reduce(padded.reshape(-1, 4) << SHIFTS, axis=1).astype(np.uint8)
+    return header, length, packed, runs
+
+
+def unpack_genome(packed_genome):
+    '''Function that returns the ARNm sequence of a packed genome
+
+    Args:
+        packed_genome: the packed genome (header, length, packed, runs)
+
+    Returns:
+        The ARNm sequence (str)
+    '''
+    _, length, packed, runs = packed_genome
+    chars = DECODE_TABLE.take(packed).tobytes()[:length]
+
+    if len(runs):
+        chars = np.frombuffer(chars, dtype=np.uint8).copy()
+        lengths = runs["length"].astype(np.int64)
+        firsts = np.cumsum(lengths) - lengths
+        positions = np.repeat(runs["start"].astype(np.int64) - firsts, lengths) + np.arange(lengths.sum())
+        chars[positions] = np.repeat(runs["base"], lengths)
+        chars = chars.tobytes()
+
+    return chars.decode("latin-1")
+
+
+def fasta_to_packed(filename, packed_filename):
+    '''Function that converts a fasta file into a packed genome file, the file is read
+    one record at a time
+
+    Args:
+        filename: the fasta file
+        packed_filename: the packed file to write
+
+    Returns:
+        The number of records written
+    '''
+    n = 0
+
+    with open(packed_filename, "wb") as f:
+        f.write(PACKED_MAGIC)
+        f.write(struct.pack("<I", 0))   # number of records, written at the end
+
+        for header, sequence in iter_fasta(filename, TRANSCRIPTION_BYTES_TABLE):
+            write_packed_genome(f, pack_genome(sequence, header))
+            n += 1
+
+        f.seek(len(PACKED_MAGIC))
+        f.write(struct.pack("<I", n))
+
+    return n
+
+
+def write_packed_genome(f, packed_genome):
+    '''Function that writes one packed genome in an opened (binary) file
+
+    Args:
+        f: the file
+        packed_genome: the packed genome (header, length, packed, runs)
+    '''
+    header, length, packed, runs = packed_genome
+    header = header.encode()
+    f.write(struct.pack("<I", len(header)))
+    f.write(header)
+    f.write(struct.pack("<II", length, len(runs)))
+    f.write(runs.tobytes())
+    f.write(packed.tobytes())
+
+
+def iter_packed(packed_filename):
+    '''Generator that reads the packed genomes of a packed file
+
+    Args:
+        packed_filename: the packed file (see fasta_to_packed)
+
+    Yields:
+        The packed genomes (header, length, packed, runs), in file order
+    '''
+    with open(packed_filename, "rb") as f:
+        data = f.read()
+
+    if data[:len(PACKED_MAGIC)] != PACKED_MAGIC:
+        raise ValueError(f"{packed_filename} is not a packed genome file")
+
+    pos = len(PACKED_MAGIC)
+    n, = struct.unpack_from("<I", data, pos)
+    pos += 4
+
+    for _ in range(n):
+        header_length, = struct.unpack_from("<I", data, pos)
+        pos += 4
+        header = data[pos:pos + header_length].decode()
+        pos += header_length
+        length, n_runs = struct.unpack_from("<II", data, pos)
+        pos += 8
+        runs = np.frombuffer(data, dtype=RUN_DTYPE, count=n_runs, offset=pos)
+        pos += n_runs * RUN_DTYPE.itemsize
+        packed = np.frombuffer(data, dtype=np.uint8, count=-(-length // 4), offset=pos)
+        pos += len(packed)
+        yield header, length, packed, runs
+
+
+def load_packed(packed_filename):
+    '''Function that loads every packed genome of a packed file (about 4 times
+    less memory than the ARNm strings)
+
+    Args:
+        packed_filename: the packed file (see fasta_to_packed)
+
+    Returns:
+        List of the packed genomes (header, length, packed, runs)
+    '''
+    return list(iter_packed(packed_filename))
+
+
+def iter_packed_genomes(packed_filename):
+    '''Generator that reads the ARNm sequences of a packed file
+
+    Args:
+        packed_filename: the packed file (see fasta_to_packed)
+
+    Yields:
+        The ARNm sequence of each record, in file order
+    '''
+    for packed_genome in iter_packed(packed_filename):
+        yield unpack_genome(packed_genome)
+
+
+def packed_to_genome(packed_filename):
+    '''Function that loads a packed file, returns the same thing as fasta_to_genome
+    on the original fasta file
+
+    Args:
+        packed_filename: the packed file (see fasta_to_packed)
+
+    Returns:
+        The first sequence if the file contains only one, a table of sequences otherwise
+    '''
+    genome = list(iter_packed_genomes(packed_filename))
+
+    if len(genome) == 1:
+        return genome[0]
+    return genome
@@ -188,6 +188,36 @@ def funcs_performance(funcs, args_arr, sizes, figure=True, tick_spacing=1, title
     return performance
 
 
+def files_performance(funcs, files, repeat=3, figure=True, title="Function Performance Comparison", save=True):
+    '''
+        Measure the execution time of funcs on each file and return an array of plottable tuple array.
+        The best time of 'repeat' runs is kept, the x axis is the file size (in bytes).
+
+        Args:
+            funcs: the functions to be measured, they take the file name as only argument
+            files: the files that funcs will be executed on
+            repeat: how many times each measurment is repeated
+            figure: if figure is set True a the result will be plotted
+            save: if save is set to True the graph result will be saved on disk
+            title: the title of the figure
+
+        Returns: 
+            Array of tuples of the measured performance
+    '''
+    performance = [ [] for _ in range(len(funcs)) ]
+
+    for i in range(len(funcs)):
+        for f in files:
+            best = min(measure_single_call(funcs[i], [f], [0])[1] for _ in range(repeat))
+            performance[i].append((os.path.getsize(f), best))
+
+        performance[i].sort(key=lambda p: p[0])
+
+    if figure:
+        plot_multi_graph(performance, legends=[f'{func.__name__} performance' for func in funcs], title=title, save=save)
+    return performance
+
+
 # Multi-threading solutions
 
 def func_performance_mt(func, args_arr, sizes, figure=True, sort_by=0, tick_spacing=1, save=True):
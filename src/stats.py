@@ -1,6 +1,10 @@
 import math
+import os
+import numpy as np
 
 from os import stat
+from fractions import Fraction
+from multiprocessing import Pool
 from src.utility import *
 from src.codon import *
 
@@ -28,7 +32,59 @@ def moyenne(list):
 
 
 def mediane(list):
-    ''' La fonction donne la médiane de l'échantillon
+    '''La fonction donne la médiane de l'échantillon, sans trier toute la liste (voir selection)
+
+    Args :
+        list : liste de valeurs
+
+    Returns :
+        la médiane de la liste
+    '''
+    if not list:
+        return None
+    valeurs = selection(list, rangs_mediane(len(list)))
+
+    if len(valeurs) == 2:
+        return (valeurs[0] + valeurs[1]) / 2
+    return valeurs[0]
+
+
+def quartile(list, n):  # quartile(2,list) est la médiane
+    '''La fonction donne le quartile (1er, 2e, ou 3e) de l'échantillon, sans trier toute la liste (voir selection)
+
+    Args :
+        list : liste de valeurs
+
+    Returns :
+        le quartile (1er, 2e, ou 3e) de la liste
+    '''
+    if not list:
+        return None
+    if n not in [1, 2, 3]:
+        return None
+    if n == 2:  # la médiane
+        return mediane(list)
+    return selection(list, rangs_quartile(len(list), n))[0]
+
+
+def intervalle_interquartile(list):
+    '''La fonction calcule l'intervalle interquartile (Q3-Q1) d'une liste de valeurs en entrée (list)
+
+    Args:
+        list: une liste de valeurs
+
+    Returns:
+        la valeur de l'invertalle interquartile (Q3-Q1) de la liste d'entrée
+    '''
+    if not list:
+        return None
+    t = len(list)
+    quart1, quart3 = selection(list, rangs_quartile(t, 1) + rangs_quartile(t, 3))
+    return quart3 - quart1
+
+
+def mediane_tri(list):
+    ''' Ancienne version de mediane, qui trie toute la liste
 
     Args :
         list : liste de valeurs
@@ -48,8 +104,8 @@ def mediane(list):
         return L[(n-1) // 2]
 
 
-def quartile(list, n):  # quartile(2,list) est la médiane
-    ''' La fonction donne le quartile (1er, 2e, ou 3e) de l'échantillon
+def quartile_tri(list, n):
+    ''' Ancienne version de quartile, qui trie toute la liste
 
     Args :
         list : liste de valeurs
@@ -62,7 +118,7 @@ def quartile(list, n):  # quartile(2,list) est la médiane
     if n not in [1, 2, 3]:
         return None
     if n == 2:  # la médiane
-        return mediane(list)
+        return mediane_tri(list)
 
     L = sorted(list)
     t = len(list)
@@ -79,18 +135,59 @@ def quartile(list, n):  # quartile(2,list) est la médiane
             return L[int(3*t/4)]
 
 
-def intervalle_interquartile(list):
-    '''La fonction calcule l'intervalle interquartile (Q3-Q1) d'une liste de valeurs en entrée (list)
+def selection(list, rangs):
+    '''La fonction donne les valeurs de rangs donnés (à partir de 0) de la liste triée, sans la trier.
+    La méthode est choisie selon le type et la taille de la liste :
+    - petite liste (moins de SELECTION_MIN valeurs) ou valeurs non numériques : sorted
+    - entiers dans une petite plage (comme les comptages de nombre_element_echantillon) : tri par comptage
+    - sinon : sélection en temps linéaire (introselect, np.partition)
 
-    Args:
-        list: une liste de valeurs
+    Args :
+        list : liste de valeurs (non vide)
+        rangs : liste de rangs
 
-    Returns:
-        la valeur de l'invertalle interquartile (Q3-Q1) de la liste d'entrée
+    Returns :
+        la liste des valeurs de ces rangs
     '''
-    if not list:
-        return None
-    return quartile(list, 3) - quartile(list, 1)
+    if len(list) < SELECTION_MIN:
+        L = sorted(list)
+        return [L[k] for k in rangs]
+
+    valeurs = np.asarray(list)
+
+    if valeurs.dtype.kind in "iu" and valeurs.ndim == 1:
+        mini, maxi = valeurs.min().item(), valeurs.max().item()
+        if maxi - mini <= COUNTING_SORT_RANGE * len(valeurs):
+            cumul = np.cumsum(np.bincount(valeurs - mini))
+            return [int(np.searchsorted(cumul, k, side="right")) + mini for k in rangs]
+    elif valeurs.dtype.kind != "f" or valeurs.ndim != 1:
+        L = sorted(list)
+        return [L[k] for k in rangs]
+
+    return np.partition(valeurs, rangs)[rangs].tolist()
+
+
+def rangs_mediane(t):
+    '''Rangs (à partir de 0) des valeurs moyennées par mediane sur t valeurs'''
+    if t % 2 == 0:
+        return [t//2, t//2 - 1]
+    return [(t-1) // 2]
+
+
+def rangs_quartile(t, n):
+    '''Rang (à partir de 0) de la valeur choisie par quartile(..., n) sur t valeurs'''
+    if n == 2:
+        return rangs_mediane(t)
+    if t % 4 == 0:
+        return [t//4 - 1] if n == 1 else [3*t//4]
+    return [t//4] if n == 1 else [int(3*t/4)]
+
+
+def valeur_rangs(rank, rangs):
+    '''Valeur (moyenne si deux rangs, comme mediane) des rangs donnés, rank(k) donnant la valeur de rang k'''
+    if len(rangs) == 2:
+        return (rank(rangs[0]) + rank(rangs[1])) / 2
+    return rank(rangs[0])
 
 
 def variance(list):
@@ -141,17 +238,77 @@ def proportions(sequence, sampler):
         dico_proportions : Dictionnaire associant les proportions aux éléments de la séquence
     '''
 
-    dico_nombre_elements = nombre_elements(sequence, sampler)
     taille = len(sequence)
     if taille == 0:
         return {s: 0 for s in sampler}
-    
-    dico_proportions = {}
-    
-    for element in dico_nombre_elements:
-        dico_proportions[element] = dico_nombre_elements[element] / taille
 
-    return dico_proportions
+    counts = count_matrix([sequence], sampler)[0]
+    return {element: counts[j].item() / taille for j, element in enumerate(elements(sampler))}
+
+
+def proportion_matrix(sequences, sampler):
+    '''Retourne la matrice des proportions des éléments de chaque séquence (voir count_matrix)
+
+    Args:
+        sequences : les séquences ARNm ou d'Acides aminés (une liste ou un itérable)
+        sampler : The list of elements to sample (ARMm nucleotides or Amino-acids) (type : list)
+
+    Returns:
+        Matrice (n_sequences x n_elements) des proportions, 0 pour une séquence vide
+    '''
+    matrix, tailles = count_matrix(sequences, sampler, lengths=True)
+    return np.divide(matrix, tailles[:, None], out=np.zeros(matrix.shape), where=tailles[:, None] != 0)
+
+
+PROPORTIONS_CACHE_SIZE = 4    # nombre de matrices gardées par un MemoProportions
+
+
+class MemoProportions:
+    '''Dernières matrices de proportions calculées (voir proportion_matrix_memo). Le memo appartient à
+    celui qui le crée (par exemple pour une série d'appels sur le même échantillon) : les séquences
+    qu'il garde sont libérées avec lui, ou par clear'''
+    __slots__ = ("taille", "entrees")
+
+    def __init__(self, taille=PROPORTIONS_CACHE_SIZE):
+        self.taille = taille
+        self.entrees = []   # (sampler, séquences, matrice), la plus récemment utilisée à la fin
+
+    def matrice(self, sequences, sampler):
+        '''La matrice des proportions des séquences (une liste ou un tuple), calculée si elle n'est pas gardée'''
+        keys = elements(sampler)
+
+        for i, (cle, refs, matrix) in enumerate(self.entrees):
+            if cle == keys and len(refs) == len(sequences) and all(a is b for a, b in zip(refs, sequences)):
+                self.entrees.append(self.entrees.pop(i))
+                return matrix
+
+        matrix = proportion_matrix(sequences, sampler)
+        matrix.flags.writeable = False
+        self.entrees.append((keys, list(sequences), matrix))
+        del self.entrees[:-self.taille]
+        return matrix
+
+    def clear(self):
+        '''Oublie toutes les matrices (et les séquences)'''
+        self.entrees.clear()
+
+
+def proportion_matrix_memo(sequences, sampler, memo=None):
+    '''Même chose que proportion_matrix, mais la matrice est gardée dans memo : les appels suivants sur la
+    même liste de séquences (les mêmes objets, dans le même ordre) et le même sampler ne recomptent rien.
+    Sans memo, ou pour un itérateur (générateur...), rien n'est gardé
+
+    Args:
+        sequences : les séquences ARNm ou d'Acides aminés
+        sampler : The list of elements to sample (ARMm nucleotides or Amino-acids) (type : list)
+        memo : le MemoProportions où garder la matrice (optionnel)
+
+    Returns:
+        Matrice (n_sequences x n_elements) des proportions, en lecture seule si elle est gardée
+    '''
+    if memo is None or not isinstance(sequences, (list, tuple)):
+        return proportion_matrix(sequences, sampler)
+    return memo.matrice(sequences, sampler)
 
 
 #####################################
@@ -173,26 +330,93 @@ def call_stat_taille_genome(stat_func, tab, *args):
     return stat_func(tailles, *args)
 
 
+def resume_statistique(matrix):
+    '''Fonction qui calcule toutes les stats de chaque colonne d'une matrice en une fois :
+    chaque colonne n'est triée qu'une fois (médiane et quartiles) et la moyenne n'est calculée
+    qu'une fois (variance et écart-type). Les résultats sont identiques à ceux de moyenne, mediane,
+    ecart_type, variance, quartile et intervalle_interquartile (sommes dans le même ordre)
+
+    Args:
+        matrix:     matrice (n_valeurs x n_colonnes) d'entiers ou de réels
+
+    Returns:
+        Dictionnaire qui associe à chaque stat la liste de ses valeurs (une par colonne)
+    '''
+    matrix = np.asarray(matrix)
+    n = len(matrix)
+    colonnes = matrix.shape[1] if matrix.ndim == 2 else 0
+
+    if n == 0:
+        return {stat: [None] * colonnes for stat in STATS}
+
+    if matrix.dtype.kind == "f":
+        sommes = np.cumsum(matrix, axis=0)[-1].tolist()     # somme séquentielle, comme moyenne
+    else:
+        sommes = matrix.sum(axis=0).tolist()                # entiers : somme exacte
+    moy = [somme / n for somme in sommes]
+    # float_power (pow de la libm) et non ** (x * x) : mêmes arrondis que (m-k)**2 dans variance
+    var = (np.cumsum(np.float_power(np.array(moy) - matrix, 2), axis=0)[-1] / n).tolist()
+
+    L = np.sort(matrix, axis=0)
+    if n % 2 == 0:
+        med = [(a + b) / 2 for a, b in zip(L[n//2].tolist(), L[n//2-1].tolist())]
+    else:
+        med = L[(n-1) // 2].tolist()
+
+    if n % 4 == 0:
+        quart1, quart3 = L[n//4 - 1].tolist(), L[3*n//4].tolist()
+    else:
+        quart1, quart3 = L[n//4].tolist(), L[int(3*n/4)].tolist()
+
+    stats = {}
+    stats["moy"]        = moy
+    stats["med"]        = med
+    stats["ecartt"]     = [math.sqrt(v) for v in var]
+    stats["var"]        = var
+    stats["quart1"]     = quart1
+    stats["quart3"]     = quart3
+    stats["int_quart"]  = [q3 - q1 for q1, q3 in zip(quart1, quart3)]
+    return stats
+
+
+def perform_all_stats_liste(valeurs):
+    '''Fonction generale qui fait tout l'analyse statistique sur une liste de valeurs
+
+    Args:
+        valeurs:    liste de valeurs (par exemple les tailles des séquences)
+
+    Returns:
+        Dictionnaire qui contients les stats
+    '''
+    resume = resume_statistique(np.array(valeurs).reshape(-1, 1))
+    return {stat: resume[stat][0] for stat in STATS}
+
+
 def perform_all_stats_taille(sequences):
     '''Fonction generale qui fait tout l'analyse statistique sur la taille des séquences
 
     Args:
-        sequences:  l'échantillon
+        sequences:  l'échantillon (une liste ou un itérable, par exemple iter_genomes)
 
     Returns:
         Dictionnaire qui contients les stats
     '''
-    # Optimise this function by calling nombre_element_echantillion outside
-    # nbr_elm_ech = nombre_element_echantillon(sequences, sampler)
-    stats = {}
-    stats["moy"] = call_stat_taille_genome(moyenne, sequences)
-    stats["med"] = call_stat_taille_genome(mediane, sequences)
-    stats["ecartt"] = call_stat_taille_genome(ecart_type, sequences)
-    stats["var"] = call_stat_taille_genome(variance, sequences)
-    stats["quart1"] = call_stat_taille_genome(quartile, sequences, 1)
-    stats["quart3"] = call_stat_taille_genome(quartile, sequences, 3)
-    stats["int_quart"] = call_stat_taille_genome(intervalle_interquartile, sequences)
-    return stats
+    # Les tailles sont calculées une seule fois : l'échantillon n'est parcouru
+    # qu'une fois, ce qui permet de lui passer un générateur
+    return perform_all_stats_liste(taille_ensemble(sequences))
+
+
+def perform_all_stats_taille_fasta(filename):
+    '''Fonction generale qui fait tout l'analyse statistique sur la taille des séquences d'un fichier fasta,
+    les tailles sont lues dans l'index du fichier (voir fasta_index.py) sans charger les séquences
+
+    Args:
+        filename:   le fichier fasta
+
+    Returns:
+        Dictionnaire qui contients les stats
+    '''
+    return perform_all_stats_liste(index_lengths(filename))
 
 
 def call_stat(stat_func, sequences, sampler, *args):
@@ -207,8 +431,25 @@ def call_stat(stat_func, sequences, sampler, *args):
     Returns: 
         Dictionnaire qui à le retoure de la fonction
     '''
-    nbr = nombre_element_echantillon(sequences, sampler)
-    return call_stat_on_echantillon(stat_func, nbr, *args)
+    matrix = count_matrix(sequences, sampler)
+    # Comme nombre_element_echantillon : aucun élément si l'échantillon est vide
+    return call_stat_matrix(stat_func, matrix, sampler if len(matrix) else [], *args)
+
+
+def call_stat_matrix(stat_func, matrix, sampler, *args):
+    '''Fonction generale qui appelle une fonction statistique sur chaque colonne d'une matrice
+    de comptage (voir count_matrix) ou de proportions (voir proportion_matrix)
+
+    Args:
+        stat_func:  fonction statistique à appeler
+        matrix:     matrice (n_sequences x n_elements)
+        sampler:    les éléments, dans l'ordre des colonnes
+        *args:      arguments supplémentaires optionelle
+
+    Returns:
+        Dictionnaire qui à le retoure de la fonction
+    '''
+    return {element: stat_func(matrix[:, j].tolist(), *args) for j, element in enumerate(elements(sampler))}
 
 
 def call_stat_on_echantillon(stat_func, nb_elm_ech, *args):
@@ -216,7 +457,8 @@ def call_stat_on_echantillon(stat_func, nb_elm_ech, *args):
 
     Args:
         stat_func:  fonction statistique à appeler
-        nb_elm_ech: nombre elements echantillon d'une séquence donnée
+        nb_elm_ech: nombre elements echantillon d'une séquence donnée (des listes de valeurs,
+                    ou des accumulateurs en ligne, voir stats_online.py)
         *args:      argument supplémentaire optionelle
     
     Returns: 
@@ -226,12 +468,16 @@ def call_stat_on_echantillon(stat_func, nb_elm_ech, *args):
     d = {s: 0 for s in list_element}
 
     for element in list_element:
-        d[element] = stat_func(nb_elm_ech[element], *args)
+        valeurs = nb_elm_ech[element]
+        if hasattr(valeurs, "stat"):    # Accumulateur (stats_online.py)
+            d[element] = valeurs.stat(stat_func, *args)
+        else:
+            d[element] = stat_func(valeurs, *args)
 
     return d
 
 
-def call_stat_prop(stat_func, sequences, sampler, *args):
+def call_stat_prop(stat_func, sequences, sampler, *args, memo=None):
     '''Fonction generale qui appelle les autres fonctions statistiques pour les proportions
 
     Args:
@@ -239,59 +485,471 @@ def call_stat_prop(stat_func, sequences, sampler, *args):
         sequences:  tableau des sequances ARNm ou d'Acides aminés
         sampler:    les valeurs à prendre comme des echantillons (NUCLEOTIDES ou AMINO_ACIDS)
         *args:      arguments supplémentaires optionel (notamment n pour l'appel de quartile)
+        memo:       MemoProportions partagé par plusieurs appels (voir proportion_matrix_memo)
 
     Returns: 
         Dictionnaire qui à le retoure de la fonction
     '''
-    dicos = [proportions(sequence, sampler) for sequence in sequences]
-    resultat = {}
+    matrix = proportion_matrix_memo(sequences, sampler, memo)
+    return {element: stat_func(matrix[:, j].tolist(), *args) for j, element in enumerate(elements(sampler))}
 
-    for element in sampler:
-        liste = [dico[element] for dico in dicos]
-        resultat[element] = stat_func(liste, *args)
 
-    return resultat
+def proportions_echantillon(tab, sampler, memo=None):
+    '''Retourne un dictionnaire indiquant les proportions de chaque element dans l'echantillon
 
+    Args:
+        tab:        les séquences ARNm ou d'Acides aminés (une liste ou un itérable)
+        sampler:    les éléments à prendre en compte (NUCLEOTIDES ou AMINO_ACIDS)
+        memo:       voir proportion_matrix_memo
 
-def perform_all_stats_prop(sequences, sampler):
+    Returns:
+        Dictionnaire qui associe à chaque élément la liste de ses proportions dans les séquences
+    '''
+    matrix = proportion_matrix_memo(tab, sampler, memo)
+    return {element: matrix[:, j].tolist() for j, element in enumerate(elements(sampler))}
+
+
+def perform_all_stats_prop(sequences, sampler, memo=None):
     '''Fonction generale qui fait tout l'analyse statistique sur la proportion des nucléotides dans les séquences
 
     Args:
-        sequences:  l'échantillon
+        sequences:  l'échantillon (une liste ou un itérable, par exemple iter_genomes)
         sampler : la base laquelle prendre comme des échantillons (NUCLEOTIDES ou AMINO_ACIDS)
+        memo:       voir proportion_matrix_memo
 
     Returns:
         Dictionnaire qui contients les stats
     '''
-    stats = {}
-    stats["moy"] = call_stat_prop(moyenne, sequences, sampler)
-    stats["med"] = call_stat_prop(mediane, sequences, sampler)
-    stats["ecartt"] = call_stat_prop(ecart_type, sequences, sampler)
-    stats["var"] = call_stat_prop(variance, sequences, sampler)
-    stats["quart1"] = call_stat_prop(quartile, sequences, sampler, 1)
-    stats["quart3"] = call_stat_prop(quartile, sequences, sampler, 3)
-    stats["int_quart"] = call_stat_prop(intervalle_interquartile, sequences, sampler)
-    return stats
+    return perform_all_stats_matrix(proportion_matrix_memo(sequences, sampler, memo), sampler)
 
 
 def perform_all_stats(sequences, sampler):
     '''Fonction general qui fait tout l'analyse statistique
 
     Args:
-        stat_func:  fonction statistique à appeler
+        sequences:  l'échantillon (une liste ou un itérable, par exemple iter_genomes)
         sampler:    les valeurs à prendre comme des echantillons
     
     Returns: 
         Dictionnaire qui contients les stats
     '''
-    # Optimise this function by calling nombre_element_echantillion outside
-    nbr_elm_ech = nombre_element_echantillon(sequences, sampler)
+    matrix = count_matrix(sequences, sampler)
+    # Comme nombre_element_echantillon : aucun élément si l'échantillon est vide
+    return perform_all_stats_matrix(matrix, sampler if len(matrix) else [])
+
+
+def perform_all_stats_matrix(matrix, sampler):
+    '''Fonction general qui fait tout l'analyse statistique sur les colonnes d'une matrice
+    (voir count_matrix et proportion_matrix)
+
+    Args:
+        matrix:     matrice (n_sequences x n_elements)
+        sampler:    les éléments, dans l'ordre des colonnes
+
+    Returns:
+        Dictionnaire qui contients les stats
+    '''
+    resume = resume_statistique(matrix)
+    return {stat: dict(zip(elements(sampler), resume[stat])) for stat in STATS}
+
+
+def bootstrap(stat_func, matrix, *args, B=None, seed=None, processes=1):
+    '''Fonction qui calcule la distribution bootstrap d'une stat sur chaque colonne d'une matrice :
+    les B rééchantillonnages (tirages avec remise de n lignes) sont tirés d'un coup dans une matrice
+    d'indices (par morceaux d'au plus BOOTSTRAP_CHUNK indices) et la stat est calculée par numpy
+    sur chaque ligne. Chaque morceau a son propre générateur (SeedSequence.spawn) : pour une graine
+    donnée le résultat ne dépend pas du nombre de processus.
+
+    Args:
+        stat_func:  moyenne, mediane, quartile, variance, ecart_type ou intervalle_interquartile
+        matrix:     matrice (n_valeurs x n_colonnes), par exemple count_matrix, ou liste de valeurs
+        *args:      argument supplémentaire de la stat (n pour quartile)
+        B:          nombre de rééchantillonnages (par défaut BOOTSTRAP_RESAMPLES)
+        seed:       graine du générateur aléatoire
+        processes:  nombre de processus qui se partagent les morceaux (None : tous les coeurs)
+
+    Returns:
+        Matrice (B x n_colonnes) des valeurs de la stat, None si la matrice est vide
+    '''
+    matrix = np.asarray(matrix)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(-1, 1)
+    n = len(matrix)
+    if n == 0:
+        return None
+
+    B = BOOTSTRAP_RESAMPLES if B is None else B
+    par_morceau = max(1, BOOTSTRAP_CHUNK // n)
+    tailles = [min(par_morceau, B - i) for i in range(0, B, par_morceau)]
+    graines = np.random.SeedSequence(seed).spawn(len(tailles))
+    taches = [(stat_func, matrix, taille, graine, args) for taille, graine in zip(tailles, graines)]
+
+    if processes is None:
+        processes = os.cpu_count()
+    if processes <= 1 or len(taches) <= 1:
+        resultats = [bootstrap_morceau(*tache) for tache in taches]
+    else:
+        with Pool(min(processes, len(taches))) as pool:
+            resultats = pool.starmap(bootstrap_morceau, taches)
+
+    return np.concatenate(resultats)
+
+
+def bootstrap_morceau(stat_func, matrix, taille, graine, args):
+    '''Stat de taille rééchantillonnages des colonnes de matrix (exécutée dans les processus) : les mêmes
+    indices servent à toutes les colonnes, chaque rééchantillonnage d'une colonne est réduit au nombre de
+    tirages de chacune de ses valeurs distinctes (bincount)'''
+    n = len(matrix)
+    indices = np.random.default_rng(graine).integers(0, n, size=(taille, n))
+    colonnes = []
+
+    for j in range(matrix.shape[1]):
+        valeurs, codes = np.unique(matrix[:, j], return_inverse=True)
+        m = len(valeurs)
+        tirages = codes.reshape(-1)[indices] + (np.arange(taille) * m)[:, None]
+        poids = np.bincount(tirages.reshape(-1), minlength=taille * m).reshape(taille, m)
+        colonnes.append(stat_poids(stat_func, valeurs, poids, *args))
+
+    return np.column_stack(colonnes)
+
+
+def moyenne_poids(valeurs, poids):
+    '''moyenne de chaque échantillon d'une matrice de poids (voir stat_poids)'''
+    return poids @ valeurs / int(poids[0].sum())
+
+
+def variance_poids(valeurs, poids):
+    '''variance de chaque échantillon d'une matrice de poids (voir stat_poids)'''
+    # Écarts à la moyenne de chaque échantillon (comme variance)
+    ecarts = valeurs - moyenne_poids(valeurs, poids)[:, None]
+    return (poids * ecarts * ecarts).sum(axis=1) / int(poids[0].sum())
+
+
+def ecart_type_poids(valeurs, poids):
+    '''ecart_type de chaque échantillon d'une matrice de poids (voir stat_poids)'''
+    return np.sqrt(variance_poids(valeurs, poids))
+
+
+def rangs_poids(valeurs, poids, rangs):
+    '''Valeur (moyenne si deux rangs, comme mediane) des rangs donnés de chaque échantillon d'une matrice de poids'''
+    cumul = np.cumsum(poids, axis=1)
+    # La valeur de rang k est la première dont le cumul des poids dépasse k
+    return np.mean([valeurs[(cumul <= k).sum(axis=1)] for k in rangs(int(poids[0].sum()))], axis=0)
+
+
+def mediane_poids(valeurs, poids):
+    '''mediane de chaque échantillon d'une matrice de poids (voir stat_poids)'''
+    return rangs_poids(valeurs, poids, rangs_mediane)
+
+
+def quartile_poids(valeurs, poids, n):
+    '''quartile de chaque échantillon d'une matrice de poids (voir stat_poids)'''
+    if n not in [1, 2, 3]:
+        raise ValueError(f"bootstrap: unsupported quartile {n}")
+    return rangs_poids(valeurs, poids, lambda t: rangs_quartile(t, n))
+
+
+def intervalle_interquartile_poids(valeurs, poids):
+    '''intervalle_interquartile de chaque échantillon d'une matrice de poids (voir stat_poids)'''
+    return quartile_poids(valeurs, poids, 3) - quartile_poids(valeurs, poids, 1)
+
+
+# Version de chaque fonction statistique sur une matrice de poids (voir stat_poids)
+STATS_POIDS = {
+    moyenne: moyenne_poids,
+    mediane: mediane_poids,
+    quartile: quartile_poids,
+    variance: variance_poids,
+    ecart_type: ecart_type_poids,
+    intervalle_interquartile: intervalle_interquartile_poids,
+}
+
+
+def stat_poids(stat_func, valeurs, poids, *args):
+    '''La stat de chaque échantillon d'une matrice de poids, avec les mêmes rangs que mediane et quartile
+
+    Args:
+        stat_func:  moyenne, mediane, quartile, variance, ecart_type ou intervalle_interquartile (voir STATS_POIDS)
+        valeurs:    les valeurs distinctes, triées
+        poids:      matrice (B x n_valeurs), le nombre de fois que chaque valeur est dans chaque échantillon
+        *args:      argument supplémentaire de la stat (n pour quartile)
+
+    Returns:
+        Tableau des B valeurs
+    '''
+    if stat_func not in STATS_POIDS:
+        raise ValueError(f"bootstrap: unsupported statistic {stat_func}")
+    return STATS_POIDS[stat_func](valeurs, poids, *args)
+
+
+def intervalle_bootstrap(stat_func, matrix, *args, B=None, niveau=None, seed=None, processes=1):
+    '''Fonction qui calcule l'intervalle de confiance bootstrap (méthode des percentiles) d'une stat
+    sur chaque colonne d'une matrice
+
+    Args:
+        stat_func, matrix, *args, B, seed, processes: voir bootstrap
+        niveau:     niveau de confiance (par défaut BOOTSTRAP_LEVEL)
+
+    Returns:
+        Liste des intervalles (bas, haut), un par colonne, None si la matrice est vide
+    '''
+    distribution = bootstrap(stat_func, matrix, *args, B=B, seed=seed, processes=processes)
+    if distribution is None:
+        return None
+
+    alpha = (1 - (BOOTSTRAP_LEVEL if niveau is None else niveau)) / 2
+    bas, haut = np.quantile(distribution, [alpha, 1 - alpha], axis=0)
+    return list(zip(bas.tolist(), haut.tolist()))
+
+
+def call_stat_bootstrap(stat_func, sequences, sampler, *args, proportions=False, B=None, niveau=None, seed=None, processes=1, memo=None):
+    '''Même chose que call_stat (ou call_stat_prop) mais donne l'intervalle de confiance bootstrap de la stat
+
+    Args:
+        stat_func:  fonction statistique (voir bootstrap)
+        sequences:  tableau des sequences ARN, Acides aminés
+        sampler:    les valeurs à prendre comme des echantillons
+        *args:      argument supplémentaire de la stat (n pour quartile)
+        proportions: si True, intervalles des stats sur les proportions (comme call_stat_prop)
+        B, niveau, seed, processes: voir intervalle_bootstrap
+        memo:       voir proportion_matrix_memo
+
+    Returns:
+        Dictionnaire élément -> intervalle (bas, haut)
+    '''
+    if proportions:
+        matrix = proportion_matrix_memo(sequences, sampler, memo)
+    else:
+        matrix = count_matrix(sequences, sampler)
+
+    if not len(matrix):
+        # Comme call_stat et call_stat_prop sur un échantillon vide
+        return {element: None for element in elements(sampler)} if proportions else {}
+
+    intervalles = intervalle_bootstrap(stat_func, matrix, *args, B=B, niveau=niveau, seed=seed, processes=processes)
+    return dict(zip(elements(sampler), intervalles))
+
+
+#####################################
+# FONCTIONS PONDÉRÉES               #
+#####################################
+
+def valeurs_ponderees(valeurs, poids):
+    '''Regroupe des valeurs pondérées par valeur distincte (voir stat_ponderee)
+
+    Args:
+        valeurs:    liste de valeurs
+        poids:      le nombre de fois que compte chaque valeur (entiers)
+
+    Returns:
+        Tuple (valeurs distinctes triées, leurs poids (int64), somme des poids)
+    '''
+    poids = np.asarray(poids, dtype=np.int64)
+    distinctes, codes = np.unique(np.asarray(valeurs), return_inverse=True)
+    poids = np.bincount(codes.reshape(-1), weights=poids, minlength=len(distinctes)).astype(np.int64)
+    return distinctes, poids, int(poids.sum())
+
+
+def moyenne_exacte(distinctes, poids, n):
+    '''Moyenne exacte (Fraction) des valeurs distinctes pondérées (voir valeurs_ponderees)'''
+    return sum(Fraction(v) * p for v, p in zip(distinctes.tolist(), poids.tolist())) / n
+
+
+def moyenne_ponderee(valeurs, poids):
+    '''moyenne de la liste où chaque valeur est répétée poids fois (voir stat_ponderee)'''
+    distinctes, poids, n = valeurs_ponderees(valeurs, poids)
+    if n == 0:
+        return None
+    return float(moyenne_exacte(distinctes, poids, n))
+
+
+def variance_ponderee(valeurs, poids):
+    '''variance de la liste où chaque valeur est répétée poids fois (voir stat_ponderee)'''
+    distinctes, poids, n = valeurs_ponderees(valeurs, poids)
+    if n == 0:
+        return None
+    m = moyenne_exacte(distinctes, poids, n)
+    return float(sum(p * (Fraction(v) - m)**2 for v, p in zip(distinctes.tolist(), poids.tolist())) / n)
+
+
+def ecart_type_ponderee(valeurs, poids):
+    '''ecart_type de la liste où chaque valeur est répétée poids fois (voir stat_ponderee)'''
+    var = variance_ponderee(valeurs, poids)
+    return None if var is None else math.sqrt(var)
+
+
+def rangs_ponderes(valeurs, poids, rangs):
+    '''Valeur (moyenne si deux rangs, comme mediane) des rangs donnés de la liste répétée triée, None si elle est vide'''
+    distinctes, poids, n = valeurs_ponderees(valeurs, poids)
+    if n == 0:
+        return None
+    # La valeur de rang k est la première dont le cumul des poids dépasse k
+    cumul = np.cumsum(poids)
+    return valeur_rangs(lambda k: distinctes[np.searchsorted(cumul, k, side="right")].item(), rangs(n))
+
+
+def mediane_ponderee(valeurs, poids):
+    '''mediane de la liste où chaque valeur est répétée poids fois (voir stat_ponderee)'''
+    return rangs_ponderes(valeurs, poids, rangs_mediane)
+
+
+def quartile_ponderee(valeurs, poids, n):
+    '''quartile de la liste où chaque valeur est répétée poids fois (voir stat_ponderee)'''
+    if n not in [1, 2, 3]:
+        return None
+    return rangs_ponderes(valeurs, poids, lambda t: rangs_quartile(t, n))
+
+
+def intervalle_interquartile_ponderee(valeurs, poids):
+    '''intervalle_interquartile de la liste où chaque valeur est répétée poids fois (voir stat_ponderee)'''
+    quart1 = quartile_ponderee(valeurs, poids, 1)
+    return None if quart1 is None else quartile_ponderee(valeurs, poids, 3) - quart1
+
+
+# Version pondérée de chaque fonction statistique
+STATS_PONDEREES = {
+    moyenne: moyenne_ponderee,
+    mediane: mediane_ponderee,
+    quartile: quartile_ponderee,
+    variance: variance_ponderee,
+    ecart_type: ecart_type_ponderee,
+    intervalle_interquartile: intervalle_interquartile_ponderee,
+}
+
+
+def stat_ponderee(stat_func, valeurs, poids, *args):
+    '''Même chose que stat_func sur la liste où chaque valeur est répétée poids fois, par exemple
+    sur les séquences dédoublonnées (voir dedup.py) avec leurs multiplicités. Les calculs ne portent
+    que sur les valeurs distinctes.
+    - mediane, quartile et intervalle_interquartile : exactement le même résultat
+    - moyenne, variance et ecart_type : calculées exactement (Fraction) puis arrondies une fois.
+      Pour des entiers (comptages, tailles) moyenne donne le même résultat. Sur des réels (proportions)
+      moyenne et variance somment en flottants dans l'ordre de la liste, ordre que les multiplicités
+      ne donnent pas : elles peuvent différer du résultat exact au dernier chiffre près
+
+    Args:
+        stat_func:  moyenne, mediane, quartile, variance, ecart_type ou intervalle_interquartile (voir STATS_PONDEREES)
+        valeurs:    liste de valeurs
+        poids:      le nombre de fois que compte chaque valeur (entiers)
+        *args:      argument supplémentaire de la stat (n pour quartile)
+
+    Returns:
+        la valeur de la stat, None si la somme des poids est nulle (comme sur une liste vide)
+    '''
+    if stat_func not in STATS_PONDEREES:
+        raise ValueError(f"stat_ponderee: unsupported statistic {stat_func}")
+    return STATS_PONDEREES[stat_func](valeurs, poids, *args)
+
+
+def perform_all_stats_liste_pondere(valeurs, poids):
+    '''Même chose que perform_all_stats_liste sur des valeurs pondérées (voir stat_ponderee)
+
+    Args:
+        valeurs:    liste de valeurs
+        poids:      le nombre de fois que compte chaque valeur
+
+    Returns:
+        Dictionnaire qui contients les stats
+    '''
     stats = {}
-    stats["moy"]        = call_stat_on_echantillon(moyenne, nbr_elm_ech)
-    stats["med"]        = call_stat_on_echantillon(mediane, nbr_elm_ech)
-    stats["ecartt"]     = call_stat_on_echantillon(ecart_type, nbr_elm_ech)
-    stats["var"]        = call_stat_on_echantillon(variance, nbr_elm_ech)
-    stats["quart1"]     = call_stat_on_echantillon(quartile, nbr_elm_ech, 1)
-    stats["quart3"]     = call_stat_on_echantillon(quartile, nbr_elm_ech, 3)
-    stats["int_quart"]  = call_stat_on_echantillon(intervalle_interquartile, nbr_elm_ech)
+    stats["moy"]        = moyenne_ponderee(valeurs, poids)
+    stats["med"]        = mediane_ponderee(valeurs, poids)
+    stats["ecartt"]     = ecart_type_ponderee(valeurs, poids)
+    stats["var"]        = variance_ponderee(valeurs, poids)
+    stats["quart1"]     = quartile_ponderee(valeurs, poids, 1)
+    stats["quart3"]     = quartile_ponderee(valeurs, poids, 3)
+    stats["int_quart"]  = intervalle_interquartile_ponderee(valeurs, poids)
     return stats
+
+
+def call_stat_pondere(stat_func, sequences, sampler, poids, *args, proportions=False):
+    '''Même chose que call_stat (ou call_stat_prop) sur des séquences distinctes et leurs multiplicités :
+    chaque séquence n'est comptée qu'une fois (voir stat_ponderee pour l'exactitude des résultats)
+
+    Args:
+        stat_func:  fonction statistique (voir stat_ponderee)
+        sequences:  les séquences distinctes (voir dedup)
+        sampler:    les valeurs à prendre comme des echantillons
+        poids:      la multiplicité de chaque séquence
+        *args:      argument supplémentaire de la stat (n pour quartile)
+        proportions: si True, stats sur les proportions (comme call_stat_prop)
+
+    Returns:
+        Dictionnaire qui à le retoure de la fonction
+    '''
+    if proportions:
+        matrix = proportion_matrix_memo(sequences, sampler)
+    else:
+        matrix = count_matrix(sequences, sampler)
+        sampler = sampler if len(matrix) else []    # comme call_stat sur un échantillon vide
+    return {element: stat_ponderee(stat_func, matrix[:, j], poids, *args) for j, element in enumerate(elements(sampler))}
+
+
+def perform_all_stats_pondere(sequences, sampler, poids, proportions=False):
+    '''Même chose que perform_all_stats (ou perform_all_stats_prop) sur des séquences distinctes et leurs
+    multiplicités (voir dedup, et stat_ponderee pour l'exactitude des résultats)
+
+    Args:
+        sequences:  les séquences distinctes
+        sampler:    les valeurs à prendre comme des echantillons
+        poids:      la multiplicité de chaque séquence
+        proportions: si True, stats sur les proportions (comme perform_all_stats_prop)
+
+    Returns:
+        Dictionnaire qui contients les stats
+    '''
+    if proportions:
+        matrix = proportion_matrix_memo(sequences, sampler)
+    else:
+        matrix = count_matrix(sequences, sampler)
+        sampler = sampler if len(matrix) else []
+    colonnes = [perform_all_stats_liste_pondere(matrix[:, j], poids) for j in range(len(elements(sampler)))]
+    return {stat: {element: c[stat] for element, c in zip(elements(sampler), colonnes)} for stat in STATS}
+
+
+def perform_all_stats_taille_pondere(sequences, poids):
+    '''Même chose que perform_all_stats_taille sur des séquences distinctes et leurs multiplicités
+
+    Args:
+        sequences:  les séquences distinctes (voir dedup)
+        poids:      la multiplicité de chaque séquence
+
+    Returns:
+        Dictionnaire qui contients les stats
+    '''
+    return perform_all_stats_liste_pondere(taille_ensemble(sequences), poids)
+
+
+#####################################
+# FONCTION HISTOGRAMME              #
+#####################################
+
+def histogramme(valeurs, minimum, maximum, nb_tranches):
+    '''Fonction qui compte les valeurs de chaque tranche d'un histogramme (celui des fonctions plot_histo_*)
+
+    La tranche j contient les valeurs v telles que int(minimum + j*t) <= v < int(minimum + (j+1)*t),
+    avec t = (maximum - minimum) / nb_tranches. Chaque valeur est placée par une recherche
+    dichotomique dans les bornes (np.searchsorted) : O(n log(nb_tranches)) au lieu de O(n * nb_tranches).
+
+    Args:
+        valeurs:     liste (ou tableau) de valeurs
+        minimum:     borne inférieure de la première tranche
+        maximum:     borne supérieure (exclue) de la dernière tranche
+        nb_tranches: nombre de tranches
+
+    Returns:
+        Tuple (tranches, barres) : la position de chaque barre et le nombre de valeurs de chaque tranche
+    '''
+    taille_tranches = (maximum - minimum) / nb_tranches
+    # Mêmes arrondis que int(minimum + j*taille_tranches) pour chaque borne
+    bornes = (minimum + np.arange(nb_tranches + 1) * taille_tranches).astype(np.int64)
+
+    valeurs = np.asarray(valeurs)
+    valeurs = valeurs[(valeurs >= bornes[0]) & (valeurs < bornes[-1])]
+    # Indice de la dernière borne <= v : les tranches vides (bornes égales) sont sautées
+    indices = np.searchsorted(bornes, valeurs, side="right") - 1
+    barres = np.bincount(indices, minlength=nb_tranches).tolist()
+
+    tranches = bornes[:-1].tolist()
+    tranches[-1] += 1
+    return tranches, barres
@@ -0,0 +1,350 @@
+import math
+import numpy as np
+from itertools import islice
+from src.stats import *
+
+"""
+* Statistiques en ligne (flux de séquences de taille quelconque, mémoire bornée)
+    - Welford : moyenne et variance exactes (aux arrondis près) en un seul passage,
+      les lots de valeurs sont fusionnés avec la formule de Chan
+    - DDSketch : quantiles approchés avec une erreur relative garantie ALPHA
+      (la valeur renvoyée v' de rang k vérifie |v' - v| <= ALPHA * |v|),
+      la mémoire dépend de l'étendue des valeurs (log) et non de leur nombre,
+      elle est de plus bornée par max_buckets (les plus petites valeurs absolues sont
+      alors regroupées et leur erreur n'est plus bornée : voir DDSketch.rank_error)
+
+    Les médianes et quartiles utilisent les mêmes rangs que mediane et quartile.
+    Un Accumulateur peut être donné à call_stat_on_echantillon à la place d'une liste.
+"""
+
+ALPHA = 0.01        # erreur relative des quantiles
+MAX_BUCKETS = 2048  # nombre maximal de buckets par signe du sketch
+BATCH_SIZE = 1000   # nombre de séquences comptées à la fois (voir accumulate_echantillon)
+
+
+class Welford:
+    '''Moyenne et variance en ligne (algorithme de Welford, fusion de Chan)'''
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        '''Ajoute une valeur'''
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def add_many(self, values):
+        '''Ajoute un lot de valeurs (tableau numpy ou liste)'''
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            mean = values.mean()
+            self._merge(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    def merge(self, other):
+        '''Fusionne un autre accumulateur (par exemple calculé par un autre processus)'''
+        if other.count:
+            self._merge(other.count, other.mean, other.m2)
+
+    def _merge(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def variance(self):
+        '''Variance (de la population, comme variance), None si aucune valeur'''
+        if not self.count:
+            return None
+        return self.m2 / self.count
+
+
+class DDSketch:
+    '''Sketch de quantiles à erreur relative bornée (DDSketch, Masson et al. 2019)
+
+    Les valeurs sont rangées dans des buckets de bornes géométriques gamma^(i-1) < |x| <= gamma^i,
+    avec gamma = (1 + alpha) / (1 - alpha) : le milieu (relatif) d'un bucket est à moins de alpha
+    en relatif de toute valeur du bucket. Deux sketchs de même alpha se fusionnent exactement.
+    '''
+    __slots__ = ("alpha", "gamma", "log_gamma", "max_buckets", "count", "zeros", "positives", "negatives", "collapsed")
+
+    def __init__(self, alpha=ALPHA, max_buckets=MAX_BUCKETS):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.count = 0
+        self.zeros = 0
+        self.positives = {}     # indice du bucket -> nombre de valeurs
+        self.negatives = {}     # idem pour les valeurs absolues des valeurs négatives
+        # Plus grand bucket regroupé des positives et des négatives (None : aucun),
+        # l'erreur des buckets d'indice inférieur ou égal n'est plus bornée
+        self.collapsed = [None, None]
+
+    def add(self, x):
+        '''Ajoute une valeur'''
+        self.add_many([x])
+
+    def add_many(self, values):
+        '''Ajoute un lot de valeurs (tableau numpy ou liste)'''
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        self.zeros += int(np.count_nonzero(values == 0))
+        self._add(0, values[values > 0])
+        self._add(1, -values[values < 0])
+
+    def _store(self, side):
+        return self.negatives if side else self.positives
+
+    def _add(self, side, values):
+        if len(values):
+            store = self._store(side)
+            keys, counts = np.unique(np.ceil(np.log(values) / self.log_gamma).astype(np.int64), return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                store[key] = store.get(key, 0) + count
+            self._collapse(side)
+
+    def _collapse(self, side, collapsed=None):
+        '''Garde au plus max_buckets buckets : les plus petites valeurs absolues sont regroupées
+        (leur erreur n'est alors plus bornée, comme dans DDSketch, voir rank_error)'''
+        store = self._store(side)
+        if len(store) > self.max_buckets:
+            keys = sorted(store)
+            limit = keys[len(keys) - self.max_buckets]
+            store[limit] = sum(store.pop(key) for key in keys[:len(keys) - self.max_buckets + 1])
+            collapsed = limit if collapsed is None else max(collapsed, limit)
+        if collapsed is not None:
+            self.collapsed[side] = collapsed if self.collapsed[side] is None else max(self.collapsed[side], collapsed)
+
+    def merge(self, other):
+        '''Fusionne un autre sketch de même alpha'''
+        if other.alpha != self.alpha:
+            raise ValueError("DDSketch: only sketches with the same alpha can be merged")
+        self.count += other.count
+        self.zeros += other.zeros
+        for side in (0, 1):
+            store = self._store(side)
+            for key, count in other._store(side).items():
+                store[key] = store.get(key, 0) + count
+            self._collapse(side, other.collapsed[side])
+
+    def value(self, key):
+        '''Valeur représentant le bucket key (à moins de alpha en relatif de ses valeurs)'''
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def rank(self, k):
+        '''Valeur approchée de la (k+1)-ième plus petite valeur ajoutée (k commence à 0)'''
+        bucket = self._bucket(k)
+        if bucket is None:
+            return None
+        side, key = bucket
+        if side is None:
+            return 0.0
+        return -self.value(key) if side else self.value(key)
+
+    def rank_error(self, k):
+        '''Borne de l'erreur absolue sur la valeur renvoyée par rank(k), math.inf si elle est dans
+        un bucket regroupé (voir _collapse), None si le rang n'existe pas'''
+        bucket = self._bucket(k)
+        if bucket is None:
+            return None
+        side, key = bucket
+        if side is None:
+            return 0.0
+        if self.collapsed[side] is not None and key <= self.collapsed[side]:
+            return math.inf
+        return self.error(self.value(key))
+
+    def _bucket(self, k):
+        '''(côté, indice) du bucket de la (k+1)-ième plus petite valeur (côté 0 : positives, 1 : négatives),
+        (None, None) pour un zéro, None si le rang n'existe pas'''
+        if not 0 <= k < self.count:
+            return None
+
+        for key in sorted(self.negatives, reverse=True):
+            k -= self.negatives[key]
+            if k < 0:
+                return 1, key
+        k -= self.zeros
+        if k < 0:
+            return None, None
+        for key in sorted(self.positives):
+            k -= self.positives[key]
+            if k < 0:
+                return 0, key
+
+    def error(self, value):
+        '''Borne de l'erreur absolue sur une valeur renvoyée par rank hors des buckets regroupés :
+        |v' - v| <= alpha |v| donc <= alpha |v'| / (1 - alpha)'''
+        return self.alpha * abs(value) / (1 - self.alpha)
+
+
+class Accumulateur:
+    '''Statistiques d'une suite de valeurs reçues en flux : Welford + DDSketch
+
+    Les méthodes ont le nom des fonctions de stats.py et renvoient None si aucune valeur
+    n'a été ajoutée. moyenne, variance et ecart_type sont exactes (aux arrondis près),
+    mediane, quartile et intervalle_interquartile sont approchées (voir erreur).
+    '''
+    __slots__ = ("welford", "sketch")
+
+    def __init__(self, alpha=ALPHA, max_buckets=MAX_BUCKETS):
+        self.welford = Welford()
+        self.sketch = DDSketch(alpha, max_buckets)
+
+    def add(self, x):
+        self.add_many([x])
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.welford.add_many(values)
+        self.sketch.add_many(values)
+
+    def merge(self, other):
+        self.welford.merge(other.welford)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def __len__(self):
+        return self.welford.count
+
+    def stat(self, stat_func, *args):
+        '''Appelle la méthode qui correspond à une fonction de stats.py (moyenne, quartile...),
+        ValueError pour une autre fonction (voir STATS_ACCUMULATEUR)'''
+        if stat_func not in STATS_ACCUMULATEUR:
+            raise ValueError(f"Accumulateur: unsupported statistic {stat_func}")
+        return STATS_ACCUMULATEUR[stat_func](self, *args)
+
+    def moyenne(self):
+        return self.welford.mean if len(self) else None
+
+    def variance(self):
+        return self.welford.variance()
+
+    def ecart_type(self):
+        if not len(self):
+            return None
+        return math.sqrt(self.welford.variance())
+
+    def mediane(self):
+        return self._quantile(rangs_mediane(len(self)))
+
+    def quartile(self, n):
+        if n not in [1, 2, 3]:
+            return None
+        return self._quantile(rangs_quartile(len(self), n))
+
+    def intervalle_interquartile(self):
+        if not len(self):
+            return None
+        return self.quartile(3) - self.quartile(1)
+
+    def erreur(self, stat_func, *args):
+        '''Borne de l'erreur absolue de la stat par rapport à la fonction exacte de stats.py
+
+        Args:
+            stat_func:  la fonction statistique (moyenne, mediane, quartile...)
+            *args:      ses arguments (n pour quartile)
+
+        Returns:
+            0 pour moyenne, variance et ecart_type (exactes aux arrondis près), la borne
+            du sketch pour mediane et quartile (math.inf si un rang tombe dans un bucket regroupé,
+            voir DDSketch.rank_error), la somme des deux bornes pour intervalle_interquartile,
+            None si la stat vaut None
+        '''
+        if stat_func not in STATS_ACCUMULATEUR:
+            raise ValueError(f"Accumulateur: unsupported statistic {stat_func}")
+        if not len(self):
+            return None
+        if stat_func in (moyenne, variance, ecart_type):
+            return 0.0
+        if stat_func is intervalle_interquartile:
+            return self.erreur(quartile, 1) + self.erreur(quartile, 3)
+        if stat_func is mediane:
+            rangs = rangs_mediane(len(self))
+        elif args[0] in [1, 2, 3]:
+            rangs = rangs_quartile(len(self), args[0])
+        else:
+            return None
+        return sum(self.sketch.rank_error(k) for k in rangs) / len(rangs)
+
+    def _quantile(self, rangs):
+        if not len(self):
+            return None
+        return valeur_rangs(self.sketch.rank, rangs)
+
+
+# Méthode de l'Accumulateur qui correspond à chaque fonction de stats.py
+STATS_ACCUMULATEUR = {
+    moyenne: Accumulateur.moyenne,
+    mediane: Accumulateur.mediane,
+    quartile: Accumulateur.quartile,
+    variance: Accumulateur.variance,
+    ecart_type: Accumulateur.ecart_type,
+    intervalle_interquartile: Accumulateur.intervalle_interquartile,
+}
+
+
+def accumulate_echantillon(sequences, sampler, alpha=ALPHA, proportions=False):
+    '''Fonction qui compte les éléments d'un flux de séquences dans un Accumulateur par élément,
+    les séquences sont comptées par lots de BATCH_SIZE (mémoire bornée)
+
+    Args:
+        sequences:  les séquences (un itérable de taille quelconque, par exemple iter_genomes)
+        sampler:    les éléments à compter (NUCLEOTIDES ou AMINO_ACIDS)
+        alpha:      erreur relative des quantiles
+        proportions: si True, ce sont les proportions des éléments qui sont accumulées
+
+    Returns:
+        Dictionnaire élément -> Accumulateur (à donner à call_stat_on_echantillon)
+    '''
+    keys = elements(sampler)
+    accumulateurs = {element: Accumulateur(alpha) for element in keys}
+    iterator = iter(sequences)
+    batch = list(islice(iterator, BATCH_SIZE))
+
+    while batch:
+        if proportions:
+            matrix = proportion_matrix(batch, keys)
+        else:
+            matrix = count_matrix(batch, keys)
+        for j, element in enumerate(keys):
+            accumulateurs[element].add_many(matrix[:, j])
+        batch = list(islice(iterator, BATCH_SIZE))
+
+    return accumulateurs
+
+
+def perform_all_stats_online(sequences, sampler, alpha=ALPHA, proportions=False):
+    '''Même chose que perform_all_stats (ou perform_all_stats_prop) sur un flux de séquences,
+    en mémoire bornée : médianes et quartiles à alpha près en relatif
+
+    Args:
+        sequences:  les séquences (un itérable de taille quelconque, par exemple iter_genomes)
+        sampler:    les éléments à compter (NUCLEOTIDES ou AMINO_ACIDS)
+        alpha:      erreur relative des quantiles
+        proportions: si True, stats sur les proportions (comme perform_all_stats_prop)
+
+    Returns:
+        Dictionnaire qui contients les stats
+    '''
+    accumulateurs = accumulate_echantillon(sequences, sampler, alpha, proportions)
+    return stats_accumulateurs(accumulateurs)
+
+
+def stats_accumulateurs(accumulateurs):
+    '''Toutes les stats d'un dictionnaire élément -> Accumulateur (même forme que perform_all_stats)'''
+    stats = {}
+    stats["moy"]        = call_stat_on_echantillon(moyenne, accumulateurs)
+    stats["med"]        = call_stat_on_echantillon(mediane, accumulateurs)
+    stats["ecartt"]     = call_stat_on_echantillon(ecart_type, accumulateurs)
+    stats["var"]        = call_stat_on_echantillon(variance, accumulateurs)
+    stats["quart1"]     = call_stat_on_echantillon(quartile, accumulateurs, 1)
+    stats["quart3"]     = call_stat_on_echantillon(quartile, accumulateurs, 3)
+    stats["int_quart"]  = call_stat_on_echantillon(intervalle_interquartile, accumulateurs)
+    return stats
@@ -0,0 +1,255 @@
+import json
+import os
+from itertools import islice
+from multiprocessing import Pool
+from src.stats_online import *
+
+"""
+* Résumés statistiques fusionnables (map-reduce sur des morceaux d'une banque fasta)
+    Un Resume contient, pour chaque colonne (élément du sampler, ou la taille) :
+    - le nombre de valeurs, leur somme et la somme de leurs carrés, en entiers Python exacts
+      pour les comptages et les tailles ; pour les proportions (réels) un Welford
+      (moyenne et somme des carrés des écarts, fusion de Chan) qui évite la perte de précision
+      de la somme des carrés
+    - l'histogramme exact valeur -> nombre, qui donne les quantiles exacts : sa taille est
+      le nombre de valeurs distinctes (une plage de quelques centaines d'entiers pour les
+      comptages d'une banque, au plus une par séquence pour les proportions)
+
+    Deux Resume se fusionnent (merge) et se sérialisent en JSON (to_json / from_json).
+    resume_fasta découpe la banque en morceaux d'entrées de l'index (plages d'offsets),
+    chaque morceau est résumé dans un processus, puis les résumés sont fusionnés.
+    Pour un flux sans fin, voir les accumulateurs à mémoire bornée de stats_online.py.
+"""
+
+MODES = ["nombre", "prop", "taille"]
+
+
+class Resume:
+    '''Résumé fusionnable des colonnes d'une matrice (voir count_matrix, proportion_matrix)'''
+    __slots__ = ("elements", "n", "sommes", "carres", "welfords", "histogrammes")
+
+    def __init__(self, elements):
+        self.elements = list(elements)
+        self.n = 0
+        self.sommes = [0] * len(self.elements)
+        self.carres = [0] * len(self.elements)
+        self.welfords = [Welford() for _ in self.elements]
+        self.histogrammes = [{} for _ in self.elements]
+
+    def add_matrix(self, matrix):
+        '''Ajoute les lignes d'une matrice (n_valeurs x n_colonnes)'''
+        matrix = np.asarray(matrix)
+        self.n += len(matrix)
+
+        for j in range(len(self.elements)):
+            colonne = matrix[:, j]
+            if colonne.dtype.kind in "iub":
+                colonne = colonne.astype(np.int64)
+                self.sommes[j] += int(colonne.sum())
+                self.carres[j] += int((colonne * colonne).sum())
+            else:
+                self.welfords[j].add_many(colonne)
+            valeurs, nombres = np.unique(colonne, return_counts=True)
+            self._ajoute(j, zip(valeurs.tolist(), nombres.tolist()))
+        return self
+
+    def merge(self, other):
+        '''Fusionne un autre résumé des mêmes éléments'''
+        if other.elements != self.elements:
+            raise ValueError("Resume: only summaries of the same elements can be merged")
+
+        self.n += other.n
+        for j in range(len(self.elements)):
+            self.sommes[j] += other.sommes[j]
+            self.carres[j] += other.carres[j]
+            self.welfords[j].merge(other.welfords[j])
+            self._ajoute(j, other.histogrammes[j].items())
+        return self
+
+    def _ajoute(self, j, paires):
+        histogramme = self.histogrammes[j]
+        for valeur, nombre in paires:
+            histogramme[valeur] = histogramme.get(valeur, 0) + nombre
+
+    def rank(self, j, k):
+        '''Valeur de rang k (à partir de 0) de la colonne j'''
+        for valeur in sorted(self.histogrammes[j]):
+            k -= self.histogrammes[j][valeur]
+            if k < 0:
+                return valeur
+
+    def stats(self):
+        '''Toutes les stats de chaque colonne (même forme que perform_all_stats)
+
+        Returns:
+            Dictionnaire qui contients les stats
+        '''
+        stats = {stat: {} for stat in STATS}
+        n = self.n
+
+        for j, element in enumerate(self.elements):
+            if n == 0:
+                for stat in STATS:
+                    stats[stat][element] = None
+                continue
+
+            s, c, welford = self.sommes[j], self.carres[j], self.welfords[j]
+            if welford.count:   # réels
+                moy, var = welford.mean, welford.variance()
+            else:
+                moy, var = s / n, (n * c - s * s) / (n * n)     # calcul exact sur les entiers
+            rank = lambda k: self.rank(j, k)
+
+            stats["moy"][element]       = moy
+            stats["med"][element]       = valeur_rangs(rank, rangs_mediane(n))
+            stats["ecartt"][element]    = math.sqrt(var)
+            stats["var"][element]       = var
+            stats["quart1"][element]    = valeur_rangs(rank, rangs_quartile(n, 1))
+            stats["quart3"][element]    = valeur_rangs(rank, rangs_quartile(n, 3))
+            stats["int_quart"][element] = stats["quart3"][element] - stats["quart1"][element]
+
+        return stats
+
+    def to_json(self):
+        '''Sérialise le résumé (chaîne JSON, les réels sont relus à l'identique)'''
+        return json.dumps({"elements": self.elements, "n": self.n, "sommes": self.sommes, "carres": self.carres,
+                           "welfords": [[w.count, w.mean, w.m2] for w in self.welfords],
+                           "histogrammes": [list(h.items()) for h in self.histogrammes]})
+
+    @classmethod
+    def from_json(cls, data):
+        '''Relit un résumé sérialisé par to_json'''
+        d = json.loads(data)
+        resume = cls(d["elements"])
+        resume.n, resume.sommes, resume.carres = d["n"], d["sommes"], d["carres"]
+        resume.histogrammes = [dict(h) for h in d["histogrammes"]]
+        for welford, (count, mean, m2) in zip(resume.welfords, d["welfords"]):
+            welford.count, welford.mean, welford.m2 = count, mean, m2
+        return resume
+
+
+def resume_sequences(sequences, sampler, mode="nombre"):
+    '''Fonction qui résume un itérable de séquences, par lots de BATCH_SIZE séquences
+
+    Args:
+        sequences:  les séquences (un itérable, par exemple iter_genomes)
+        sampler:    les éléments à compter (NUCLEOTIDES ou AMINO_ACIDS), ignoré pour "taille"
+        mode:       "nombre" (comptages), "prop" (proportions) ou "taille" (tailles des séquences)
+
+    Returns:
+        Le Resume
+    '''
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+
+    resume = Resume(["taille"] if mode == "taille" else elements(sampler))
+    iterator = iter(sequences)
+    batch = list(islice(iterator, BATCH_SIZE))
+
+    while batch:
+        if mode == "nombre":
+            resume.add_matrix(count_matrix(batch, sampler))
+        elif mode == "prop":
+            resume.add_matrix(proportion_matrix(batch, sampler))
+        else:
+            resume.add_matrix(np.array(taille_ensemble(batch), dtype=np.int64).reshape(-1, 1))
+        batch = list(islice(iterator, BATCH_SIZE))
+
+    return resume
+
+
+def resume_shard(filename, entries, sampler, mode="nombre"):
+    '''Fonction qui résume un morceau d'un fichier fasta (exécutée dans les processus)
+
+    Args:
+        filename:   le fichier fasta
+        entries:    les entrées de l'index du morceau (voir fasta_index.py)
+        sampler, mode: voir resume_sequences
+
+    Returns:
+        Le Resume sérialisé (to_json)
+    '''
+    if mode == "taille":
+        # Les tailles sont dans l'index : les séquences ne sont pas lues
+        resume = Resume(["taille"]).add_matrix(np.array([entry[1] for entry in entries], dtype=np.int64).reshape(-1, 1))
+    else:
+        resume = resume_sequences(iter_genomes_index(filename, entries), sampler, mode)
+    return resume.to_json()
+
+
+def shards_fasta(filename, shards):
+    '''Fonction qui découpe un fichier fasta en morceaux contigus (plages d'offsets) de tailles proches
+
+    Args:
+        filename:   le fichier fasta
+        shards:     le nombre de morceaux
+
+    Returns:
+        Liste des morceaux (listes d'entrées de l'index), sans morceau vide
+    '''
+    index = load_fasta_index(filename)
+    shards = max(1, min(shards, len(index)))
+    bornes = [len(index) * i // shards for i in range(shards + 1)]
+    return [index[bornes[i]:bornes[i + 1]] for i in range(shards) if bornes[i] < bornes[i + 1]]
+
+
+def resume_fasta(filename, sampler, mode="nombre", processes=None, shards=None):
+    '''Fonction qui résume un fichier fasta morceau par morceau dans un pool de processus
+    puis fusionne les résumés
+
+    Args:
+        filename:   le fichier fasta
+        sampler, mode: voir resume_sequences
+        processes:  nombre de processus (par défaut tous les coeurs, 1 : pas de pool)
+        shards:     nombre de morceaux (par défaut 4 par processus)
+
+    Returns:
+        Le Resume de tout le fichier
+    '''
+    if processes is None:
+        processes = os.cpu_count()
+    if shards is None:
+        shards = 4 * processes
+
+    taches = [(filename, entries, sampler, mode) for entries in shards_fasta(filename, shards)]
+
+    if processes <= 1 or len(taches) <= 1:
+        resultats = [resume_shard(*tache) for tache in taches]
+    else:
+        with Pool(processes) as pool:
+            resultats = pool.starmap(resume_shard, taches)
+
+    resume = Resume(["taille"] if mode == "taille" else elements(sampler))
+    for resultat in resultats:
+        resume.merge(Resume.from_json(resultat))
+    return resume
+
+
+def perform_all_stats_fasta(filename, sampler, proportions=False, processes=None, shards=None):
+    '''Même chose que perform_all_stats (ou perform_all_stats_prop) sur tout un fichier fasta,
+    calculé en parallèle par morceaux (voir resume_fasta)
+
+    Args:
+        filename:   le fichier fasta
+        sampler:    les éléments à compter (NUCLEOTIDES ou AMINO_ACIDS)
+        proportions: si True, stats sur les proportions (comme perform_all_stats_prop)
+        processes, shards: voir resume_fasta
+
+    Returns:
+        Dictionnaire qui contients les stats
+    '''
+    return resume_fasta(filename, sampler, "prop" if proportions else "nombre", processes, shards).stats()
+
+
+def perform_all_stats_taille_shards(filename, processes=None, shards=None):
+    '''Même chose que perform_all_stats_taille_fasta, par morceaux (voir resume_fasta)
+
+    Args:
+        filename:   le fichier fasta
+        processes, shards: voir resume_fasta
+
+    Returns:
+        Dictionnaire qui contients les stats
+    '''
+    stats = resume_fasta(filename, None, "taille", processes, shards).stats()
+    return {stat: stats[stat]["taille"] for stat in STATS}
@@ -1,64 +1,111 @@
-from Bio import SeqIO
+import gzip
+import numpy as np
+import random
+from itertools import islice
 from src.globals import *
+from src.fasta import *
+from src.fasta_index import *
+from src.genome import *
 
-def bank_sequences(n):
+try:
+    from Bio import SeqIO
+except ImportError:     # Biopython is optional, the native parser (fasta.py) is used by default
+    SeqIO = None
+
+def bank_sequences(n, sequences=None):
     '''Fonction qui donne un échantillon (une liste) de séquence de taille n qu'il récupère
     dans la banque de séquence de taille 20000 dans le fichier .fasta sans les problèmes d'ambiguité (Y, N, K etc.)
+    La banque est lue au fil de l'eau et la lecture s'arrête dès que n séquences sont trouvées
 
     Args:
         n : la taille de l'échantillon qu'on veut
+        sequences : itérable de séquences où chercher (par défaut la banque, lue au fil de l'eau)
 
     Returns:
         echantillon : la liste de séquence
     '''
-    S = fasta_to_genome("./genome/20000_sequences.fasta")
-    echantillon = []
-    k = 0
-    if not S:
-        print(k)
-        return echantillon
-
-    for i in S:
-        test = False
-        if k == n:
-            break
-
-        for j in 'RYSWKMBDHVN':
-            if j in i:
-                test = True
-                break
-        if test:
-            continue
-        else:
-            echantillon.append(i)
-            k += 1
+    if sequences is None:
+        sequences = iter_genomes_index(BANK_FASTA)
+
+    echantillon = list(islice(iter_sans_ambiguite(sequences), n))
+
+    if len(echantillon) < n:
+        print(len(echantillon))
 
     return echantillon
 
 
-def bank_sequences_rec(n):
-    '''Fonction qui donne un échantillon (une liste) de séquence de taille n qu'il récupère
-        dans la banque de séquence de taille 20000 dans le fichier .fasta sans les problèmes d'ambiguité (Y, N, K etc.)
+def bank_sequences_rec(n, sequences=None):
+    '''Ancienne version récursive de bank_sequences (limite de récursion atteinte sur la banque
+    de 20000 séquences), c'est maintenant la même chose que bank_sequences
 
         Args:
             n : la taille de l'échantillon qu'on veut
+            sequences : itérable de séquences où chercher (par défaut la banque, lue au fil de l'eau)
 
         Returns:
             echantillon : la liste de séquence
     '''
-    def recursion(S, echantillon, k):
-        if k == n:
-            return echantillon
-        elif not S:
-            print(k)
-            return echantillon
+    return bank_sequences(n, sequences)
+
+
+def sans_ambiguite(sequence):
+    '''Fonction qui teste si une séquence ne contient aucun code d'ambiguité (Y, N, K etc.)
+
+    Args:
+        sequence : la séquence
+
+    Returns:
+        True si la séquence n'a aucune ambiguité, False sinon
+    '''
+    # Une recherche en C par lettre (s'arrête à la première trouvée) est plus rapide
+    # qu'une seule passe avec une expression régulière ou numpy
+    for j in AMBIGUITES:
+        if j in sequence:
+            return False
+    return True
+
+
+def iter_sans_ambiguite(sequences):
+    '''Générateur qui filtre les séquences sans ambiguité (voir sans_ambiguite)
+
+    Args:
+        sequences : itérable de séquences
+
+    Yields:
+        Les séquences sans ambiguité, dans l'ordre
+    '''
+    return filter(sans_ambiguite, sequences)
+
+
+def echantillon_aleatoire(n, sequences=None, seed=None):
+    '''Fonction qui tire au hasard (uniformément) n séquences sans ambiguité en une seule lecture
+    de la banque et en mémoire constante (reservoir sampling)
+
+    Args:
+        n : la taille de l'échantillon qu'on veut
+        sequences : itérable de séquences où chercher (par défaut la banque, lue au fil de l'eau)
+        seed : graine du générateur aléatoire, le même seed donne le même échantillon
+
+    Returns:
+        echantillon : la liste de séquence (dans l'ordre de la banque), moins de n séquences
+        si la banque n'en contient pas assez
+    '''
+    if sequences is None:
+        sequences = iter_genomes_index(BANK_FASTA)
+
+    rng = random.Random(seed)
+    reservoir = []      # (position dans la banque, séquence)
+
+    for k, sequence in enumerate(iter_sans_ambiguite(sequences)):
+        if k < n:
+            reservoir.append((k, sequence))
         else:
-            for i in 'RYSWKMBDHVN':
-                if i in S[0]:
-                    return recursion(S[1:], echantillon, k)
-            return recursion(S[1:], echantillon+[S[0]], k+1)
+            j = rng.randrange(k + 1)
+            if j < n:
+                reservoir[j] = (k, sequence)
 
-    return recursion(fasta_to_genome("./genome/20000_sequences.fasta"), [], 0)
+    return [sequence for _, sequence in sorted(reservoir, key=lambda x: x[0])]
 
 
 def try_AUGC(L):
@@ -78,7 +125,28 @@ def try_AUGC(L):
 
 
 def transcription_complementaire(ADNc):
-    '''Function qui remplace la séquence de ADNc (ADN complémentaire) en ARNm
+    '''Function qui remplace la séquence de ADNc (ADN complémentaire) en ARNm,
+    la séquence est convertie en une seule passe (str.translate)
+    
+    Args:
+        ADN : La séquence d'ADN complémentaire du génome à retranscrire en ARNm (str, bytes, Seq ou liste)
+
+    Returns:
+        ARNm : La séquence d'ARNm issue de la séquence d'ADNc entrée.
+    '''
+    if isinstance(ADNc, (bytes, bytearray)):
+        return ADNc.translate(TRANSCRIPTION_BYTES_TABLE).decode()
+    if isinstance(ADNc, (list, tuple)):
+        ADNc = ''.join(ADNc)
+    elif not isinstance(ADNc, str):
+        ADNc = str(ADNc)    # Bio.Seq
+
+    return ADNc.translate(TRANSCRIPTION_TABLE)
+
+
+def transcription_complementaire_boucle(ADNc):
+    '''Function qui remplace la séquence de ADNc (ADN complémentaire) en ARNm,
+    première version qui traite les bases une par une (gardée pour les tests de performance)
     
     Args:
         ADN : La séquence d'ADN complémentaire du génome à retranscrire en ARNm
@@ -99,6 +167,66 @@ def transcription_complementaire(ADNc):
     return ARNm
 
 
+def transcription_echantillon(sequences):
+    '''Function qui retranscrit un lot de séquences d'ADNc en ARNm (une passe str.translate par génome,
+    plus rapide que de concaténer le lot : la concaténation et le découpage coûtent plus que les appels)
+
+    Args:
+        sequences: liste (ou itérable) de séquences d'ADNc (str)
+
+    Returns:
+        La liste des séquences d'ARNm, dans le même ordre
+    '''
+    return [ sequence.translate(TRANSCRIPTION_TABLE) for sequence in sequences ]
+
+
+def iter_genomes(filename):
+    '''Generator that parses a fasta file one record at a time (native parser, see fasta.py),
+    the file can be compressed (gzip or BGZF)
+
+    Args:
+        filename: the fasta file that contain the genomic data
+
+    Yields:
+        The transcribed sequence (ARNm) of each record, in file order
+    '''
+    # The sequence is transcribed while its line endings are removed (same pass)
+    for _, sequence in iter_fasta(filename, TRANSCRIPTION_BYTES_TABLE):
+        yield sequence
+
+
+def iter_genomes_seqio(filename):
+    '''Same as iter_genomes but parses the fasta file with Bio.SeqIO (requires Biopython)
+
+    Args:
+        filename: the fasta file that contain the genomic data
+
+    Yields:
+        The transcribed sequence (ARNm) of each record, in file order
+    '''
+    if SeqIO is None:
+        raise ImportError("iter_genomes_seqio requires Biopython (python -m pip install -U biopython)")
+
+    with (gzip.open(filename, "rt") if compression(filename) else open(filename, "r")) as handle:
+        for seq_record in SeqIO.parse(handle, "fasta"):
+            yield transcription_complementaire(seq_record.seq)
+
+
+def iter_genomes_index(filename, entries=None):
+    '''Generator that reads the records of a fasta file through its sidecar index (see fasta_index.py),
+    only the requested records are read, without parsing the rest of the file
+
+    Args:
+        filename: the fasta file that contain the genomic data
+        entries: the index entries to read (default: every record, in file order)
+
+    Yields:
+        The transcribed sequence (ARNm) of each record
+    '''
+    for sequence in iter_records(filename, entries):
+        yield transcription_complementaire(sequence)
+
+
 def fasta_to_genome(filename):
     '''Function that parse a fasta file
     
@@ -108,16 +236,38 @@ def fasta_to_genome(filename):
     Returns:
         The first sequence if the file contains only one, a table of sequences otherwise
     '''
-    genome = []
-
-    for seq_record in SeqIO.parse(filename, "fasta"):
-        genome.append(transcription_complementaire(seq_record.seq))
+    genome = list(iter_genomes(filename))
 
     if len(genome) == 1:
         return genome[0]
     return genome
 
 
+def iter_genome_records(filename):
+    '''Generator that parses a fasta file one record at a time and keeps the headers
+
+    Args:
+        filename: the fasta file that contain the genomic data
+
+    Yields:
+        A Genome (id, description and transcribed sequence) for each record, in file order
+    '''
+    for header, sequence in iter_fasta(filename, TRANSCRIPTION_BYTES_TABLE):
+        yield Genome.from_record(header, sequence)
+
+
+def fasta_to_records(filename):
+    '''Same as fasta_to_genome but the headers are kept (see genome.py)
+
+    Args:
+        filename: the fasta file that contain the genomic data
+
+    Returns:
+        List of Genome, in file order
+    '''
+    return list(iter_genome_records(filename))
+
+
 def total_elements(sequence):
     '''Nombre total d'éléments dans une sequence (ARN, ADN ou Acides aminés)
 
@@ -150,11 +300,19 @@ def nombre_elements(sequence, sampler):
     '''Retourne un dictionnaire indiquant le nombre de chaque element de la sequence
 
     Args:
-        sequence: the RNA/DNA/amino-acid sequence
+        sequence: the RNA/DNA/amino-acid sequence (str, Genome or list)
+        sampler: the elements to count
     
     Returns:
         Dictionary that contains the number of elements as value and the element as key
     '''
+    codes = codes_of(sequence)
+
+    if codes is not None:
+        # Un seul passage (np.bincount) sur le buffer uint8 de la séquence
+        counts = np.bincount(codes, minlength=257)
+        return {s: int(counts[column]) for s, column in zip(elements(sampler), _columns(sampler))}
+
     d = {s: 0 for s in sampler}
 
     for i in sequence:
@@ -168,24 +326,66 @@ def nombre_element_echantillon(tab, sampler):
     '''Retourne un dictionnaire indiquant le nombre de chaque element dans l'echantillon
 
        Args:
-           sequence: the RNA/DNA/amino-acid sequence
+           tab: the RNA/DNA/amino-acid sequences (a list or any iterable, e.g. iter_genomes)
 
        Returns:
            Dictionary that contains the number of elements (a list) as value and the element as key
     '''
-    d = {}
+    matrix = count_matrix(tab, sampler)
 
-    for seq in tab:
-        nbr = nombre_elements(seq, sampler)
-        l = list(nbr.keys())
+    if len(matrix) == 0:
+        return {}
+    return {element: matrix[:, j].tolist() for j, element in enumerate(elements(sampler))}
 
-        for element in l:
-            if element not in d:
-                d[element] = [nbr[element]]
-            else:
-                d[element].append(nbr[element])
 
-    return d
+def elements(sampler):
+    '''Liste des éléments (sans doublon, dans l'ordre) d'un sampler, ce sont les colonnes de count_matrix
+
+    Args:
+        sampler: the elements to count (NUCLEOTIDES, AMINO_ACIDS...)
+
+    Returns:
+        List of the elements
+    '''
+    return list(dict.fromkeys(sampler))
+
+
+def count_matrix(tab, sampler, lengths=False):
+    '''Compte les éléments de toutes les séquences de l'échantillon dans une matrice d'entiers
+    (np.bincount sur le buffer uint8 de chaque séquence)
+
+    Args:
+        tab: the RNA/DNA/amino-acid sequences (a list or any iterable, e.g. iter_genomes)
+        sampler: the elements to count, one column each (see elements)
+        lengths: if True, the lengths of the sequences are returned too
+
+    Returns:
+        int64 matrix (n_sequences x n_elements), and the array of the lengths if lengths is True
+    '''
+    keys = elements(sampler)
+    columns = _columns(sampler)
+    rows, sizes = [], []
+
+    for sequence in tab:
+        codes = codes_of(sequence)
+
+        if codes is None:
+            nbr = nombre_elements(sequence, sampler)
+            rows.append([nbr[element] for element in keys])
+        else:
+            rows.append(np.bincount(codes, minlength=257)[columns])
+        sizes.append(len(sequence))
+
+    matrix = np.array(rows, dtype=np.int64).reshape(len(rows), len(keys))
+
+    if lengths:
+        return matrix, np.array(sizes, dtype=np.int64)
+    return matrix
+
+
+def _columns(sampler):
+    '''Code (0-255) of each element of a sampler, 256 (never counted) if it is not a single latin-1 character'''
+    return [ord(s) if isinstance(s, str) and len(s) == 1 and ord(s) < 256 else 256 for s in elements(sampler)]
 
 
 def meme_taille(l1, l2):
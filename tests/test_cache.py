@@ -0,0 +1,65 @@
+import pytest
+import glob
+import os
+import shutil
+
+import src.cache
+
+from src.cache import *
+
+TEST_FASTA = sorted(glob.glob("./genome/*.fasta"))
+
+
+def test_cached_genome(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    for f in TEST_FASTA:
+        expected = list(iter_genomes(f))
+        assert cached_genome(f, cache_dir) == expected    # parsed and saved
+        assert cached_genome(f, cache_dir) == expected    # loaded from the cache
+    assert len(os.listdir(cache_dir)) == 2 * len(TEST_FASTA)
+
+
+def test_cached_fasta_to_genome(monkeypatch, tmp_path):
+    monkeypatch.setattr(src.cache, "CACHE_DIR", str(tmp_path))
+    for f in TEST_FASTA:
+        assert cached_fasta_to_genome(f) == fasta_to_genome(f)
+        assert cached_fasta_to_genome(f) == fasta_to_genome(f)
+
+
+def test_cache_invalidation(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    f = str(tmp_path / "seq.fasta")
+    shutil.copy("./genome/dix_minisequences.fasta", f)
+    cached_genome(f, cache_dir)
+
+    # The fasta changed: the old entry must not be used anymore
+    with open(f, "a") as out:
+        out.write("\n>extra\nACGT\n")
+    os.utime(f, ns=(os.stat(f).st_atime_ns, os.stat(f).st_mtime_ns + 10**9))
+    genome = cached_genome(f, cache_dir)
+    assert genome == list(iter_genomes(f))
+    assert genome[-1] == "ACGU"
+
+
+def test_evict_cache(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    small, big = "./genome/dix_minisequences.fasta", "./genome/dix_sequences.fasta"
+    cached_genome(small, cache_dir)
+    size = sum(os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir))
+
+    # Only the last entry fits: the least recently used one is evicted
+    cached_genome(big, cache_dir, max_size=size)
+    assert not os.path.exists(os.path.join(cache_dir, cache_key(small) + ".npy"))
+    assert os.path.exists(os.path.join(cache_dir, cache_key(big) + ".npy"))
+
+    clear_cache(cache_dir)
+    assert os.listdir(cache_dir) == []
+
+
+def test_cache_non_latin1(tmp_path):
+    f = str(tmp_path / "utf8.fasta")
+    with open(f, "wb") as fasta:
+        fasta.write(">a\nAC\xe2\x82\xacGT\n".encode("latin-1"))
+    cache_dir = str(tmp_path / "cache")
+    assert cached_genome(f, cache_dir) == list(iter_genomes(f))    # not cached
+    assert not os.path.exists(cache_dir) or os.listdir(cache_dir) == []
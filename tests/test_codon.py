@@ -15,6 +15,8 @@ EPOCHS           = 4      # How many times we test iterations we should run per
 CODONS_RUNS      = 1000    # How many arguments we will generate per epoch for codons
 CODONSV2_RUNS    = 1000    # How many arguments we will generate per epoch for codons_v2
 CODONSV3_RUNS    = 1000    # How many arguments we will generate per epoch for codons_v3
+TRADUCTION_RUNS  = 1000    # How many arguments we will generate per epoch for traduction
+IUPAC_RUNS       = 1000    # How many arguments we will generate per epoch for the IUPAC translation
 
 TEST_CASES = [
     "UUUUUCUUAUUGUCUUCCUCAUCGUAUUACUAAUAGUGUUGCUGAUGGCUUCUCCUACUGCCUCCCCCACCGCAUCACCAACAGCGUCGCCGACGGAUUAUCAUAAUGACUACCACAACGAAUAACAAAAAGAGUAGCAGAAGGGUUGUCGUAGUGGCUGCCGCAGCGGAUGACGAAGAGGGUGGCGGAGGG",
@@ -162,4 +164,93 @@ def test_codonsv3_gen():
         for arg in args:
             cds = start_to_stop(arg[0])
             amino_acids = ''.join([ str(Seq.Seq(c).translate(to_stop=True)) for c in cds ])
-            assert codons_v3(arg[0]) == amino_acids
\ No newline at end of file
+            assert codons_v3(arg[0]) == amino_acids
+
+
+def traduction_boucle(ARNm): # la boucle codon par codon de codons_v3
+    l = []
+    for seq in start_to_stop(ARNm):
+        for j in range(0, len(seq) - 2, 3):
+            codon = seq[j:j + 3]
+            if try_AUGC(codon):
+                l.append(CODONS_TO_AMINO_ACIDS[codon])
+    return "".join(l)
+
+
+def test_traduction():
+    assert len(CODON_TABLE) == 64
+    assert traduction(codes_of("AUGUUUUAAGC")) == "MF*"
+    assert traduction(codes_of("AUGNNNUUU")) == "MF"
+    assert traduction(codes_of("")) == ""
+    with pytest.raises(KeyError):
+        traduction(codes_of("AUGNNNUUU"), ignore_ambiguites=False)
+    with pytest.raises(KeyError):
+        codons_v2("AUGLOL")
+    assert codons_v3('SDFAUGFRGAAAUAG') == 'MK'
+    assert codons('AUGUUUNAAUAGAUGCCCUAA') == ['MF', 'MP']
+    assert start_to_stop_positions('SDFAUGUAGGHFYTAUGJHGFHGFHFUAA') == [(3, 6), (14, 26)]
+
+
+def test_traduction_gen():
+    for _ in range(0, EPOCHS) :
+        #----------- Generating random arguments -----------
+        for _ in range(TRADUCTION_RUNS):
+            s = ''.join(random.choices(NUCLEOTIDES * 3 + "NRY", k=random.randint(0, 100)))
+            #------------------ Test ------------------
+            assert codons_v3(s) == traduction_boucle(s)
+            assert codons_v3(Genome(s)) == codons_v3(list(s))
+            assert codons(s) == [traduction_boucle(seq + 'UAA') for seq in start_to_stop(s)]
+
+
+def acide_iupac_boucle(codon):
+    # Reference: every AUGC codon an IUPAC codon stands for
+    acides = set()
+    for autre in kmers(3):
+        if all(base in IUPAC[code] for base, code in zip(autre, codon)):
+            acides.add(CODONS_TO_AMINO_ACIDS[autre])
+    return acides.pop() if len(acides) == 1 else "X"
+
+
+def test_iupac():
+    assert len(IUPAC_CODON_TABLE) == len(IUPAC) ** 3 == 3375
+    for codon in kmers(3):
+        assert IUPAC_CODONS_TO_AMINO_ACIDS[codon] == CODONS_TO_AMINO_ACIDS[codon]
+    assert IUPAC_CODONS_TO_AMINO_ACIDS["GCN"] == "A"
+    assert IUPAC_CODONS_TO_AMINO_ACIDS["UAR"] == "*"
+    assert IUPAC_CODONS_TO_AMINO_ACIDS["MGR"] == "R"
+    assert IUPAC_CODONS_TO_AMINO_ACIDS["UAY"] == "Y"
+    assert IUPAC_CODONS_TO_AMINO_ACIDS["NNN"] == "X"
+    assert IUPAC_CODONS_TO_AMINO_ACIDS["UGR"] == "X"
+    for codon in random.sample(list(IUPAC_CODONS_TO_AMINO_ACIDS), 200):
+        assert IUPAC_CODONS_TO_AMINO_ACIDS[codon] == acide_iupac_boucle(codon)
+
+    assert traduction(codes_of("AUGNNNGCNUUU"), iupac=True) == "MXAF"
+    assert codons_v2("AUGGCNUAY", iupac=True) == "MAY"
+    assert codons_v2(list("AUGGCNUAY"), iupac=True) == "MAY"
+    assert codons_v3("AUGGCNUAYNNNUUUUAA", iupac=True) == "MAYXF"
+    assert codons_v3("AUGGCNUAYNNNUUUUAA") == "MF"
+    assert codons("AUGUUUNAAUAGAUGCCCUAA", iupac=True) == ["MFX", "MP"]
+    assert codons_echantillon(["AUGGCNUAA", "AUGUUUUAA"], iupac=True) == ["MA", "MF"]
+    with pytest.raises(KeyError):
+        codons_v2("AUGLOL", iupac=True)
+
+    # Codons with a gap or a non IUPAC letter are left out, as without iupac
+    assert codons_v3("SDFAUGFRGAAAUAG", iupac=True) == codons_v3("SDFAUGFRGAAAUAG") == "MK"
+    assert codons_v3("AUGNN-AAAUAG", iupac=True) == codons_v3("AUGNN-AAAUAG") == "MK"
+    assert codons("AUG-FNGCNUAG", iupac=True) == ["MA"]
+    assert traduction(codes_of("AUGFRGGCN"), iupac=True) == "MA"
+    # Same in the per-codon loops (a non latin-1 character, see codes_of)
+    assert codons_v3("AUGNN-GCN\u20acAAUAG", iupac=True) == "MA"
+    assert codons("AUG\u20acN-GCNUAG", iupac=True) == ["MA"]
+
+
+def test_iupac_gen():
+    for _ in range(0, EPOCHS) :
+        #----------- Generating random arguments -----------
+        for _ in range(IUPAC_RUNS):
+            s = ''.join(random.choices(NUCLEOTIDES * 3 + AMBIGUITES, k=random.randint(0, 100)))
+            #------------------ Test ------------------
+            expected = ''.join(IUPAC_CODONS_TO_AMINO_ACIDS[s[j:j + 3]] for j in range(0, len(s) - 2, 3))
+            assert codons_v2(s, iupac=True) == expected
+            assert codons_v3(s, iupac=True) == codons_v3(list(s), iupac=True)
+            assert codons_v3(s, iupac=True) == ''.join(codons(s, iupac=True))
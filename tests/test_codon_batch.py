@@ -0,0 +1,57 @@
+import pytest
+import random
+
+import src.codon_batch
+from src.codon_batch import *
+
+EPOCHS      = 5     # How many times we test iterations we should run per function
+BATCH_RUNS  = 50    # How many sequences we will generate per epoch for codons_echantillon_parallele
+
+
+def test_codons_parallele():
+    sample = ["", "AUGUUUUAA", list("AUGCCCUAG"), Genome("AUGNNNGCNUAA"), "UUAUGAAAUGA"]
+    expected = codons_echantillon(sample)
+    assert codons_echantillon_parallele(sample, processes=2) == expected
+    assert codons_echantillon_parallele(sample, processes=2, batch=2) == expected
+    assert codons_echantillon_parallele(sample, processes=1) == expected
+    assert codons_echantillon_parallele(iter(sample), processes=3, batch=1) == expected
+    assert codons_echantillon_parallele(sample, iupac=True, processes=2) == codons_echantillon(sample, iupac=True)
+    assert codons_echantillon_parallele([], processes=2) == []
+
+
+def test_copie_partagee_non_latin1():
+    with pytest.raises(ValueError):
+        copie_partagee(["AUGUUUUAA", "AUG\u20acUAA"])
+    with pytest.raises(ValueError):
+        codons_echantillon_parallele(["AUGUUUUAA", list("AUG\u20acUAA")], processes=2)
+
+
+def test_traduction_morceau_erreur(monkeypatch):
+    def traduction_orfs(vue, iupac):
+        codes = np.frombuffer(vue, dtype=np.uint8)     # a view of the block is alive when the error is raised
+        raise ValueError("invalid sequence")
+
+    block, offsets = copie_partagee(["AUGUUUUAA", "AUGCCCUAG"])
+    try:
+        assert traduction_morceau(block.name, offsets) == ["MF", "MP"]
+        monkeypatch.setattr(src.codon_batch, "traduction_orfs", traduction_orfs)
+        with pytest.raises(ValueError):     # and not BufferError from block.close()
+            traduction_morceau(block.name, offsets)
+    finally:
+        block.close()
+        block.unlink()
+
+
+def test_codons_fasta(tmp_path):
+    fasta = tmp_path / "sample.fasta"
+    fasta.write_text(">a\nATGTTTTAA\n>b\nATGCCC\nTAG\n>c\nATGNNNGCNTAA\n")
+    assert list(codons_fasta(str(fasta), processes=2)) == codons_echantillon(iter_genomes(str(fasta)))
+    assert list(codons_fasta(str(fasta), iupac=True, processes=2, batch=2)) == ["MF", "MP", "MXA"]
+
+
+def test_codons_parallele_gen():
+    for _ in range(0, EPOCHS) :
+        #----------- Generating random arguments -----------
+        sample = [''.join(random.choices(NUCLEOTIDES * 3 + "NRY", k=random.randint(0, 300))) for _ in range(BATCH_RUNS)]
+        #------------------ Test ------------------
+        assert codons_echantillon_parallele(sample, processes=2, batch=random.randint(1, BATCH_RUNS)) == codons_echantillon(sample)
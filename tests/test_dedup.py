@@ -0,0 +1,67 @@
+import pytest
+import random
+
+from src.dedup import *
+from src.stats import *
+from src.levenshtein import *
+from src.needleman import *
+
+EPOCHS      = 20    # How many times we test iterations we should run per function
+DEDUP_RUNS  = 10    # How many arguments we will generate per epoch for dedup
+
+
+def test_dedup():
+    assert dedup([]) == ([], [])
+    assert dedup(["AUG", "UUU", "AUG", "AUG"]) == (["AUG", "UUU"], [3, 1])
+    assert dedup(iter(["AUG", "UUU", "AUG"]), inverse=True) == (["AUG", "UUU"], [2, 1], [0, 1, 0])
+    assert empreinte(Genome("AUGC")) == empreinte("AUGC") == empreinte(list("AUGC"))
+    assert empreinte("AUGC") != empreinte("AUGG")
+    uniques, multiplicites = dedup([Genome("AUG"), "AUG", list("AUG")])
+    assert len(uniques) == 1 and multiplicites == [3]
+
+
+def test_dedup_stats():
+    sequences = list(iter_genomes("./genome/dix_minisequences.fasta"))
+    sample = [random.choice(sequences) for _ in range(50)]
+    uniques, multiplicites = dedup(sample)
+    assert sum(multiplicites) == len(sample)
+
+    for stat_func, args in [(moyenne, ()), (mediane, ()), (quartile, (1,)), (intervalle_interquartile, ())]:
+        assert call_stat_pondere(stat_func, uniques, NUCLEOTIDES, multiplicites, *args) == call_stat(stat_func, sample, NUCLEOTIDES, *args)
+    trads = codons_echantillon(uniques)
+    assert call_stat_pondere(mediane, trads, AMINO_ACIDS, multiplicites) == call_stat(mediane, codons_echantillon(sample), AMINO_ACIDS)
+    assert codons_echantillon_dedup(sample, processes=1) == codons_echantillon(sample)
+    assert codons_echantillon_dedup(sample, processes=2) == codons_echantillon(sample)
+
+
+def test_distances_paires():
+    sample = ["AUGC", "AUGC", "AUC", "GGG", "AUC"]
+    assert distances_paires(sample, lev) == [[lev(a, b) for b in sample] for a in sample]
+    assert distances_paires([], lev) == []
+
+    calls = []
+    def distance(a, b):
+        calls.append((a, b))
+        return lev(a, b)
+    distances_paires(sample, distance)
+    assert len(calls) == 6      # 3 distinct sequences: 3 pairs and 3 diagonals
+    calls.clear()
+    distances_paires(sample, distance, symetrique=False)
+    assert len(calls) == 9
+
+    cost_table = [1, -1, -2]
+    assert distances_paires(sample, needleman, cost_table, symetrique=False) == [[needleman(a, b, cost_table) for b in sample] for a in sample]
+
+
+def test_dedup_gen():
+    for _ in range(0, EPOCHS) :
+        #----------- Generating random arguments -----------
+        for _ in range(DEDUP_RUNS):
+            distinctes = [''.join(random.choices(NUCLEOTIDES, k=random.randint(0, 6))) for _ in range(5)]
+            sample = [random.choice(distinctes) for _ in range(random.randint(0, 20))]
+            #------------------ Test ------------------
+            uniques, multiplicites, index = dedup(sample, inverse=True)
+            assert len(set(uniques)) == len(uniques)
+            assert [uniques[k] for k in index] == sample
+            assert multiplicites == [sample.count(u) for u in uniques]
+            assert distances_paires(sample, lev) == [[lev(a, b) for b in sample] for a in sample]
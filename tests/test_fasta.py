@@ -0,0 +1,78 @@
+import pytest
+import glob
+import gzip
+import os
+
+import src.fasta
+from Bio import SeqIO
+from src.fasta import *
+from src.utility import *
+
+TEST_FASTA = sorted(glob.glob("./genome/*.fasta"))
+
+
+def test_iter_fasta_seqio():
+    for f in TEST_FASTA:
+        records = [ (record.description, str(record.seq)) for record in SeqIO.parse(f, "fasta") ]
+        assert list(iter_fasta(f)) == records
+
+
+def test_iter_genomes_seqio():
+    for f in TEST_FASTA:
+        assert list(iter_genomes(f)) == list(iter_genomes_seqio(f))
+
+
+def test_iter_fasta_chunks(monkeypatch):
+    # Records must be rebuilt correctly whatever the chunk boundaries are
+    expected = list(iter_fasta("./genome/dix_minisequences.fasta"))
+    for size in [1, 2, 7, 61, 62, 63, 1000]:
+        monkeypatch.setattr(src.fasta, "FASTA_CHUNK_SIZE", size)
+        assert list(iter_fasta("./genome/dix_minisequences.fasta")) == expected
+
+
+def test_iter_fasta_edge_cases(tmp_path):
+    f = os.path.join(tmp_path, "edge.fasta")
+    with open(f, "wb") as fasta:
+        fasta.write(b"comment before the first record\n>a first\r\nAC GT\r\nTT\r\n>empty\n>b\nNNAC")
+    assert list(iter_fasta(f)) == [("a first", "ACGTTT"), ("empty", ""), ("b", "NNAC")]
+    assert list(iter_genomes(f)) == ["ACGUUU", "", "NNAC"]
+
+    with open(f, "wb") as fasta:
+        fasta.write(b"")
+    assert list(iter_fasta(f)) == []
+
+
+def test_iter_fasta_gzip(tmp_path):
+    for f in TEST_FASTA:
+        gz = tmp_path / (os.path.basename(f) + ".gz")
+        with open(f, "rb") as src_file, gzip.open(gz, "wb") as out:
+            out.write(src_file.read())
+        assert compression(str(gz)) == "gzip"
+        assert list(iter_fasta(str(gz))) == list(iter_fasta(f))
+        assert list(iter_genomes(str(gz))) == list(iter_genomes_seqio(str(gz)))
+
+
+def test_iter_fasta_bgzf(tmp_path, monkeypatch):
+    f = "./genome/dix_sequences.fasta"
+    bgz = str(tmp_path / "dix_sequences.fasta.gz")
+    write_bgzf(f, bgz, block_size=4096)
+    assert compression(f) is None
+    assert compression(bgz) == "bgzf"
+
+    expected = list(iter_fasta(f))
+    assert list(iter_fasta(bgz, processes=1)) == expected
+    # Small batches so that several processes really work
+    monkeypatch.setattr(src.fasta, "FASTA_CHUNK_SIZE", 10000)
+    assert list(iter_fasta(bgz, processes=2)) == expected
+    assert list(iter_fasta(bgz, TRANSCRIPTION_BYTES_TABLE, processes=2)) == list(iter_fasta(f, TRANSCRIPTION_BYTES_TABLE))
+
+    # A BGZF file is also a valid gzip file
+    with gzip.open(bgz, "rb") as gz, open(f, "rb") as plain:
+        assert gz.read() == plain.read()
+
+
+def test_fasta_index_compressed(tmp_path):
+    bgz = str(tmp_path / "dix_sequences.fasta.gz")
+    write_bgzf("./genome/dix_sequences.fasta", bgz)
+    with pytest.raises(ValueError):
+        build_fasta_index(bgz)
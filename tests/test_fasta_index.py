@@ -0,0 +1,122 @@
+import pytest
+import os
+import shutil
+
+from src.stats import *
+from src.fasta_index import *
+
+TEST_FASTA = [
+    "./genome/dix_minisequences.fasta",
+    "./genome/dix_sequences.fasta",
+    "./genome/sequences.fasta",
+]
+
+
+def copy_fasta(tmp_path, filename):
+    dest = os.path.join(tmp_path, os.path.basename(filename))
+    shutil.copy(filename, dest)
+    return dest
+
+
+def test_build_fasta_index():
+    index = build_fasta_index("./genome/dix_minisequences.fasta")
+    assert len(index) == 10
+    assert index[0][0] == "LC593801.1"
+    assert [entry[1] for entry in index] == [60] * 10
+    assert index[0][3] == 60 and index[0][4] == 62  # CRLF line endings
+
+    index = build_fasta_index("./genome/sequences.fasta")
+    assert index[0][0] == "NC_045512.2"
+    assert index[0][3] == 60 and index[0][4] == 61
+
+
+def test_read_records(tmp_path):
+    for f in TEST_FASTA:
+        f = copy_fasta(tmp_path, f)
+        genomes = fasta_to_genome(f)
+        if not isinstance(genomes, list):
+            genomes = [genomes]
+        assert list(iter_genomes_index(f)) == genomes
+
+        index = load_fasta_index(f)
+        assert transcription_complementaire(read_record(f, index[-1])) == genomes[-1]
+        assert index_lengths(f) == taille_ensemble(genomes)
+
+
+def test_read_region(tmp_path):
+    f = copy_fasta(tmp_path, "./genome/dix_sequences.fasta")
+    genome = fasta_to_genome(f)[3]
+    entry = load_fasta_index(f)[3]
+
+    for start, end in [(0, 1), (0, 60), (59, 61), (60, 120), (1234, 5678), (29000, 40000), (10, 10)]:
+        assert transcription_complementaire(read_region(f, entry, start, end)) == genome[start:end]
+
+
+def test_index_reused(tmp_path):
+    f = copy_fasta(tmp_path, "./genome/dix_minisequences.fasta")
+    index = load_fasta_index(f)
+    assert os.path.exists(f + INDEX_SUFFIX)
+
+    # A valid sidecar is used as is, without scanning the fasta again
+    with open(f + INDEX_SUFFIX, "a") as idx:
+        idx.write("fake\t1\t0\t1\t2\t0\n")
+    assert len(load_fasta_index(f)) == len(index) + 1
+
+    # Once the fasta changes the index is rebuilt
+    with open(f, "a") as fasta:
+        fasta.write("\n>extra\nACGT\n")
+    os.utime(f, ns=(os.stat(f).st_atime_ns, os.stat(f).st_mtime_ns + 10**9))
+    index = load_fasta_index(f)
+    assert len(index) == 11
+    assert read_record(f, index[-1]) == "ACGT"
+
+
+def test_uneven_lines(tmp_path):
+    f = os.path.join(tmp_path, "uneven.fasta")
+    with open(f, "w") as fasta:
+        fasta.write(">a\nACG\nACGT\nA\n")
+    with pytest.raises(ValueError):
+        build_fasta_index(f)
+
+
+def test_blank_lines(tmp_path):
+    # A blank line between the records or at the end of the file, as iter_fasta accepts
+    for newline in ["\n", "\r\n"]:
+        f = os.path.join(tmp_path, "blank.fasta")
+        with open(f, "w", newline="") as fasta:
+            fasta.write(newline.join([">a", "ACGT", "AC", "", ">b", "ACGT", "ACGT", "A", "", ""]))
+        index = build_fasta_index(f)
+        assert [entry[1] for entry in index] == [6, 9]
+        assert [read_record(f, entry) for entry in index] == ["ACGTAC", "ACGTACGTA"]
+        assert list(iter_genomes_index(f)) == list(iter_genomes(f))
+    with open(f, "w") as fasta:
+        fasta.write(">a\nACGT\n\nAC\n")
+    with pytest.raises(ValueError):
+        build_fasta_index(f)
+
+
+def test_whitespace_lines(tmp_path):
+    f = os.path.join(tmp_path, "spaces.fasta")
+    with open(f, "w") as fasta:
+        fasta.write(">a\nAC GT\nACGTA\n")
+    with pytest.raises(ValueError):
+        build_fasta_index(f)
+
+
+def test_index_atomic(tmp_path, monkeypatch):
+    f = copy_fasta(tmp_path, "./genome/dix_minisequences.fasta")
+    index = load_fasta_index(f)
+
+    # A write interrupted by an error leaves the previous index untouched
+    os.remove(f + INDEX_SUFFIX)
+    def replace(src, dst):
+        raise OSError("interrupted")
+    monkeypatch.setattr(os, "replace", replace)
+    assert load_fasta_index(f) == index
+    assert not os.path.exists(f + INDEX_SUFFIX)
+
+
+def test_perform_all_stats_taille_fasta(tmp_path):
+    for f in TEST_FASTA[:2]:
+        f = copy_fasta(tmp_path, f)
+        assert perform_all_stats_taille_fasta(f) == perform_all_stats_taille(fasta_to_genome(f))
@@ -0,0 +1,67 @@
+import pytest
+import glob
+import numpy as np
+
+from src.genome import *
+from src.utility import *
+from src.codon import *
+from src.levenshtein import *
+from src.needleman import *
+
+TEST_FASTA = sorted(glob.glob("./genome/*.fasta"))
+
+
+def test_genome():
+    for sequence in ["", "A", "AUGCCGUA", "AUGNNYK"]:
+        g1 = Genome(sequence, "id", "id desc")
+        g2 = Genome(sequence.encode())
+        g3 = Genome(np.frombuffer(sequence.encode(), dtype=np.uint8))
+        for g in [g1, g2, g3, Genome(g1)]:
+            assert g == sequence
+            assert str(g) == sequence
+            assert len(g) == len(sequence)
+            assert list(g) == list(sequence)
+            assert g[1:3] == sequence[1:3]
+            assert g.codes.tobytes() == sequence.encode()
+        assert g1 == g2 == g3
+        assert hash(g1) == hash(g2)
+    assert "NNY" in Genome("AUGNNYK")
+
+
+def test_genome_non_latin1():
+    # Like codes_of on the str: no buffer, the functions fall back to the str
+    g = Genome("AUG\u20acGCNUAA")
+    assert g.codes is None and codes_of(g) is None and codes_of(g.sequence) is None
+    assert len(g) == 10 and g == "AUG\u20acGCNUAA"
+    assert nombre_elements(g, NUCLEOTIDES) == nombre_elements(g.sequence, NUCLEOTIDES)
+
+
+def test_genome_zero_copy():
+    data = np.frombuffer(b"AUGCAUGC", dtype=np.uint8)
+    g = Genome(data[2:6])
+    assert g == "GCAU"
+    assert np.shares_memory(g.codes, data)
+
+
+def test_fasta_to_records():
+    for f in TEST_FASTA:
+        records = fasta_to_records(f)
+        assert [r.sequence for r in records] == list(iter_genomes(f))
+        assert [r.description for r in records] == [header for header, _ in iter_fasta(f)]
+        assert all(r.id == r.description.split()[0] for r in records)
+
+
+def test_genome_functions():
+    records = fasta_to_records("./genome/dix_minisequences.fasta")
+    for r in records:
+        s = r.sequence
+        assert nombre_elements(r, NUCLEOTIDES) == nombre_elements(s, NUCLEOTIDES)
+        assert nombre_elements(Genome(s[:len(s) - len(s) % 3]), AMINO_ACIDS) == nombre_elements(s[:len(s) - len(s) % 3], AMINO_ACIDS)
+        assert codons_v2(Genome(s[:len(s) - len(s) % 3])) == codons_v2(s[:len(s) - len(s) % 3])
+    assert nombre_element_echantillon(records, NUCLEOTIDES) == nombre_element_echantillon([r.sequence for r in records], NUCLEOTIDES)
+    assert nombre_elements(Genome("AUGN"), ["A", "N", "AU"]) == nombre_elements("AUGN", ["A", "N", "AU"])
+
+    a, b = records[0][:40], records[1][:40]
+    assert lev(Genome(a), Genome(b)) == lev(a, b)
+    assert needleman(Genome(a), Genome(b), [1, -1, -2]) == needleman(a, b, [1, -1, -2])
+    assert needleman_all(Genome(a), b, [1, -1, -2]) == needleman_all(a, b, [1, -1, -2])
@@ -0,0 +1,93 @@
+import pytest
+import random
+import numpy as np
+
+from src.kmer import *
+from src.stats import *
+
+EPOCHS      = 100   # How many times we test iterations we should run per function
+KMER_RUNS   = 10    # How many arguments we will generate per epoch for kmer_codes
+
+
+def naive_kmers(sequence, k, step=1):
+    fenetres = [sequence[i:i + k] for i in range(0, len(sequence) - k + 1, step)]
+    return [fenetre for fenetre in fenetres if all(base in NUCLEOTIDES for base in fenetre)]
+
+
+def test_kmers():
+    assert kmers(1) == list(NUCLEOTIDES)
+    assert kmers(2)[:5] == ["AA", "AU", "AG", "AC", "UA"]
+    assert len(kmers(3)) == 64
+    assert all(kmer_index(kmer) == i for i, kmer in enumerate(kmers(3)))
+    assert kmer_index("ANG") is None
+    assert kmer_index("") == 0
+
+
+def test_kmer_codes():
+    assert kmer_codes("", 2).tolist() == []
+    assert kmer_codes("A", 2).tolist() == []
+    assert kmer_codes("AUGC", 2).tolist() == [1, 6, 11]
+    assert kmer_codes("AUNGC", 2).tolist() == [1, 11]
+    assert kmer_codes(Genome("AUGCAUG"), 3, step=3).tolist() == [kmer_index("AUG"), kmer_index("CAU")]
+    with pytest.raises(ValueError):
+        kmer_codes("AUGC", 0)
+
+
+def test_kmer_k_limits():
+    assert len(nombre_kmers("AUGC" * 4, KMER_MAX_K)) == 4 ** KMER_MAX_K
+    for k in [0, KMER_MAX_K + 1, 32]:
+        for func in [lambda: kmer_codes("AUGC" * 10, k), lambda: nombre_kmers("AUGC" * 10, k), lambda: kmers(k),
+                     lambda: kmer_matrix([], k), lambda: nombre_kmers_total([], k)]:
+            with pytest.raises(ValueError):
+                func()
+
+
+def test_kmer_matrix_sampler():
+    # With a sampler the counts are sparse, they match the full count arrays
+    sequences = [''.join(random.choices(NUCLEOTIDES + "N", k=random.randint(0, 2000))) for _ in range(10)]
+    sampler = random.sample(kmers(KMER_MAX_K), 20) + ["N" * KMER_MAX_K, "AU"]
+    matrix = kmer_matrix(sequences, KMER_MAX_K, sampler)
+    for row, sequence in zip(matrix.tolist(), sequences):
+        counts = nombre_kmers(sequence, KMER_MAX_K)
+        assert row == [counts[kmer_index(kmer)] if len(kmer) == KMER_MAX_K and kmer_index(kmer) is not None else 0 for kmer in sampler]
+    frequent = [kmers(KMER_MAX_K)[i] for i in kmer_codes(sequences[0], KMER_MAX_K)[:5]]
+    assert kmer_matrix(sequences[:1], KMER_MAX_K, frequent).tolist() == [[nombre_kmers(sequences[0], KMER_MAX_K)[kmer_index(kmer)] for kmer in frequent]]
+
+
+def test_gen_nombre_kmers():
+    for _ in range(0, EPOCHS):
+        #----------- Generating random arguments -----------
+        for _ in range(KMER_RUNS):
+            sequence = "".join(random.choices("AUGCAUGCN", k=random.randint(0, 60)))
+            k, step = random.randint(1, 4), random.randint(1, 3)
+            #------------------ Test ------------------
+            attendu = naive_kmers(sequence, k, step)
+            assert [kmers(k)[i] for i in kmer_codes(sequence, k, step)] == attendu
+            assert nombre_kmers(sequence, k, step).tolist() == [attendu.count(kmer) for kmer in kmers(k)]
+
+
+def test_kmer_matrix():
+    sequences = ["AUGCGCG", "CGNCG", "", "UUUU"]
+    matrix = kmer_matrix(sequences, 2)
+    assert matrix.shape == (4, 16)
+    assert matrix[0, kmer_index("CG")] == 2 and matrix[1, kmer_index("CG")] == 2 and matrix[3, kmer_index("UU")] == 3
+    assert kmer_matrix(sequences, 2, ["CG", "GC", "NN", "CGA"]).tolist() == [[2, 2, 0, 0], [2, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+    assert kmer_matrix([], 3).shape == (0, 64)
+    assert nombre_kmer_echantillon([], 2) == {}
+    assert nombre_kmers_total(sequences, 2)["CG"] == 4
+
+
+def test_kmer_stats():
+    sequences = ["AUGCGCG", "CGNCG", "GCAU", "UUUU"]
+    dico = nombre_kmer_echantillon(sequences, 2, ["CG", "GC"])
+    assert dico == {"CG": [2, 2, 0, 0], "GC": [2, 0, 1, 0]}
+    assert call_stat_on_echantillon(moyenne, dico) == {"CG": 1.0, "GC": 0.75}
+    assert call_stat_on_echantillon(quartile, dico, 3) == {"CG": quartile([2, 2, 0, 0], 3), "GC": quartile([2, 0, 1, 0], 3)}
+    assert perform_all_stats_matrix(kmer_matrix(sequences, 2, ["CG", "GC"]), ["CG", "GC"])["med"] == {"CG": 1.0, "GC": 0.5}
+
+
+def test_rapport_observe_attendu():
+    assert rapport_observe_attendu("AUAUAU", "CG") is None
+    assert rapport_observe_attendu("", "CG") is None
+    # CGCG : 3 dinucléotides dont 2 CG, C et G ont chacun une fréquence de 1/2
+    assert rapport_observe_attendu("CGCG", "CG") == pytest.approx((2 / 3) / (1 / 4))
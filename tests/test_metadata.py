@@ -0,0 +1,75 @@
+import pytest
+import glob
+import shutil
+
+from src.metadata import *
+from src.utility import *
+
+TEST_FASTA = sorted(glob.glob("./genome/*.fasta"))
+
+BANK = """>MW000001.1 |Severe acute respiratory syndrome coronavirus 2 isolate SARS-CoV-2/human/USA/CA-1/2020|USA|2020-12-18
+AUGC
+>MW000002.1 |Severe acute respiratory syndrome coronavirus 2 isolate SARS-CoV-2/human/USA/CA-2/2020|USA|2020-03-02
+GGGG
+>MW000003.1 |Severe acute respiratory syndrome coronavirus 2 isolate SARS-CoV-2/human/CHN/WH-1/2020, complete genome
+CCCC
+>MW000004.1 |Tunisia|2020-12
+UUUU
+>NC_045512.2 |Severe acute respiratory syndrome coronavirus 2 isolate Wuhan-Hu-1, complete genome
+AAAA
+"""
+
+
+def test_parse_header():
+    assert parse_header(">MW368439.1 |Severe acute respiratory syndrome coronavirus 2 isolate SARS-CoV-2/human/BEL/GHB-03021/2020, complete genome") == ("MW368439.1", "BEL", "2020")
+    assert parse_header("MW000001.1 |x|Germany|2020-12-15") == ("MW000001.1", "DEU", "2020-12-15")
+    assert parse_header("MW000001.1 |x|tun|2021") == ("MW000001.1", "TUN", "2021")
+    assert parse_header(">NC_045512.2 |Severe acute respiratory syndrome coronavirus 2 isolate Wuhan-Hu-1, complete genome") == ("NC_045512.2", "", "")
+    assert parse_header("") == ("", "", "")
+
+
+def test_load_metadata():
+    for f in TEST_FASTA:
+        metadata = load_metadata(f)
+        assert [row for row in metadata] == [parse_header(header) for header, _ in iter_fasta(f)]
+
+
+def test_load_metadata_chevron(tmp_path):
+    f = str(tmp_path / "chevron.fasta")
+    with open(f, "w") as out:
+        out.write(">MW000005.1 |a>b|France|2020-11\nAUGC\n>MW000006.1 |USA|2020\nGGGG\n")
+    assert load_metadata(f) == [("MW000005.1", "FRA", "2020-11"), ("MW000006.1", "USA", "2020")]
+
+
+def test_select_records(tmp_path):
+    f = str(tmp_path / "bank.fasta")
+    with open(f, "w") as out:
+        out.write(BANK)
+
+    def select(**kwargs):
+        return list(iter_genomes_index(f, select_records(f, **kwargs)))
+
+    assert select() == list(iter_genomes(f))
+    assert select(country="USA", date="2020-12") == ["AUGC"]
+    assert select(country="USA") == ["AUGC", "GGGG"]
+    assert select(country=["china", "TUN"]) == ["CCCC", "UUUU"]
+    assert select(date="2020-12") == ["AUGC", "UUUU"]
+    assert select(after="2020-06-01") == ["AUGC"]
+    assert select(before="2020-06-01") == ["GGGG"]
+    assert select(after="2020-12-01", before="2020-12-31") == ["AUGC"]
+    assert select(after="2020-06", before="2020-12") == ["AUGC", "UUUU"]
+    assert select(after="2020", before="2020") == ["AUGC", "GGGG", "CCCC", "UUUU"]
+    assert select(accession="NC_045512") == ["AAAA"]
+    assert select(accession=["MW000002.1", "MW000004.1"]) == ["GGGG", "UUUU"]
+    assert select(country="FRA") == []
+    assert select(country="ken") == []
+    with pytest.raises(ValueError):
+        select(country="Kenya")
+
+
+def test_select_records_year():
+    # The headers only give the year: the date and the range filters both leave them out
+    f = "./genome/deux_sequences_usa_18122020.fasta"
+    assert len(select_records(f, date="2020")) == len(select_records(f, after="2020", before="2020")) == 2
+    assert select_records(f, date="2020-12") == select_records(f, after="2020-12-01", before="2020-12-31") == []
+    assert select_records(f, after="2020-12") == select_records(f, before="2020-12") == []
@@ -0,0 +1,80 @@
+import pytest
+import random
+
+from src.orf import *
+from src.codon import *
+
+EPOCHS      = 100   # How many times we test iterations we should run per function
+ORF_RUNS    = 10    # How many arguments we will generate per epoch for orfs
+
+
+def naive_orfs(ARNm, strand=1):
+    l = []
+    for i in range(len(ARNm) - 2):
+        if ARNm[i:i + 3] == "AUG":
+            for j in range(i + 3, len(ARNm) - 2, 3):
+                if ARNm[j:j + 3] in STOP_CODONS:
+                    l.append((i, j, i % 3, strand))
+                    break
+    return l
+
+
+def reverse_complement(ARNm):
+    return ARNm[::-1].translate(str.maketrans("AUGC", "UACG"))
+
+
+def test_orfs():
+    assert orfs("") == []
+    assert orfs("AUGUAA") == [(0, 3, 0, 1)]
+    assert orfs("AUGAUGUAG") == [(0, 6, 0, 1), (3, 6, 0, 1)]
+    assert orfs("AUGAUGUAG", nested=False) == [(0, 6, 0, 1)]
+    assert orfs("AUGAUGUAG", min_codons=2) == [(0, 6, 0, 1)]
+    assert orfs("CAUGCCCUGAUU") == [(1, 7, 1, 1)]
+    # UUA CAU : sur le brin complémentaire AUG UAA, l'ORF est le complémentaire de CAU
+    assert orfs("UUACAU", reverse=True) == [(3, 6, 0, -1)]
+    assert sequence_orf("UUACAU", (3, 6, 0, -1)) == "AUG"
+    assert sequence_orf(Genome("CAUGCCCUGAUU"), (1, 7, 1, 1)) == "AUGCCC"
+
+
+def test_gen_orfs():
+    for _ in range(0, EPOCHS):
+        #----------- Generating random arguments -----------
+        for _ in range(ORF_RUNS):
+            s = "".join(random.choices("AUGCAUGCAUGCN", k=random.randint(0, 150)))
+            #------------------ Test ------------------
+            attendu = naive_orfs(s)
+            assert orfs(s) == attendu
+            assert [sequence_orf(s, orf) for orf in orfs(s)] == [s[i:j] for i, j, _, _ in attendu]
+
+            rc = reverse_complement(s)
+            inverses = [(len(s) - j, len(s) - i, f, -1) for i, j, f, _ in naive_orfs(rc)]
+            assert orfs(s, reverse=True) == attendu + inverses
+            assert [sequence_orf(s, orf) for orf in inverses] == [rc[len(s) - j:len(s) - i] for i, j, _, _ in inverses]
+
+            longs = [orf for orf in attendu if not any(o[1] == orf[1] and o[0] < orf[0] for o in attendu)]
+            assert orfs(s, nested=False) == longs
+            assert orfs(s, min_codons=5) == [orf for orf in attendu if orf[1] - orf[0] >= 15]
+
+
+def test_start_to_stop_glouton():
+    for _ in range(0, EPOCHS):
+        for _ in range(ORF_RUNS):
+            s = "".join(random.choices("AUGCAUGCAUGCNR", k=random.randint(0, 150)))
+            assert start_to_stop_glouton(codes_of(s)) == [(i, i + len(seq)) for i, seq in zip(start_positions(s), start_to_stop(s))]
+
+
+def start_positions(s): # la position de chaque séquence de start_to_stop, avec la boucle d'origine
+    length, l, i = len(s), [], 0
+    while i < length - 4:
+        if s[i:i+3] == 'AUG':
+            j = i + 3
+            while s[j:j+3] not in STOP_CODONS and j < length - 3:
+                j += 3
+            if s[j:j+3] in STOP_CODONS:
+                l.append(i)
+                i = j + 3
+            if j >= length - 3:
+                break
+        else:
+            i += 1
+    return l
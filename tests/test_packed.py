@@ -0,0 +1,62 @@
+import pytest
+import glob
+import os
+
+from src.packed import *
+
+TEST_FASTA = sorted(glob.glob("./genome/*.fasta"))
+
+TEST_CASES = [
+    "",
+    "A",
+    "AUGC",
+    "AUGCA",
+    "NNNNN",
+    "AUGNNNNNNCCGYYKAUGN",
+    "NNAUGRRRRRAAUGCCSWKMBDHVNNA",
+    "AUGCauGCTTUU-*AU",
+]
+
+
+def test_pack_unpack():
+    for s in TEST_CASES:
+        packed_genome = pack_genome(s, "header")
+        assert packed_genome[0] == "header"
+        assert packed_genome[1] == len(s)
+        assert len(packed_genome[2]) == (len(s) + 3) // 4
+        assert unpack_genome(packed_genome) == s
+
+
+def test_runs():
+    _, _, _, runs = pack_genome("AUGNNNNNNCCGYYKAUGN")
+    assert [ (int(r["start"]), int(r["length"]), chr(r["base"])) for r in runs ] == [(3, 6, 'N'), (12, 2, 'Y'), (14, 1, 'K'), (18, 1, 'N')]
+    _, _, _, runs = pack_genome("AUGC" * 100)
+    assert len(runs) == 0
+
+
+def test_packed_file(tmp_path):
+    for f in TEST_FASTA:
+        packed_filename = os.path.join(tmp_path, "genomes.sc2p")
+        genomes = fasta_to_genome(f)
+        n = fasta_to_packed(f, packed_filename)
+        assert n == (len(genomes) if isinstance(genomes, list) else 1)
+        assert packed_to_genome(packed_filename) == genomes
+        assert [ g[0] for g in load_packed(packed_filename) ] == [ header for header, _ in iter_fasta(f) ]
+
+    # About 4 times smaller than the fasta file
+    assert os.path.getsize(packed_filename) < os.path.getsize(TEST_FASTA[-1]) / 3.5
+
+
+def test_packed_file_ambiguities(tmp_path):
+    fasta = os.path.join(tmp_path, "ambiguous.fasta")
+    with open(fasta, "w") as f:
+        for i, s in enumerate(TEST_CASES):
+            f.write(f">seq{i} test\n{s}\n")
+    packed_filename = os.path.join(tmp_path, "ambiguous.sc2p")
+    fasta_to_packed(fasta, packed_filename)
+    assert packed_to_genome(packed_filename) == fasta_to_genome(fasta)
+
+
+def test_not_packed(tmp_path):
+    with pytest.raises(ValueError):
+        load_packed(TEST_FASTA[0])
@@ -1,6 +1,8 @@
+import functools
 import pytest
 from numpy.lib.scimath import sqrt
 import numpy as np
+import src.stats
 from src.stats import *
 
 # used to generate bunch of random arguments for testing
@@ -16,6 +18,10 @@ MED_RUNS    = 100    # How many arguments we will generate per epoch for mediane
 QUART_RUNS  = 100    # How many arguments we will generate per epoch for quartile
 VAR_RUNS    = 100    # How many arguments we will generate per epoch for variance
 STD_RUNS    = 100    # How many arguments we will generate per epoch for ecart_type
+RESUME_RUNS = 20     # How many arguments we will generate per epoch for resume_statistique
+HISTO_RUNS  = 5      # How many arguments we will generate per epoch for histogramme
+BOOT_RUNS   = 5      # How many arguments we will generate per epoch for bootstrap
+POIDS_RUNS  = 20     # How many arguments we will generate per epoch for stat_ponderee
 
 def test_moyenne(): # on n'a pas test les chaînes de caractère, ou des lites qui n'ont pas comme éléments des nombres
     assert moyenne([1, 2, 3]) == 2
@@ -152,6 +158,23 @@ def test_perform_all_stats_taille():
                                                                                          'int_quart': 8}
 
 
+def test_perform_all_stats_iterateur():
+    for f in ["./genome/dix_minisequences.fasta", "./genome/dix_sequences.fasta"]:
+        arns = fasta_to_genome(f)
+        assert perform_all_stats_taille(iter_genomes(f)) == perform_all_stats_taille(arns)
+        assert perform_all_stats(iter_genomes(f), NUCLEOTIDES) == perform_all_stats(arns, NUCLEOTIDES)
+        assert perform_all_stats_prop(iter_genomes(f), NUCLEOTIDES) == perform_all_stats_prop(arns, NUCLEOTIDES)
+
+    acids = codons_echantillon(fasta_to_genome("./genome/dix_minisequences.fasta"))
+    assert perform_all_stats(iter_codons_echantillon(iter_genomes("./genome/dix_minisequences.fasta")), AMINO_ACIDS) == perform_all_stats(acids, AMINO_ACIDS)
+
+
+def test_perform_all_stats_prop():
+    assert perform_all_stats_prop(['AU','GC','ACUG'], ['A','U','G','C'])["moy"] == call_stat_prop(moyenne, ['AU','GC','ACUG'], ['A','U','G','C'])
+    assert perform_all_stats_prop(['AU','GC','ACUG'], ['A','U','G','C'])["quart3"] == call_stat_prop(quartile, ['AU','GC','ACUG'], ['A','U','G','C'], 3)
+    assert perform_all_stats_prop([], NUCLEOTIDES)["moy"] == {'A': None, 'U': None, 'G': None, 'C': None}
+
+
 def test_call_stat():
     assert call_stat(mediane, fasta_to_genome("./genome/dix_sequences.fasta"),NUCLEOTIDES) == {'A': 8951.0, 'U': 9601.0, 'G': 5857.5, 'C': 5485.5}
     assert call_stat(moyenne, fasta_to_genome("./genome/dix_minisequences.fasta"), NUCLEOTIDES) == {'A': 17.3, 'U': 19.4, 'G': 7.1, 'C': 16.2}
@@ -235,4 +258,202 @@ def test_gen_ecart_type():
         args = arg_generator(N=STD_RUNS, stride=1, type=NUMBERS, lower=random.randint(-10000, 0), upper=random.randint(0, 10000), start=1)
         for arg in args:
             #------------------ Test ------------------
-            assert abs(ecart_type(*arg) - sqrt(np.var(*arg))) <= 0.01 # we will do this due to precision error
\ No newline at end of file
+            assert abs(ecart_type(*arg) - sqrt(np.var(*arg))) <= 0.01 # we will do this due to precision error
+
+def test_proportion_matrix():
+    sequences = ['AU', 'GC', 'ACUG', '', 'AUNN']
+    matrix = proportion_matrix(sequences, NUCLEOTIDES)
+    assert matrix.tolist() == [[proportions(s, NUCLEOTIDES)[e] for e in NUCLEOTIDES] for s in sequences]
+    assert call_stat_matrix(moyenne, count_matrix(sequences, NUCLEOTIDES), NUCLEOTIDES) == call_stat(moyenne, sequences, NUCLEOTIDES)
+    assert perform_all_stats_matrix(matrix, NUCLEOTIDES) == perform_all_stats_prop(sequences, NUCLEOTIDES)
+
+def test_proportion_matrix_memo(monkeypatch):
+    appels = []
+    original = src.stats.proportion_matrix
+    monkeypatch.setattr(src.stats, "proportion_matrix", lambda *args: appels.append(1) or original(*args))
+    memo = MemoProportions()
+
+    sequences = list(iter_genomes("./genome/dix_minisequences.fasta"))
+    resultats = [call_stat_prop(moyenne, sequences, NUCLEOTIDES, memo=memo), call_stat_prop(mediane, sequences, NUCLEOTIDES, memo=memo),
+                 call_stat_prop(quartile, sequences, NUCLEOTIDES, 3, memo=memo), perform_all_stats_prop(sequences, NUCLEOTIDES, memo)]
+    assert len(appels) == 1     # une seule matrice pour tous les appels
+    assert resultats[3]["moy"] == resultats[0] and resultats[3]["med"] == resultats[1] and resultats[3]["quart3"] == resultats[2]
+
+    # Une autre liste, un autre sampler ou un générateur : la matrice est recalculée
+    call_stat_prop(moyenne, sequences[1:], NUCLEOTIDES, memo=memo)
+    call_stat_prop(moyenne, sequences, 'AU', memo=memo)
+    call_stat_prop(moyenne, iter(sequences), NUCLEOTIDES, memo=memo)
+    call_stat_prop(moyenne, iter(sequences), NUCLEOTIDES, memo=memo)
+    assert len(appels) == 5
+    assert call_stat_prop(moyenne, list(sequences), NUCLEOTIDES, memo=memo) == resultats[0]
+    assert len(appels) == 5     # mêmes objets dans une nouvelle liste
+
+    # Sans memo rien n'est gardé, clear libère les séquences
+    call_stat_prop(moyenne, sequences, NUCLEOTIDES)
+    assert len(appels) == 6
+    memo.clear()
+    assert memo.entrees == []
+    call_stat_prop(moyenne, sequences, NUCLEOTIDES, memo=memo)
+    assert len(appels) == 7
+
+
+def test_gen_resume_statistique():
+    fonctions = {"moy": moyenne, "med": mediane, "ecartt": ecart_type, "var": variance,
+                 "quart1": lambda l: quartile(l, 1), "quart3": lambda l: quartile(l, 3), "int_quart": intervalle_interquartile}
+    for _ in range(0, EPOCHS) :
+        #----------- Generating random arguments -----------
+        n = random.randint(1, 50)
+        colonnes = [[random.randint(-10000, 10000) for _ in range(n)] for _ in range(RESUME_RUNS)]
+        colonnes += [[random.uniform(-10000, 10000) for _ in range(n)] for _ in range(RESUME_RUNS)]
+        #------------------ Test ------------------
+        # Mêmes valeurs (au bit près) et mêmes types que les fonctions de base
+        resume = resume_statistique(np.array(colonnes[:RESUME_RUNS]).T)
+        resume_reels = resume_statistique(np.array(colonnes[RESUME_RUNS:]).T)
+        for stat, f in fonctions.items():
+            attendu = [f(colonne) for colonne in colonnes]
+            assert resume[stat] + resume_reels[stat] == attendu
+            assert list(map(type, resume[stat] + resume_reels[stat])) == list(map(type, attendu))
+    assert resume_statistique(np.zeros((0, 3))) == {stat: [None] * 3 for stat in STATS}
+    assert perform_all_stats_liste([]) == {stat: None for stat in STATS}
+
+
+def histogramme_boucle(valeurs, minimum, maximum, nb_tranches): # l'ancienne boucle des fonctions plot_histo_*
+    taille_tranches = (maximum - minimum)/ nb_tranches
+    tranches = [int(minimum + i*taille_tranches) for i in range(nb_tranches)]
+    tranches[-1] += 1
+    barres = [0 for i in range(nb_tranches)]
+    for i in valeurs:
+        for j in range(nb_tranches):
+            if int(minimum + j*taille_tranches) <= i < int(minimum + (j+1)*taille_tranches):
+                barres[j] += 1
+                break
+    return tranches, barres
+
+
+def test_histogramme():
+    assert histogramme([1, 2, 2, 5], 1, 6, 5) == ([1, 2, 3, 4, 6], [1, 2, 0, 0, 1])
+    assert histogramme([1, 2, 2, 5], 1, 6, 2) == ([1, 4], [3, 1])
+    assert histogramme([3, 3], 3, 4, 4) == ([3, 3, 3, 4], [0, 0, 0, 2])     # plus de tranches que de valeurs possibles
+
+
+def test_gen_histogramme():
+    for _ in range(0, EPOCHS) :
+        #----------- Generating random arguments -----------
+        for _ in range(HISTO_RUNS):
+            valeurs = [random.randint(-100, 100) for _ in range(random.randint(1, 50))]
+            minimum, maximum = min(valeurs), max(valeurs) + 1
+            nb_tranches = random.randint(1, 2 * (maximum - minimum))
+            #------------------ Test ------------------
+            assert histogramme(valeurs, minimum, maximum, nb_tranches) == histogramme_boucle(valeurs, minimum, maximum, nb_tranches)
+
+
+def test_gen_bootstrap():
+    fonctions = [(moyenne, ()), (mediane, ()), (quartile, (1,)), (quartile, (3,)), (variance, ()), (ecart_type, ()), (intervalle_interquartile, ())]
+    for _ in range(0, EPOCHS) :
+        #----------- Generating random arguments -----------
+        for _ in range(BOOT_RUNS):
+            n, B, seed = random.randint(1, 40), random.randint(1, 20), random.randint(0, 1000)
+            colonne = [random.randint(-100, 100) for _ in range(n)] if random.random() < 0.5 else [random.uniform(-100, 100) for _ in range(n)]
+            # Les mêmes tirages que bootstrap (un seul morceau)
+            indices = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0]).integers(0, n, size=(B, n))
+            echantillons = [[colonne[i] for i in ligne] for ligne in indices.tolist()]
+            #------------------ Test ------------------
+            for f, args in fonctions:
+                distribution = bootstrap(f, colonne, *args, B=B, seed=seed)
+                assert distribution.shape == (B, 1)
+                assert distribution[:, 0].tolist() == pytest.approx([f(e, *args) for e in echantillons], abs=1e-9)
+
+
+def test_bootstrap(monkeypatch):
+    matrix = np.random.default_rng(0).integers(0, 1000, size=(500, 3))
+    reference = bootstrap(mediane, matrix, B=200, seed=42)
+    assert np.array_equal(bootstrap(mediane, matrix, B=200, seed=42), reference)
+    # Même graine : même résultat quel que soit le nombre de processus
+    monkeypatch.setattr(src.stats, "BOOTSTRAP_CHUNK", 500 * 64)    # 64 rééchantillonnages par morceau
+    assert np.array_equal(bootstrap(mediane, matrix, B=200, seed=42, processes=2), bootstrap(mediane, matrix, B=200, seed=42))
+    assert not np.array_equal(bootstrap(mediane, matrix, B=200, seed=43), reference)
+
+    assert bootstrap(moyenne, [], B=10) is None
+    assert intervalle_bootstrap(moyenne, np.zeros((0, 2))) is None
+    assert intervalle_bootstrap(moyenne, [7] * 10, seed=0) == [(7.0, 7.0)]
+    with pytest.raises(ValueError):
+        bootstrap(quartile, matrix, 4)
+    with pytest.raises(ValueError):
+        # Une fonction enveloppée, même avec le même nom, n'est pas une stat connue
+        bootstrap(functools.wraps(moyenne)(lambda liste: moyenne(liste)), matrix, B=10)
+    with pytest.raises(ValueError):
+        bootstrap(functools.partial(quartile, n=1), matrix, B=10)
+
+    bas, haut = intervalle_bootstrap(moyenne, matrix, B=500, seed=0)[0]
+    assert bas < moyenne(matrix[:, 0].tolist()) < haut
+
+
+def test_call_stat_bootstrap():
+    sequences = list(iter_genomes("./genome/dix_minisequences.fasta"))
+    intervalles = call_stat_bootstrap(mediane, sequences, NUCLEOTIDES, B=100, seed=0)
+    medianes = call_stat(mediane, sequences, NUCLEOTIDES)
+    assert list(intervalles) == list(medianes)
+    for element, (bas, haut) in intervalles.items():
+        assert bas <= haut
+    intervalles = call_stat_bootstrap(moyenne, sequences, NUCLEOTIDES, proportions=True, B=100, seed=0)
+    assert all(0 <= bas <= haut <= 1 for bas, haut in intervalles.values())
+    assert call_stat_bootstrap(moyenne, [], NUCLEOTIDES) == {}
+    assert call_stat_bootstrap(moyenne, [], NUCLEOTIDES, proportions=True) == {element: None for element in NUCLEOTIDES}
+
+
+def test_stat_ponderee():
+    assert stat_ponderee(moyenne, [1, 2], [3, 1]) == moyenne([1, 1, 1, 2])
+    assert stat_ponderee(mediane, [5, 1, 3], [1, 2, 1]) == mediane([5, 1, 1, 3])
+    assert stat_ponderee(quartile, [4, 2, 4], [1, 0, 2], 1) == quartile([4, 4, 4], 1)
+    assert stat_ponderee(moyenne, [1, 2], [0, 0]) is None
+    assert stat_ponderee(quartile, [1, 2], [1, 1], 4) is None
+    with pytest.raises(ValueError):
+        stat_ponderee(len, [1, 2], [1, 1])
+    with pytest.raises(ValueError):
+        # Une fonction enveloppée, même avec le même nom, n'est pas une stat connue
+        stat_ponderee(functools.wraps(moyenne)(lambda liste: moyenne(liste)), [1, 2], [1, 1])
+    # Résultats exacts arrondis une fois, quel que soit l'ordre des valeurs
+    valeurs, poids = [0.1, 0.2, 0.7, 1e16], [3, 1, 2, 1]
+    exacte = sum(Fraction(v) * p for v, p in zip(valeurs, poids)) / 7
+    assert stat_ponderee(moyenne, valeurs, poids) == moyenne_ponderee(valeurs[::-1], poids[::-1]) == float(exacte)
+    assert variance_ponderee(valeurs, poids) == float(sum(p * (Fraction(v) - exacte)**2 for v, p in zip(valeurs, poids)) / 7)
+    assert stat_ponderee(moyenne, [0.1] * 3, [1, 1, 1]) == moyenne_ponderee([0.1], [3]) == 0.1
+
+    sequences = list(iter_genomes("./genome/dix_minisequences.fasta"))
+    uniques = sequences[:4]
+    poids = [3, 1, 2, 1]
+    repetees = [s for s, p in zip(uniques, poids) for _ in range(p)]
+    assert call_stat_pondere(mediane, uniques, NUCLEOTIDES, poids) == call_stat(mediane, repetees, NUCLEOTIDES)
+    assert call_stat_pondere(quartile, uniques, NUCLEOTIDES, poids, 3, proportions=True) == call_stat_prop(quartile, repetees, NUCLEOTIDES, 3)
+    assert call_stat_pondere(moyenne, [], NUCLEOTIDES, []) == call_stat(moyenne, [], NUCLEOTIDES)
+
+    stats, reference = perform_all_stats_pondere(uniques, NUCLEOTIDES, poids), perform_all_stats(repetees, NUCLEOTIDES)
+    for stat in STATS:
+        # moyenne, variance et écart-type des réels : exacts contre sommes flottantes dans l'ordre (voir stat_ponderee)
+        assert stats[stat] == pytest.approx(reference[stat], rel=1e-12)
+    for stat in ["moy", "med", "quart1", "quart3", "int_quart"]:
+        assert stats[stat] == reference[stat]
+    stats, reference = perform_all_stats_taille_pondere(uniques, poids), perform_all_stats_taille(repetees)
+    for stat in ["moy", "med", "quart1", "quart3", "int_quart"]:
+        assert stats[stat] == reference[stat]
+
+
+def test_gen_stat_ponderee():
+    for _ in range(0, EPOCHS) :
+        #----------- Generating random arguments -----------
+        for _ in range(POIDS_RUNS):
+            valeurs = [random.randint(-50, 50) for _ in range(random.randint(0, 30))]
+            poids = [random.randint(0, 5) for _ in valeurs]
+            repetees = [v for v, p in zip(valeurs, poids) for _ in range(p)]
+            #------------------ Test ------------------
+            for stat_func, args in [(moyenne, ()), (mediane, ()), (quartile, (1,)), (quartile, (3,)), (intervalle_interquartile, ())]:
+                assert stat_ponderee(stat_func, valeurs, poids, *args) == stat_func(repetees, *args)
+            for stat_func in [variance, ecart_type]:
+                # Variance exacte contre la somme flottante dans l'ordre de variance
+                assert stat_ponderee(stat_func, valeurs, poids) == pytest.approx(stat_func(repetees), rel=1e-12)
+            # Sur des réels : la moyenne exacte de la liste répétée, arrondie une fois
+            reels = [random.random() for _ in valeurs]
+            if repetees:
+                exacte = sum(Fraction(v) * p for v, p in zip(reels, poids)) / len(repetees)
+                assert stat_ponderee(moyenne, reels, poids) == float(exacte)
+                assert stat_ponderee(moyenne, reels, poids) == pytest.approx(moyenne([v for v, p in zip(reels, poids) for _ in range(p)]), rel=1e-12)
@@ -0,0 +1,101 @@
+import functools
+import pytest
+import random
+
+import src.stats_online
+from src.stats_online import *
+
+EPOCHS      = 100   # How many times we test iterations we should run per function
+FONCTIONS   = [(moyenne, ()), (mediane, ()), (ecart_type, ()), (variance, ()),
+               (quartile, (1,)), (quartile, (2,)), (quartile, (3,)), (intervalle_interquartile, ())]
+
+
+def verifie(accumulateur, valeurs):
+    # Chaque stat est à moins de la borne annoncée de la fonction exacte
+    for f, args in FONCTIONS:
+        exact, approx = f(valeurs, *args), accumulateur.stat(f, *args)
+        assert abs(approx - exact) <= accumulateur.erreur(f, *args) * (1 + 1e-9) + 1e-9 * (1 + abs(exact))
+
+
+def test_accumulateur():
+    a = Accumulateur()
+    assert len(a) == 0
+    assert all(a.stat(f, *args) is None for f, args in FONCTIONS)
+    a.add(5)
+    assert a.moyenne() == 5 and a.variance() == 0
+    assert abs(a.mediane() - 5) <= a.erreur(mediane)
+
+    for _ in range(EPOCHS):
+        valeurs = [random.uniform(-10000, 10000) * random.random() ** 3 for _ in range(random.randint(1, 200))]
+        valeurs += [0] * random.randint(0, 3) + [random.randint(0, 30000) for _ in range(random.randint(0, 50))]
+        random.shuffle(valeurs)
+        a = Accumulateur()
+        for x in valeurs[:10]:
+            a.add(x)
+        a.add_many(valeurs[10:])
+        verifie(a, valeurs)
+
+
+def test_accumulateur_merge():
+    for _ in range(EPOCHS):
+        valeurs = [random.randint(0, 30000) for _ in range(random.randint(2, 200))]
+        coupure = random.randint(0, len(valeurs))
+        a, b = Accumulateur(), Accumulateur()
+        a.add_many(valeurs[:coupure])
+        b.add_many(valeurs[coupure:])
+        verifie(a.merge(b), valeurs)
+    with pytest.raises(ValueError):
+        Accumulateur(0.01).merge(Accumulateur(0.05))
+
+
+def test_sketch_memoire():
+    s = DDSketch(0.01, max_buckets=100)
+    s.add_many(np.random.default_rng(0).lognormal(0, 5, 100000))
+    assert len(s.positives) <= 100
+    assert s.count == 100000
+
+
+def test_erreur_buckets_regroupes():
+    # Les petites valeurs regroupées (max_buckets) n'ont plus de borne, les grandes la gardent
+    valeurs = [2.0 ** i for i in range(-200, 200)]
+    a = Accumulateur(0.01, max_buckets=150)
+    a.add_many(valeurs)
+    assert a.erreur(quartile, 1) == math.inf
+    assert a.erreur(intervalle_interquartile) == math.inf
+    assert a.erreur(quartile, 3) < math.inf
+    assert abs(a.quartile(3) - quartile(valeurs, 3)) <= a.erreur(quartile, 3)
+    assert a.erreur(moyenne) == 0.0
+
+    # Le regroupement est gardé par la fusion (par exemple d'un autre processus)
+    b = Accumulateur(0.01, max_buckets=150)
+    b.add_many([-x for x in valeurs])
+    assert b.merge(a).erreur(mediane) == math.inf
+    assert Accumulateur(0.01, max_buckets=150).merge(a).erreur(quartile, 1) == math.inf
+    c = Accumulateur()
+    c.add_many(valeurs)
+    assert c.erreur(quartile, 1) < math.inf
+
+
+def test_accumulateur_fonctions():
+    a = Accumulateur()
+    a.add_many([1, 2, 3])
+    assert a.stat(quartile, 4) is None and a.erreur(quartile, 4) is None
+    for f in [len, functools.wraps(mediane)(lambda liste: mediane(liste))]:
+        with pytest.raises(ValueError):
+            a.stat(f)
+        with pytest.raises(ValueError):
+            a.erreur(f)
+
+
+def test_perform_all_stats_online(monkeypatch):
+    monkeypatch.setattr(src.stats_online, "BATCH_SIZE", 3)     # plusieurs lots
+    sequences = list(iter_genomes("./genome/dix_sequences.fasta"))
+    for sampler, echantillon in [(NUCLEOTIDES, sequences), (AMINO_ACIDS, codons_echantillon(sequences))]:
+        for proportions in [False, True]:
+            accumulateurs = accumulate_echantillon(iter(echantillon), sampler, proportions=proportions)
+            exact = perform_all_stats_prop(echantillon, sampler) if proportions else perform_all_stats(echantillon, sampler)
+            assert perform_all_stats_online(echantillon, sampler, proportions=proportions).keys() == exact.keys()
+            valeurs = proportions_echantillon(echantillon, sampler) if proportions else nombre_element_echantillon(echantillon, sampler)
+            for element in elements(sampler):
+                verifie(accumulateurs[element], valeurs[element])
+            assert call_stat_on_echantillon(moyenne, accumulateurs).keys() == exact["moy"].keys()
@@ -0,0 +1,60 @@
+import pytest
+import random
+from src.stats_shard import *
+
+TEST_FASTA = "./genome/dix_sequences.fasta"
+
+
+def proche(a, b):
+    # Mêmes stats aux arrondis près (les sommes ne sont pas faites dans le même ordre)
+    for stat in STATS:
+        for element in b[stat]:
+            assert a[stat][element] == pytest.approx(b[stat][element], rel=1e-9, abs=1e-15)
+
+
+def test_resume_merge():
+    for _ in range(50):
+        matrix = np.random.randint(0, 1000, (random.randint(1, 100), 4))
+        coupure = random.randint(0, len(matrix))
+        resume = Resume(NUCLEOTIDES).add_matrix(matrix[:coupure]).merge(Resume(NUCLEOTIDES).add_matrix(matrix[coupure:]))
+        # Entiers : moyenne, médiane et quartiles exacts
+        exact = perform_all_stats_matrix(matrix, NUCLEOTIDES)
+        stats = resume.stats()
+        for stat in ["moy", "med", "quart1", "quart3", "int_quart"]:
+            assert stats[stat] == exact[stat]
+        proche(stats, exact)
+
+        reels = matrix / 1000
+        resume = Resume(NUCLEOTIDES).add_matrix(reels[:coupure]).merge(Resume(NUCLEOTIDES).add_matrix(reels[coupure:]))
+        proche(resume.stats(), perform_all_stats_matrix(reels, NUCLEOTIDES))
+
+    with pytest.raises(ValueError):
+        Resume(NUCLEOTIDES).merge(Resume(AMINO_ACIDS))
+    assert Resume(NUCLEOTIDES).stats()["moy"] == {'A': None, 'U': None, 'G': None, 'C': None}
+
+
+def test_resume_json():
+    sequences = list(iter_genomes(TEST_FASTA))
+    for mode in MODES:
+        resume = resume_sequences(sequences, NUCLEOTIDES, mode)
+        copie = Resume.from_json(resume.to_json())
+        assert copie.stats() == resume.stats()
+        assert copie.to_json() == resume.to_json()
+
+
+def test_shards_fasta():
+    index = load_fasta_index(TEST_FASTA)
+    for shards in [1, 3, 10, 50]:
+        morceaux = shards_fasta(TEST_FASTA, shards)
+        assert len(morceaux) == min(shards, len(index))
+        assert [entry for morceau in morceaux for entry in morceau] == index
+
+
+def test_perform_all_stats_fasta():
+    sequences = list(iter_genomes(TEST_FASTA))
+    for processes, shards in [(1, None), (1, 4), (2, 3)]:
+        proche(perform_all_stats_fasta(TEST_FASTA, NUCLEOTIDES, processes=processes, shards=shards), perform_all_stats(sequences, NUCLEOTIDES))
+        proche(perform_all_stats_fasta(TEST_FASTA, NUCLEOTIDES, True, processes, shards), perform_all_stats_prop(sequences, NUCLEOTIDES))
+        taille = perform_all_stats_taille_shards(TEST_FASTA, processes, shards)
+        exact = perform_all_stats_taille(sequences)
+        assert taille == pytest.approx(exact)
@@ -14,6 +14,21 @@ def test_transcription_complementaire():
     assert transcription_complementaire('TATACCTTCCCAGGTAACAAACCAACCAACTTTCGATCTCTTGTAGATCTGTTCTCTAAA') == 'UAUACCUUCCCAGGUAACAAACCAACCAACUUUCGAUCUCUUGUAGAUCUGUUCUCUAAA'
 
 
+def test_transcription_vectorisee():
+    for f in ["./genome/dix_sequences.fasta", "./genome/dix_minisequences.fasta"]:
+        adn = [ sequence for _, sequence in iter_fasta(f) ]
+        arn = [ transcription_complementaire_boucle(sequence) for sequence in adn ]
+        assert [ transcription_complementaire(sequence) for sequence in adn ] == arn
+        assert transcription_echantillon(adn) == arn
+        assert transcription_echantillon(iter(adn)) == arn
+        assert fasta_to_genome(f) == arn
+
+    assert transcription_complementaire(b'TCGATN') == 'UCGAUN'
+    assert transcription_complementaire(['T', 'C', 'G']) == 'UCG'
+    assert transcription_echantillon([]) == []
+    assert transcription_echantillon(['', 'T', 'ATTA']) == ['', 'U', 'AUUA']
+
+
 def test_fasta_to_genome():
     assert fasta_to_genome("./genome/dix_minisequences.fasta") == ['UAAAGGUUUAUACCUUCCCAGGUAACAAACCAACCAACUUUCGAUCUCUUGUAGAUCUGU',
                                                                   'UUUAUACCUUCCCAGGUAACAAACCAACCAACUUUCGAUCUCUUGUAGAUCUGUUCUCUA',
@@ -27,6 +42,60 @@ def test_fasta_to_genome():
                                                                   'AAGGUUUAUACCUUCCCAGGUAACAAACCAACCAACUUUCGAUCUCUUGUAGAUCUGUUC']
 
 
+def test_iter_genomes():
+    genomes = iter_genomes("./genome/dix_minisequences.fasta")
+    assert not isinstance(genomes, list)
+    assert list(genomes) == fasta_to_genome("./genome/dix_minisequences.fasta")
+    assert list(iter_genomes("./genome/sequences.fasta")) == [fasta_to_genome("./genome/sequences.fasta")]
+
+
+def test_bank_sequences_iterable():
+    sequences = ['AUGC', 'AUNC', 'AAUU', 'GGCC']
+    assert bank_sequences(2, iter(sequences)) == ['AUGC', 'AAUU']
+    assert bank_sequences_rec(2, iter(sequences)) == ['AUGC', 'AAUU']
+    assert bank_sequences(10, sequences) == ['AUGC', 'AAUU', 'GGCC']
+    assert bank_sequences_rec(10, sequences) == ['AUGC', 'AAUU', 'GGCC']
+
+
+def test_bank_sequences_stop():
+    # La lecture s'arrête dès que l'échantillon est complet
+    def sequences():
+        yield 'AUGC'
+        yield 'AUGY'
+        yield 'AAUU'
+        raise AssertionError("the bank was read too far")
+    assert bank_sequences(2, sequences()) == ['AUGC', 'AAUU']
+    assert bank_sequences_rec(2, sequences()) == ['AUGC', 'AAUU']
+    # Pas de limite de récursion
+    assert len(bank_sequences_rec(5000, ['AUGC'] * 10000)) == 5000
+
+
+def test_sans_ambiguite():
+    assert sans_ambiguite('AUGC')
+    assert sans_ambiguite('')
+    for j in AMBIGUITES:
+        assert not sans_ambiguite('AUGC' + j + 'AUGC')
+    assert list(iter_sans_ambiguite(['AUGC', 'NAUG', 'GG', 'K'])) == ['AUGC', 'GG']
+
+
+def test_echantillon_aleatoire():
+    sequences = [str(i) for i in range(100)] + ['N']
+    echantillon = echantillon_aleatoire(10, sequences, seed=42)
+    assert len(echantillon) == 10
+    assert len(set(echantillon)) == 10
+    assert echantillon == sorted(echantillon, key=int)
+    assert echantillon == echantillon_aleatoire(10, iter(sequences), seed=42)
+    assert echantillon_aleatoire(200, sequences, seed=1) == sequences[:-1]
+    assert echantillon_aleatoire(0, sequences, seed=1) == []
+
+    # Chaque séquence a la même probabilité d'être tirée
+    counts = dict.fromkeys(sequences[:10], 0)
+    for seed in range(2000):
+        for sequence in echantillon_aleatoire(3, sequences[:10], seed=seed):
+            counts[sequence] += 1
+    assert all(500 < c < 700 for c in counts.values())
+
+
 def test_taille_ensemble():
     assert taille_ensemble([[1, 2, 3, 4, 5], [4, 5, 6, 5, 6, 8, 0, 'a'], ['a', 'b1', 123, 147, 000], [], [''], [1]]) == [5, 8, 5, 0, 1, 1]
     assert taille_ensemble([]) == []
@@ -47,6 +116,20 @@ def test_taille_ensemble():
                                                                                                  60, 60, 60, 60]
 
 
+def test_count_matrix():
+    sequences = ['ACU', '', 'AAAGN', ['A', 'C'], Genome('GGU')]
+    matrix = count_matrix(sequences, NUCLEOTIDES)
+    assert matrix.shape == (5, 4)
+    assert matrix.tolist() == [[nombre_elements(s, NUCLEOTIDES)[e] for e in NUCLEOTIDES] for s in sequences]
+    matrix, lengths = count_matrix(iter(sequences), 'AUGCA', lengths=True)
+    assert elements('AUGCA') == ['A', 'U', 'G', 'C']
+    assert matrix.shape == (5, 4)
+    assert lengths.tolist() == [3, 0, 5, 2, 3]
+    assert count_matrix([], AMINO_ACIDS).shape == (0, len(AMINO_ACIDS))
+    assert count_matrix(['AUGé'], ['é', 'AU', 'A']).tolist() == [[1, 0, 1]]
+    assert nombre_element_echantillon([], NUCLEOTIDES) == {}
+
+
 def test_nombre_elements():
     assert nombre_elements('ACU', NUCLEOTIDES) == {'A': 1, 'U': 1, 'G': 0, 'C': 1}
     assert nombre_elements('AAA', NUCLEOTIDES) == {'A': 3, 'U': 0, 'G': 0, 'C': 0}
@@ -88,6 +171,8 @@ def test_nombre_element_echantillon():
                                                     '*': [0, 0, 0, 0]}
 
     assert nombre_element_echantillon([], AMINO_ACIDS) == {}
+    assert nombre_element_echantillon(iter(['ACU','AAA','ACUGACU']), NUCLEOTIDES) == {'A': [1, 3, 2], 'U': [1, 0, 2],
+                                                                                      'G': [0, 0, 1], 'C': [1, 0, 2]}
     assert nombre_element_echantillon(fasta_to_genome("./genome/dix_minisequences.fasta"), NUCLEOTIDES) == {'A': [18, 16, 18, 17, 15, 17, 15, 19, 21, 17],
                                                                                                         'U': [19, 21, 19, 19, 20, 18, 21, 20, 18, 19],
                                                                                                         'G': [8, 6, 6, 8, 8, 7, 7, 6, 7, 8],